@@ -1,4 +1,11 @@
 from django.contrib import admin
-from .models import OneTimePassword
+from .models import OneTimePassword, OutboxEmail
 
 admin.site.register(OneTimePassword)
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'recipients', 'status', 'attempts', 'created_at', 'sent_at')
+    list_filter = ('status',)
+    exclude = ('body',)
@@ -0,0 +1,117 @@
+import statistics
+import time
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.cache import SessionStore
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+
+from accounts.models import OutboxEmail
+from accounts.otp import get_otp_store
+from accounts.outbox import send_outbox_batch
+from accounts.views import login_view
+
+
+class SlowSMTPBackend(EmailBackend):
+    """
+    Local stand-in for a slow SMTP server: opening a connection costs
+    connect_delay and every message costs send_delay (seconds).
+    """
+    connect_delay = 0.15
+    send_delay = 0.05
+
+    connected = False
+
+    def open(self):
+        if self.connected:
+            return False
+        time.sleep(self.connect_delay)
+        self.connected = True
+        return True
+
+    def close(self):
+        self.connected = False
+
+    def send_messages(self, messages):
+        # Like the SMTP backend, a call without an open connection opens
+        # (and afterwards closes) one of its own
+        new_connection = self.open()
+        try:
+            time.sleep(self.send_delay * len(messages))
+            return super().send_messages(messages)
+        finally:
+            if new_connection:
+                self.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Time accounts.views.login_view (password check + OTP email step) "
+        "and the outbox drain against a slow local SMTP stand-in. The view "
+        "is called directly because /accounts/login/ resolves to "
+        "django.contrib.auth's view first. Rows created by the run are "
+        "removed afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=20)
+        parser.add_argument('--connect-ms', type=float, default=150)
+        parser.add_argument('--send-ms', type=float, default=50)
+
+    def handle(self, *args, **options):
+        SlowSMTPBackend.connect_delay = options['connect_ms'] / 1000
+        SlowSMTPBackend.send_delay = options['send_ms'] / 1000
+
+        user = User.objects.create_user(
+            'bench-login-user', email='bench@example.com', password='bench-pass-123'
+        )
+
+        try:
+            with override_settings(
+                EMAIL_BACKEND=f'{__name__}.SlowSMTPBackend',
+                AXES_ENABLED=False
+            ):
+                mail.outbox = []
+                timings = self.run(options['logins'])
+
+                started = time.perf_counter()
+                sent, _failed = send_outbox_batch(batch_size=options['logins'])
+                drain = (time.perf_counter() - started) * 1000
+        finally:
+            OutboxEmail.objects.filter(recipients=user.email).delete()
+            get_otp_store().discard(user.id)
+            user.delete()
+
+        timings.sort()
+        self.stdout.write(
+            f"login_view POST x{len(timings)}: "
+            f"mean {statistics.mean(timings):.1f} ms, "
+            f"p50 {timings[len(timings) // 2]:.1f} ms, "
+            f"p95 {timings[int(len(timings) * 0.95) - 1]:.1f} ms"
+        )
+        self.stdout.write(
+            f"outbox worker: {sent} emails in {drain:.1f} ms over one connection"
+        )
+
+    def run(self, count):
+        factory = RequestFactory()
+        timings = []
+
+        for _ in range(count):
+            request = factory.post('/accounts/login/', {
+                'username': 'bench-login-user',
+                'password': 'bench-pass-123',
+            })
+            request.session = SessionStore()
+
+            started = time.perf_counter()
+            response = async_to_sync(login_view)(request)
+            timings.append((time.perf_counter() - started) * 1000)
+
+            if response.status_code != 302:
+                raise RuntimeError(f"Login failed with status {response.status_code}")
+
+        return timings
@@ -0,0 +1,104 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+
+from accounts.models import OutboxEmail
+from accounts.otp import get_otp_store
+
+CREDENTIALS = {'username': 'bench-concurrency-user', 'password': 'bench-pass-123'}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent logins per second through the WSGI handler "
+        "(a pool of worker threads, like a threaded WSGI server) and the "
+        "ASGI handler (one event loop). Rows created by the run are removed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=64)
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help="WSGI worker threads."
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=32,
+            help="Requests in flight at once on the ASGI side."
+        )
+
+    def handle(self, *args, **options):
+        user = User.objects.create_user(
+            email='bench-concurrency@example.com', **CREDENTIALS
+        )
+        self.session_keys = []
+
+        try:
+            with override_settings(
+                ALLOWED_HOSTS=['testserver'],
+                AXES_ENABLED=False
+            ):
+                for label, run in (
+                    (f"WSGI ({options['workers']} threads)", self.run_wsgi),
+                    (f"ASGI ({options['concurrency']} in flight)", self.run_asgi),
+                ):
+                    elapsed, latencies = run(options)
+                    latencies.sort()
+                    self.stdout.write(
+                        f"{label:<24} {len(latencies) / elapsed:6.1f} logins/s, "
+                        f"p50 {latencies[len(latencies) // 2]:.0f} ms, "
+                        f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.0f} ms"
+                    )
+        finally:
+            Session.objects.filter(session_key__in=self.session_keys).delete()
+            OutboxEmail.objects.filter(recipients=user.email).delete()
+            get_otp_store().discard(user.id)
+            user.delete()
+
+    def record(self, client, response, started):
+        if response.status_code != 302:
+            raise RuntimeError(f"Login failed with status {response.status_code}")
+        self.session_keys.append(client.cookies['sessionid'].value)
+        return (time.perf_counter() - started) * 1000
+
+    # ==========================
+    # WSGI
+    # ==========================
+    def run_wsgi(self, options):
+        def login(_):
+            client = Client()
+            started = time.perf_counter()
+            response = client.post(reverse('login'), CREDENTIALS)
+            return self.record(client, response, started)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            latencies = list(pool.map(login, range(options['logins'])))
+
+        return time.perf_counter() - started, latencies
+
+    # ==========================
+    # ASGI
+    # ==========================
+    def run_asgi(self, options):
+        return asyncio.run(self.arun_asgi(options))
+
+    async def arun_asgi(self, options):
+        limit = asyncio.Semaphore(options['concurrency'])
+
+        async def login():
+            async with limit:
+                client = AsyncClient()
+                started = time.perf_counter()
+                response = await client.post(reverse('login'), CREDENTIALS)
+                return self.record(client, response, started)
+
+        started = time.perf_counter()
+        latencies = await asyncio.gather(*(login() for _ in range(options['logins'])))
+
+        return time.perf_counter() - started, list(latencies)
@@ -0,0 +1,46 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from accounts.outbox import send_outbox_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver queued OutboxEmail rows in batches over one SMTP connection "
+        "per batch. Runs until the outbox is empty, or forever with --loop."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.OUTBOX_BATCH_SIZE
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help="Keep polling for new emails instead of exiting when idle."
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help="Seconds to wait between polls when the outbox is empty."
+        )
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+
+        try:
+            while True:
+                sent, failed = send_outbox_batch(options['batch_size'])
+                total_sent += sent
+                total_failed += failed
+
+                if sent or failed:
+                    self.stdout.write(f"Sent {sent}, rescheduled {failed}")
+                elif options['loop']:
+                    time.sleep(options['interval'])
+                else:
+                    break
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(f"Done: {total_sent} sent, {total_failed} rescheduled")
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:03
+
+from django.db import migrations, models
+
+
+def drop_plaintext_codes(apps, schema_editor):
+    # Pending codes were stored in clear; they expire within minutes anyway
+    apps.get_model('accounts', 'OneTimePassword').objects.using(
+        schema_editor.connection.alias
+    ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_outboxemail'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_plaintext_codes, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='onetimepassword',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='onetimepassword',
+            name='code',
+            field=models.CharField(max_length=64),
+        ),
+    ]
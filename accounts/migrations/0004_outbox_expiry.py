@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:49
+
+from django.db import migrations, models
+
+
+def clear_failed_bodies(apps, schema_editor):
+    # Failed mail is never retried, so its OTP has no reason to stay
+    OutboxEmail = apps.get_model('accounts', 'OutboxEmail')
+    OutboxEmail.objects.using(schema_editor.connection.alias).filter(
+        status='failed'
+    ).update(body='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_otp_hash_and_attempts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxemail',
+            name='expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='outboxemail',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed'), ('expired', 'Expired')], default='pending', max_length=10),
+        ),
+        migrations.RunPython(clear_failed_bodies, migrations.RunPython.noop),
+    ]
@@ -1,15 +1,67 @@
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
 
 
 class OneTimePassword(models.Model):
+    """Storage for accounts.otp.DatabaseOTPStore; `code` holds a hash."""
     user = models.OneToOneField(User, on_delete=models.CASCADE)
-    code = models.CharField(max_length=6)
+    code = models.CharField(max_length=64)
+    attempts = models.PositiveSmallIntegerField(default=0)
     created_at = models.DateTimeField(default=timezone.now)
 
     def is_expired(self):
-        return timezone.now() > self.created_at + timezone.timedelta(minutes=5)
+        return timezone.now() > self.created_at + timezone.timedelta(
+            seconds=settings.OTP_TTL_SECONDS
+        )
 
     def __str__(self):
         return f"OTP for {self.user.username}"
+
+
+class OutboxEmail(models.Model):
+    """An email waiting for the outbox worker (`manage.py send_outbox`)."""
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_EXPIRED = 'expired'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+        (STATUS_EXPIRED, 'Expired'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254, blank=True)
+    # Comma-separated addresses
+    recipients = models.TextField()
+
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    # OTP mail is pointless once the code expires; never sent after this
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # The worker's "what is due" scan
+            models.Index(
+                fields=['status', 'next_attempt_at'],
+                name='outbox_due_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.recipients} ({self.status})"
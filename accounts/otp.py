@@ -0,0 +1,155 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.module_loading import import_string
+
+from .models import OneTimePassword
+
+# Outcomes of OTPStore.verify()
+VERIFIED = 'verified'
+INVALID = 'invalid'
+EXPIRED = 'expired'
+LOCKED = 'locked'
+
+
+def hash_code(user_id, code):
+    """Keyed hash, so stored codes are useless without SECRET_KEY."""
+    return salted_hmac('accounts.otp', f"{user_id}:{code}").hexdigest()
+
+
+# ==========================
+# STORES
+# ==========================
+class BaseOTPStore:
+    """
+    Holds one pending OTP per user for OTP_TTL_SECONDS and allows at most
+    OTP_MAX_ATTEMPTS guesses at it; the code is discarded on success or
+    once the attempts run out.
+    """
+
+    @property
+    def ttl(self):
+        return settings.OTP_TTL_SECONDS
+
+    @property
+    def max_attempts(self):
+        return settings.OTP_MAX_ATTEMPTS
+
+    def save(self, user_id, code):
+        raise NotImplementedError
+
+    def pending(self, user_id):
+        raise NotImplementedError
+
+    def verify(self, user_id, code):
+        raise NotImplementedError
+
+    def discard(self, user_id):
+        raise NotImplementedError
+
+    # Async views call these
+    async def asave(self, user_id, code):
+        return await sync_to_async(self.save)(user_id, code)
+
+    async def apending(self, user_id):
+        return await sync_to_async(self.pending)(user_id)
+
+    async def averify(self, user_id, code):
+        return await sync_to_async(self.verify)(user_id, code)
+
+
+class CacheOTPStore(BaseOTPStore):
+    """
+    Keeps the hashed code and the attempt counter in the cache; expiry is
+    the cache TTL, so a login costs no database writes. Needs a shared
+    cache backend when the site runs in more than one process.
+    """
+
+    def code_key(self, user_id):
+        return f"otp:{user_id}"
+
+    def attempts_key(self, user_id):
+        return f"otp-attempts:{user_id}"
+
+    def save(self, user_id, code):
+        cache.set_many(
+            {
+                self.code_key(user_id): hash_code(user_id, code),
+                self.attempts_key(user_id): 0,
+            },
+            self.ttl
+        )
+
+    def pending(self, user_id):
+        return cache.get(self.code_key(user_id)) is not None
+
+    def verify(self, user_id, code):
+        stored = cache.get(self.code_key(user_id))
+        if stored is None:
+            return EXPIRED
+
+        try:
+            attempts = cache.incr(self.attempts_key(user_id))
+        except ValueError:
+            # Counter evicted before the code; never fail open
+            cache.set(self.attempts_key(user_id), 1, self.ttl)
+            attempts = 1
+
+        if attempts > self.max_attempts:
+            self.discard(user_id)
+            return LOCKED
+
+        if not constant_time_compare(stored, hash_code(user_id, code or '')):
+            return INVALID
+
+        self.discard(user_id)
+        return VERIFIED
+
+    def discard(self, user_id):
+        cache.delete_many([self.code_key(user_id), self.attempts_key(user_id)])
+
+
+class DatabaseOTPStore(BaseOTPStore):
+    """Fallback store on the OneTimePassword model."""
+
+    def save(self, user_id, code):
+        OneTimePassword.objects.update_or_create(
+            user_id=user_id,
+            defaults={
+                'code': hash_code(user_id, code),
+                'attempts': 0,
+                'created_at': timezone.now(),
+            }
+        )
+
+    def pending(self, user_id):
+        otp = OneTimePassword.objects.filter(user_id=user_id).first()
+        return otp is not None and not otp.is_expired()
+
+    def verify(self, user_id, code):
+        otp = OneTimePassword.objects.filter(user_id=user_id).first()
+        if otp is None or otp.is_expired():
+            return EXPIRED
+
+        OneTimePassword.objects.filter(pk=otp.pk).update(attempts=F('attempts') + 1)
+        otp.refresh_from_db(fields=['attempts'])
+
+        if otp.attempts > self.max_attempts:
+            otp.delete()
+            return LOCKED
+
+        if not constant_time_compare(otp.code, hash_code(user_id, code or '')):
+            return INVALID
+
+        otp.delete()
+        return VERIFIED
+
+    def discard(self, user_id):
+        OneTimePassword.objects.filter(user_id=user_id).delete()
+
+
+def get_otp_store():
+    return import_string(settings.OTP_STORE)()
@@ -0,0 +1,169 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+security_logger = logging.getLogger('security')
+
+
+# ==========================
+# ENQUEUE
+# ==========================
+def outbox_row(subject, message, recipient_list, from_email=None, expires_in=None):
+    return OutboxEmail(
+        subject=subject,
+        body=message,
+        from_email=from_email or '',
+        recipients=','.join(recipient_list),
+        expires_at=timezone.now() + timedelta(seconds=expires_in) if expires_in else None
+    )
+
+
+def enqueue_email(subject, message, recipient_list, from_email=None, expires_in=None):
+    """
+    Queue an email for the outbox worker instead of sending it inline.
+    With expires_in (seconds) it is dropped unsent once that time passes.
+    """
+    email = outbox_row(subject, message, recipient_list, from_email, expires_in)
+    email.save()
+    return email
+
+
+async def aenqueue_email(subject, message, recipient_list, from_email=None, expires_in=None):
+    email = outbox_row(subject, message, recipient_list, from_email, expires_in)
+    await email.asave()
+    return email
+
+
+# ==========================
+# DELIVERY
+# ==========================
+def retry_delay(attempts):
+    """Exponential backoff: base, 2x base, 4x base, ... capped at an hour."""
+    return timedelta(
+        seconds=min(settings.OUTBOX_RETRY_SECONDS * 2 ** (attempts - 1), 3600)
+    )
+
+
+def schedule_retry(email, error):
+    email.attempts += 1
+    email.last_error = str(error)[:1000]
+
+    next_attempt_at = timezone.now() + retry_delay(email.attempts)
+
+    if email.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        email.status = OutboxEmail.STATUS_FAILED
+        email.body = ''
+        security_logger.error(
+            "Outbox email %s FAILED after %s attempts: %s",
+            email.pk, email.attempts, email.last_error
+        )
+    elif email.expires_at and next_attempt_at >= email.expires_at:
+        # The retry would come too late for the code inside
+        email.status = OutboxEmail.STATUS_EXPIRED
+        email.body = ''
+    else:
+        email.next_attempt_at = next_attempt_at
+
+    email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at', 'body'])
+
+
+def expire_emails(now=None):
+    """Drop pending emails past their expiry, body and all."""
+    return OutboxEmail.objects.filter(
+        status=OutboxEmail.STATUS_PENDING,
+        expires_at__lte=now or timezone.now()
+    ).update(status=OutboxEmail.STATUS_EXPIRED, body='')
+
+
+def claim_due_emails(batch_size):
+    """
+    Lease up to batch_size due emails to this worker by pushing their
+    next_attempt_at past the lease. A worker that dies mid-batch simply
+    lets the lease run out and the emails become due again.
+    """
+    now = timezone.now()
+    expire_emails(now)
+
+    due = OutboxEmail.objects.filter(
+        status=OutboxEmail.STATUS_PENDING,
+        next_attempt_at__lte=now
+    )
+    ids = list(due.order_by('next_attempt_at', 'id').values_list('id', flat=True)[:batch_size])
+
+    if not ids:
+        return []
+
+    lease_until = now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+    due.filter(id__in=ids).update(next_attempt_at=lease_until)
+
+    # Rows another worker claimed first carry a different lease
+    return list(
+        OutboxEmail.objects.filter(id__in=ids, next_attempt_at=lease_until)
+        .order_by('id')
+    )
+
+
+def send_outbox_batch(batch_size=None, connection=None):
+    """
+    Send one batch of due emails over a single SMTP connection.
+
+    A failed message is rescheduled with backoff and the connection is
+    reopened for the rest of the batch. Sent, failed and expired emails
+    keep their row for auditing but drop the body, which holds the OTP.
+    Returns (sent, failed) counts for this batch.
+    """
+    emails = claim_due_emails(batch_size or settings.OUTBOX_BATCH_SIZE)
+    if not emails:
+        return 0, 0
+
+    connection = connection or get_connection(fail_silently=False)
+    sent_ids = []
+    failed = 0
+
+    try:
+        connection.open()
+    except Exception as exc:
+        for email in emails:
+            schedule_retry(email, exc)
+        return 0, len(emails)
+
+    try:
+        for email in emails:
+            message = EmailMessage(
+                subject=email.subject,
+                body=email.body,
+                from_email=email.from_email or None,
+                to=email.recipients.split(','),
+                connection=connection
+            )
+
+            try:
+                if not connection.send_messages([message]):
+                    raise RuntimeError("Backend accepted no messages")
+            except Exception as exc:
+                schedule_retry(email, exc)
+                failed += 1
+
+                # The server may have dropped us; start the rest afresh
+                connection.close()
+                try:
+                    connection.open()
+                except Exception:
+                    pass
+            else:
+                sent_ids.append(email.id)
+    finally:
+        connection.close()
+
+    OutboxEmail.objects.filter(id__in=sent_ids).update(
+        status=OutboxEmail.STATUS_SENT,
+        sent_at=timezone.now(),
+        body=''
+    )
+
+    return len(sent_ids), failed
@@ -1,3 +1,199 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from smtplib import SMTPRecipientsRefused
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.cache import SessionStore
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import (
+    RequestFactory, TestCase, TransactionTestCase, override_settings
+)
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from .models import OneTimePassword, OutboxEmail
+from .otp import (
+    CacheOTPStore, DatabaseOTPStore, EXPIRED, INVALID, LOCKED, VERIFIED
+)
+from .outbox import enqueue_email, send_outbox_batch
+from .utils import aauthenticate, generate_otp
+from .views import login_view
+
+
+class CountingBackend(EmailBackend):
+    """locmem backend that counts connections and rejects one address."""
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return True
+
+    def send_messages(self, messages):
+        for message in messages:
+            if 'bounce@example.com' in message.to:
+                raise SMTPRecipientsRefused({'bounce@example.com': (550, b'No')})
+        return super().send_messages(messages)
+
+
+@override_settings(
+    EMAIL_BACKEND='accounts.tests.CountingBackend',
+    AXES_ENABLED=False
+)
+class OutboxTests(TestCase):
+
+    def setUp(self):
+        CountingBackend.opened = 0
+        self.user = User.objects.create_user(
+            'player', email='player@example.com', password='pass12345'
+        )
+
+    def test_worker_sends_a_batch_over_one_connection(self):
+        for n in range(3):
+            enqueue_email("OTP", f"code {n}", [f"user{n}@example.com"])
+
+        call_command('send_outbox', stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(CountingBackend.opened, 1)
+        sent = OutboxEmail.objects.filter(status=OutboxEmail.STATUS_SENT)
+        self.assertEqual(sent.count(), 3)
+        self.assertFalse(sent.exclude(body='').exists())
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=2, OUTBOX_RETRY_SECONDS=30)
+    def test_failures_back_off_then_give_up(self):
+        email = enqueue_email("OTP", "code", ['bounce@example.com'])
+
+        self.assertEqual(send_outbox_batch(), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.attempts, 1)
+        self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=25))
+
+        # Not due yet, so nothing is claimed
+        self.assertEqual(send_outbox_batch(), (0, 0))
+
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        send_outbox_batch()
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboxEmail.STATUS_FAILED)
+        self.assertEqual(email.body, '')
+
+    @override_settings(OUTBOX_RETRY_SECONDS=30)
+    def test_otp_mail_is_dropped_once_the_code_expires(self):
+        stale = enqueue_email("OTP", "code 1", ['player@example.com'], expires_in=300)
+        OutboxEmail.objects.filter(pk=stale.pk).update(expires_at=timezone.now())
+        # The second retry would land after expiry
+        bounced = enqueue_email("OTP", "code 2", ['bounce@example.com'], expires_in=45)
+
+        self.assertEqual(send_outbox_batch(), (0, 1))
+        OutboxEmail.objects.filter(pk=bounced.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(send_outbox_batch(), (0, 1))
+
+        self.assertEqual(len(mail.outbox), 0)
+        for email in (stale, bounced):
+            email.refresh_from_db()
+            self.assertEqual(email.status, OutboxEmail.STATUS_EXPIRED)
+            self.assertEqual(email.body, '')
+
+
+# Hashing runs on its own thread and DB connection, which SQLite cannot
+# share with TestCase's open transaction
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    AXES_ENABLED=False
+)
+class AsyncLoginTests(TransactionTestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'player', email='player@example.com', password='pass12345'
+        )
+
+    def test_login_hashes_off_the_loop_and_only_enqueues_the_email(self):
+        request = RequestFactory().post(
+            '/accounts/login/', {'username': 'player', 'password': 'pass12345'}
+        )
+        request.session = SessionStore()
+
+        response = async_to_sync(login_view)(request)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(mail.outbox, [])
+        self.assertIn("one-time password", OutboxEmail.objects.get().body)
+
+    def test_hashing_pool_recycles_its_connections(self):
+        with mock.patch('accounts.utils.close_old_connections') as close:
+            user = async_to_sync(aauthenticate)(
+                None, username='player', password='pass12345'
+            )
+
+        self.assertEqual(user, self.user)
+        self.assertEqual(close.call_count, 2)
+
+    def test_login_url_routes_to_the_app_view(self):
+        self.assertIs(resolve(reverse('login')).func, login_view)
+
+        response = self.client.post(
+            reverse('login'), {'username': 'player', 'password': 'pass12345'}
+        )
+
+        self.assertRedirects(response, reverse('verify_otp'), fetch_redirect_response=False)
+        self.assertEqual(OutboxEmail.objects.count(), 1)
+
+    def test_login_page_renders(self):
+        response = self.client.get(reverse('login'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'registration/login.html')
+
+
+@override_settings(OTP_MAX_ATTEMPTS=3)
+class CacheOTPStoreTests(TestCase):
+    store_class = CacheOTPStore
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('player', password='pass12345')
+        self.store = self.store_class()
+        self.store.save(self.user.id, '123456')
+
+    def test_right_code_verifies_once(self):
+        self.assertEqual(self.store.verify(self.user.id, '654321'), INVALID)
+        self.assertEqual(self.store.verify(self.user.id, '123456'), VERIFIED)
+        self.assertEqual(self.store.verify(self.user.id, '123456'), EXPIRED)
+
+    def test_attempts_are_limited(self):
+        for _ in range(3):
+            self.assertEqual(self.store.verify(self.user.id, '000000'), INVALID)
+
+        self.assertEqual(self.store.verify(self.user.id, '123456'), LOCKED)
+        self.assertFalse(self.store.pending(self.user.id))
+
+    def test_verify_view_logs_in_without_touching_the_database_store(self):
+        session = self.client.session
+        session['otp_user_id'] = self.user.id
+        session.save()
+
+        with override_settings(OTP_STORE=f'{self.store_class.__module__}.{self.store_class.__name__}'):
+            response = self.client.post(reverse('verify_otp'), {'otp': '123456'})
+
+        self.assertRedirects(response, reverse('home'), fetch_redirect_response=False)
+        self.assertEqual(int(self.client.session['_auth_user_id']), self.user.id)
+
+
+class DatabaseOTPStoreTests(CacheOTPStoreTests):
+    store_class = DatabaseOTPStore
+
+    def test_codes_are_hashed_and_expire(self):
+        otp = OneTimePassword.objects.get(user=self.user)
+        self.assertNotEqual(otp.code, '123456')
+
+        OneTimePassword.objects.update(created_at=timezone.now() - timedelta(minutes=6))
+        self.assertEqual(self.store.verify(self.user.id, '123456'), EXPIRED)
+
+    def test_generate_otp_is_six_digits(self):
+        self.assertRegex(generate_otp(), r'^[1-9]\d{5}$')
@@ -1,4 +1,52 @@
-import random
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.contrib.auth.views import redirect_to_login
+from django.db import close_old_connections
 
 def generate_otp():
-    return str(random.randint(100000, 999999))
+    return str(secrets.randbelow(900000) + 100000)
+
+
+# ==========================
+# ASYNC HELPERS
+# ==========================
+# Password hashing is CPU-bound; a small fixed pool keeps a burst of
+# logins from starving the event loop or spawning a thread each.
+HASHING_EXECUTOR = ThreadPoolExecutor(
+    max_workers=settings.AUTH_HASHING_THREADS,
+    thread_name_prefix='auth-hashing'
+)
+
+
+def pooled_authenticate(request, **credentials):
+    # Pool threads live outside any request, so nothing else closes or
+    # health-checks their connections (axes and the auth backends query)
+    close_old_connections()
+    try:
+        return authenticate(request, **credentials)
+    finally:
+        close_old_connections()
+
+
+async def aauthenticate(request, **credentials):
+    """authenticate() run on the bounded hashing pool."""
+    return await sync_to_async(
+        pooled_authenticate, thread_sensitive=False, executor=HASHING_EXECUTOR
+    )(request, **credentials)
+
+
+def async_login_required(view):
+    """login_required for async views (Django 4.2's is sync-only)."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        # Resolving request.user also loads the session
+        if not await sync_to_async(lambda: request.user.is_authenticated)():
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+
+    return wrapper
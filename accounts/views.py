@@ -1,11 +1,9 @@
 import logging
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
-from django.contrib.auth import (
-    authenticate,
-    login,
-    update_session_auth_hash
-)
+from django.contrib.auth import login, update_session_auth_hash
 from django.contrib.auth.forms import PasswordChangeForm
 from django.contrib import messages
 from django.core.exceptions import BadRequest, PermissionDenied
@@ -13,12 +11,15 @@ from django.http import HttpResponse
 from django.utils import timezone
 from django.contrib.auth.signals import user_login_failed, user_logged_in
 from django.dispatch import receiver
-from django.core.mail import send_mail
 from django.contrib.auth.models import User
 
+from config.page_cache import cache_anonymous_page
+from config.sessions import aload_session
+
 from .forms import CustomUserCreationForm, ProfileUpdateForm
-from .models import OneTimePassword
-from .utils import generate_otp
+from .otp import EXPIRED, LOCKED, VERIFIED, get_otp_store
+from .outbox import aenqueue_email
+from .utils import aauthenticate, generate_otp
 
 security_logger = logging.getLogger("security")
 
@@ -30,7 +31,7 @@ def register(request):
         form = CustomUserCreationForm(request.POST)
         if form.is_valid():
             user = form.save()
-            security_logger.info(f"User registered: {user.username}")
+            security_logger.info("User registered: %s", user.username)
             messages.success(request, "Account created successfully. Please log in.")
             return redirect("login")
     else:
@@ -42,81 +43,101 @@ def register(request):
 # ==========================
 # LOGIN (2FA STEP 1)
 # ==========================
-def login_view(request):
+async def login_view(request):
     if request.method == "POST":
         username = request.POST.get("username")
         password = request.POST.get("password")
 
-        user = authenticate(request, username=username, password=password)
+        # Password hashing runs on the bounded hashing pool
+        user = await aauthenticate(request, username=username, password=password)
 
         if user is not None:
             # Generate OTP
             otp_code = generate_otp()
 
-            # Store or update OTP
-            OneTimePassword.objects.update_or_create(
-                user=user,
-                defaults={'code': otp_code}
-            )
-
-            # Send OTP (console email backend)
-            send_mail(
-                subject="Your Login OTP",
-                message=(
-                    f"Your one-time password (OTP) is: {otp_code}\n\n"
-                    "This code will expire in 5 minutes."
-                ),
-                from_email=None,
-                recipient_list=[user.email],
-                fail_silently=True,
-            )
+            # Store OTP (replaces any pending one)
+            await get_otp_store().asave(user.id, otp_code)
+
+            # Queue OTP email; the outbox worker delivers it
+            if user.email:
+                await aenqueue_email(
+                    subject="Your Login OTP",
+                    message=(
+                        f"Your one-time password (OTP) is: {otp_code}\n\n"
+                        f"This code will expire in {settings.OTP_TTL_SECONDS // 60} minutes."
+                    ),
+                    recipient_list=[user.email],
+                    expires_in=settings.OTP_TTL_SECONDS,
+                )
 
             # Save user ID temporarily in session
+            await aload_session(request)
             request.session['otp_user_id'] = user.id
 
-            security_logger.info(f"OTP generated for user: {user.username}")
+            security_logger.info("OTP generated for user: %s", user.username)
 
             return redirect("verify_otp")
 
         else:
             messages.error(request, "Invalid username or password")
 
-    return render(request, "accounts/login.html")
+    return await sync_to_async(render)(request, "registration/login.html")
 
 
 # ==========================
 # OTP VERIFICATION (2FA STEP 2)
 # ==========================
-def verify_otp(request):
+async def verify_otp(request):
+    await aload_session(request)
     user_id = request.session.get("otp_user_id")
 
     if not user_id:
         messages.error(request, "Session expired. Please login again.")
         return redirect("login")
 
-    try:
-        user = User.objects.get(id=user_id)
-        otp_obj = OneTimePassword.objects.get(user=user)
-    except (User.DoesNotExist, OneTimePassword.DoesNotExist):
-        messages.error(request, "OTP verification failed.")
-        return redirect("login")
+    store = get_otp_store()
 
-    if request.method == "POST":
-        entered_otp = request.POST.get("otp")
+    if request.method != "POST":
+        if not await store.apending(user_id):
+            messages.error(request, "OTP verification failed.")
+            return redirect("login")
 
-        if otp_obj.code == entered_otp and not otp_obj.is_expired():
-            login(request, user)
+        return await sync_to_async(render)(request, "accounts/verify_otp.html")
 
-            # Cleanup
-            otp_obj.delete()
-            del request.session["otp_user_id"]
+    result = await store.averify(user_id, request.POST.get("otp"))
 
-            security_logger.info(f"2FA login successful: {user.username}")
-            return redirect("home")
+    if result == VERIFIED:
+        try:
+            user = await User.objects.aget(id=user_id)
+        except User.DoesNotExist:
+            messages.error(request, "OTP verification failed.")
+            return redirect("login")
+
+        # The password was checked in step 1; name the backend for login()
+        await sync_to_async(login)(
+            request, user, backend='django.contrib.auth.backends.ModelBackend'
+        )
 
-        messages.error(request, "Invalid or expired OTP")
+        # Cleanup
+        del request.session["otp_user_id"]
 
-    return render(request, "accounts/verify_otp.html")
+        security_logger.info("2FA login successful: %s", user.username)
+        return redirect("home")
+
+    if result in (EXPIRED, LOCKED):
+        del request.session["otp_user_id"]
+
+        if result == LOCKED:
+            security_logger.warning("OTP attempts exhausted for user id %s", user_id)
+            messages.error(request, "Too many incorrect codes. Please login again.")
+        else:
+            messages.error(request, "OTP expired. Please login again.")
+
+        return redirect("login")
+
+    messages.error(request, "Invalid or expired OTP")
+
+    return await sync_to_async(render)(request, "accounts/verify_otp.html")
 
 
 # ==========================
@@ -128,7 +149,7 @@ def profile(request):
         form = ProfileUpdateForm(request.POST, instance=request.user)
         if form.is_valid():
             form.save()
-            security_logger.info(f"Profile updated by {request.user.username}")
+            security_logger.info("Profile updated by %s", request.user.username)
             messages.success(request, "Profile updated successfully")
             return redirect("profile")
     else:
@@ -147,7 +168,7 @@ def change_password(request):
         if form.is_valid():
             user = form.save()
             update_session_auth_hash(request, user)
-            security_logger.info(f"Password changed by {request.user.username}")
+            security_logger.info("Password changed by %s", request.user.username)
             messages.success(request, "Password updated successfully")
             return redirect("profile")
     else:
@@ -159,18 +180,29 @@ def change_password(request):
 # ==========================
 # ERROR HANDLERS
 # ==========================
+@cache_anonymous_page('errors/400')
 def bad_request_view(request, exception=None):
     return render(request, "errors/400.html", status=400)
 
+@cache_anonymous_page('errors/403')
 def permission_denied_view(request, exception=None):
     return render(request, "errors/403.html", status=403)
 
+@cache_anonymous_page('errors/404')
 def page_not_found_view(request, exception):
     return render(request, "errors/404.html", status=404)
 
 def server_error_view(request):
     return render(request, "errors/500.html", status=500)
 
+# Axes lockout page: static, so one cached copy serves every locked-out login
+@cache_anonymous_page('account_locked', shared=True)
+def lockout_view(request, original_response=None, credentials=None):
+    return render(
+        request, settings.AXES_LOCKOUT_TEMPLATE,
+        status=getattr(settings, 'AXES_HTTP_RESPONSE_CODE', 429)
+    )
+
 
 # ==========================
 # TEST ROUTES
@@ -191,13 +223,15 @@ def test_500(request):
 @receiver(user_logged_in)
 def log_user_login(sender, request, user, **kwargs):
     if user.is_staff:
-        security_logger.info(f"Admin login: {user.username}")
+        security_logger.info("Admin login: %s", user.username)
     else:
-        security_logger.info(f"User login: {user.username}")
+        security_logger.info("User login: %s", user.username)
 
 @receiver(user_login_failed)
 def log_failed_login(sender, credentials, request, **kwargs):
     username = credentials.get("username", "UNKNOWN")
     security_logger.warning(
-        f"FAILED LOGIN – username={username} – time={timezone.now()}"
+        "FAILED LOGIN – username=%s – time=%s",
+        username,
+        timezone.now()
     )
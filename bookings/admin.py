@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Booking
+from .models import Booking, Waitlist
 
 
 @admin.register(Booking)
@@ -9,7 +9,7 @@ class BookingAdmin(admin.ModelAdmin):
         'user',
         'court',
         'booking_date',
-        'booking_time',
+        'slot',
         'created_at',
     )
 
@@ -26,3 +26,29 @@ class BookingAdmin(admin.ModelAdmin):
     ordering = (
         '-created_at',
     )
+
+    @admin.display(description='Time', ordering='booking_time')
+    def slot(self, obj):
+        return obj.time_label
+
+
+@admin.register(Waitlist)
+class WaitlistAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'user',
+        'sport',
+        'court',
+        'booking_date',
+        'booking_time',
+        'created_at',
+    )
+
+    list_filter = (
+        'sport',
+        'booking_date',
+    )
+
+    search_fields = (
+        'user__username',
+    )
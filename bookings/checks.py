@@ -0,0 +1,51 @@
+from django.core.checks import Error, Tags, register
+from django.db import DatabaseError
+from django.utils import timezone
+
+from .models import Booking, SLOT_MINUTES, TIME_SLOTS
+
+
+# ==========================
+# SLOT GRID
+# ==========================
+@register(Tags.database)
+def check_upcoming_bookings_on_grid(app_configs, databases=None, **kwargs):
+    """
+    Upcoming bookings must sit on the current TIME_SLOTS grid with the
+    current slot length. After BOOKING_SLOT_MINUTES changes, older rows
+    would otherwise vanish from the availability grid and slip past
+    unique_court_booking, which only compares start times. Runs with
+    `migrate` and `check --database`.
+    """
+    errors = []
+
+    for alias in databases or ():
+        try:
+            off_grid = list(
+                Booking.objects.using(alias)
+                .filter(booking_date__gte=timezone.localdate())
+                .exclude(
+                    booking_time__in=[minutes for minutes, _label in TIME_SLOTS],
+                    slot_minutes=SLOT_MINUTES
+                )
+                .values_list('pk', flat=True)[:21]
+            )
+        except DatabaseError:
+            # Not migrated yet
+            continue
+
+        if off_grid:
+            shown = ', '.join(str(pk) for pk in off_grid[:20])
+            errors.append(Error(
+                f"Upcoming bookings on database '{alias}' do not fit the "
+                f"{SLOT_MINUTES}-minute slot grid (ids {shown}"
+                f"{', ...' if len(off_grid) > 20 else ''}).",
+                hint=(
+                    "Move or cancel them, or restore the previous "
+                    "BOOKING_SLOT_MINUTES until they have passed."
+                ),
+                obj=Booking,
+                id='bookings.E001',
+            ))
+
+    return errors
@@ -1,13 +1,75 @@
 from django import forms
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
+from django.db import IntegrityError, OperationalError
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 
-from .models import Booking, TIME_SLOTS
-from courts.models import Court
+from .models import Booking, SLOT_MINUTES, TIME_SLOTS, Waitlist, slot_start_time
+from .utils import is_held_by_other, is_lock_timeout, write_atomic
+from courts.catalog import get_available_courts
+from courts.models import Court, normalize_sport
+
+
+SLOT_TAKEN_MESSAGE = "This time slot is already booked."
+BUSY_MESSAGE = "Bookings are busy right now. Please try again in a moment."
+SLOT_HELD_MESSAGE = (
+    "Someone else is booking this time slot right now. "
+    "Please try again in a few minutes."
+)
+
+
+class CatalogCourtChoiceField(forms.ModelChoiceField):
+    """
+    Court choice backed by a list from the court catalog instead of a
+    queryset, so rendering and validating the form need no court query.
+    """
+
+    def __init__(self, courts=(), **kwargs):
+        self._courts = list(courts)
+        super().__init__(queryset=Court.objects.none(), **kwargs)
+
+    @property
+    def courts(self):
+        return self._courts
+
+    @courts.setter
+    def courts(self, courts):
+        self._courts = list(courts)
+        self.widget.choices = self.choices
+
+    def _get_choices(self):
+        choices = [(court.pk, self.label_from_instance(court)) for court in self._courts]
+        if self.empty_label is not None:
+            choices.insert(0, ('', self.empty_label))
+        return choices
+
+    choices = property(_get_choices, forms.ChoiceField._set_choices)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+
+        for court in self._courts:
+            if str(court.pk) == str(value):
+                return court
+
+        raise ValidationError(
+            self.error_messages['invalid_choice'],
+            code='invalid_choice',
+            params={'value': value},
+        )
 
 
 class BookingForm(forms.ModelForm):
+    court = CatalogCourtChoiceField(
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    booking_time = forms.TypedChoiceField(
+        choices=TIME_SLOTS,
+        coerce=int,
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    slot_minutes = SLOT_MINUTES
 
     class Meta:
         model = Booking
@@ -17,33 +79,27 @@ class BookingForm(forms.ModelForm):
             'booking_date': forms.DateInput(
                 attrs={'type': 'date', 'class': 'form-control'}
             ),
-            'booking_time': forms.Select(
-                choices=TIME_SLOTS,
-                attrs={'class': 'form-control'}
-            ),
         }
 
     def __init__(self, *args, **kwargs):
         self.sport = kwargs.pop('sport', None)
+        self.user = kwargs.pop('user', None)
+        # False = insert-first: let unique_court_booking catch duplicates
+        self.check_conflicts = kwargs.pop('check_conflicts', True)
         super().__init__(*args, **kwargs)
 
         self.fields['court'].empty_label = None
+        courts = []
 
         if self.sport:
-            queryset = Court.objects.filter(
-                sport_type__iexact=self.sport,
-                is_available=True
-            )
+            courts = get_available_courts(self.sport)
 
             # Allow current court during edit
-            if self.instance.pk and self.instance.court:
-                queryset = queryset | Court.objects.filter(
-                    pk=self.instance.court.pk
-                )
+            current = self.instance.court if self.instance.pk else None
+            if current and current.pk not in {court.pk for court in courts}:
+                courts.append(current)
 
-            self.fields['court'].queryset = queryset.distinct()
-        else:
-            self.fields['court'].queryset = Court.objects.none()
+        self.fields['court'].courts = courts
 
     # ==========================
     # DATE VALIDATION
@@ -80,23 +136,19 @@ class BookingForm(forms.ModelForm):
                 return cleaned_data
 
         # ==========================
-        # PREVENT PAST DATE + TIME
+        # RESPECT OTHER USERS' HOLDS
         # ==========================
-        if booking_date and booking_time:
-            try:
-                # IMPORTANT: booking_time is a STRING like "21:00" or "21:00 – 22:00"
-                start_time_str = booking_time.split("–")[0].strip()
-                booking_time_obj = datetime.strptime(
-                    start_time_str, "%H:%M"
-                ).time()
-            except Exception:
-                raise ValidationError(
-                    "Invalid booking time format."
-                )
+        if self.user and court and booking_date and booking_time is not None:
+            if is_held_by_other(self.user.id, court.pk, booking_date, booking_time):
+                raise ValidationError(SLOT_HELD_MESSAGE)
 
+        # ==========================
+        # PREVENT PAST DATE + TIME
+        # ==========================
+        if booking_date and booking_time is not None:
             booking_datetime = datetime.combine(
                 booking_date,
-                booking_time_obj
+                slot_start_time(booking_time)
             )
 
             # Make timezone-aware
@@ -110,7 +162,10 @@ class BookingForm(forms.ModelForm):
         # ==========================
         # PREVENT DUPLICATE BOOKINGS
         # ==========================
-        if court and booking_date and booking_time:
+        if (
+            self.check_conflicts and court and booking_date and
+            booking_time is not None
+        ):
             existing_booking = Booking.objects.filter(
                 court=court,
                 booking_date=booking_date,
@@ -123,8 +178,204 @@ class BookingForm(forms.ModelForm):
                 )
 
             if existing_booking.exists():
-                raise ValidationError(
-                    "This time slot is already booked."
-                )
+                raise ValidationError(SLOT_TAKEN_MESSAGE)
+
+        return cleaned_data
+
+    def _get_validation_exclusions(self):
+        exclude = super()._get_validation_exclusions()
+
+        # Skip the model's pre-check queries as well: the court already
+        # came from this form's queryset and the database enforces both
+        # the foreign key and unique_court_booking on insert.
+        if not self.check_conflicts:
+            exclude.update({'court', 'booking_time'})
+
+        return exclude
+
+    # ==========================
+    # INSERT-FIRST SAVE
+    # ==========================
+    def save_booking(self, user=None):
+        """
+        Insert (or update) the booking inside a savepoint and turn a
+        unique_court_booking violation into the usual form error, and a
+        timed-out wait for the write lock into BUSY_MESSAGE.
+
+        Returns the saved booking, or None if the slot was taken.
+        """
+        booking = self.save(commit=False)
+
+        if user is not None:
+            booking.user = user
+
+        try:
+            with write_atomic():
+                booking.save()
+        except IntegrityError as exc:
+            if 'unique' not in str(exc).lower():
+                raise
+            self.add_error(None, SLOT_TAKEN_MESSAGE)
+            return None
+        except OperationalError as exc:
+            if not is_lock_timeout(exc):
+                raise
+            self.add_error(None, BUSY_MESSAGE)
+            return None
+
+        return booking
+
+
+# ==========================
+# SLOT HOLD
+# ==========================
+class SlotHoldForm(forms.Form):
+    court = forms.IntegerField(min_value=1)
+    booking_date = forms.DateField()
+    booking_time = forms.TypedChoiceField(choices=TIME_SLOTS, coerce=int)
+
+    def clean_booking_date(self):
+        booking_date = self.cleaned_data.get('booking_date')
+
+        if booking_date and booking_date < date.today():
+            raise ValidationError("Booking date cannot be in the past.")
+
+        return booking_date
+
+
+# ==========================
+# WAITLIST
+# ==========================
+class WaitlistForm(forms.ModelForm):
+    booking_time = forms.TypedChoiceField(choices=TIME_SLOTS, coerce=int)
+    any_court = forms.BooleanField(required=False)
+
+    class Meta:
+        model = Waitlist
+        fields = ['court', 'booking_date', 'booking_time']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['court'].required = True
+
+    def clean(self):
+        cleaned_data = super().clean()
+
+        court = cleaned_data.get('court')
+        booking_date = cleaned_data.get('booking_date')
+        booking_time = cleaned_data.get('booking_time')
+
+        if not court or not booking_date or booking_time is None:
+            return cleaned_data
+
+        starts_at = timezone.make_aware(
+            datetime.combine(booking_date, slot_start_time(booking_time))
+        )
+        if starts_at <= timezone.now():
+            raise ValidationError(
+                "You cannot join the waitlist for a past date or time."
+            )
 
         return cleaned_data
+
+    def save(self, commit=True):
+        entry = super().save(commit=False)
+        entry.sport = entry.court.sport_type
+
+        # Waiting for any court of the sport
+        if self.cleaned_data.get('any_court'):
+            entry.court = None
+
+        if commit:
+            entry.save()
+
+        return entry
+
+
+# ==========================
+# RECURRING BOOKINGS
+# ==========================
+MAX_RECURRING_BOOKINGS = 60
+
+PATTERN_CHOICES = [
+    ('weekly', 'Weekly'),
+    ('daily', 'Daily'),
+]
+
+PATTERN_STEP_DAYS = {
+    'weekly': 7,
+    'daily': 1,
+}
+
+
+class RecurringBookingForm(forms.Form):
+    courts = forms.ModelMultipleChoiceField(
+        queryset=Court.objects.none(),
+        widget=forms.CheckboxSelectMultiple
+    )
+    booking_time = forms.TypedChoiceField(
+        choices=TIME_SLOTS,
+        coerce=int,
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    pattern = forms.ChoiceField(
+        choices=PATTERN_CHOICES,
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    start_date = forms.DateField(
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'})
+    )
+    end_date = forms.DateField(
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'})
+    )
+
+    def __init__(self, *args, **kwargs):
+        self.sport = kwargs.pop('sport', None)
+        super().__init__(*args, **kwargs)
+
+        if self.sport:
+            self.fields['courts'].queryset = Court.objects.filter(
+                sport_type=normalize_sport(self.sport),
+                is_available=True
+            ).order_by('name')
+
+    def clean(self):
+        cleaned_data = super().clean()
+
+        start_date = cleaned_data.get('start_date')
+        end_date = cleaned_data.get('end_date')
+        booking_time = cleaned_data.get('booking_time')
+        courts = cleaned_data.get('courts')
+        pattern = cleaned_data.get('pattern')
+
+        if booking_time is None or not (start_date and end_date and courts and pattern):
+            return cleaned_data
+
+        if end_date < start_date:
+            raise ValidationError("End date must be on or after the start date.")
+
+        first_start = timezone.make_aware(
+            datetime.combine(start_date, slot_start_time(booking_time))
+        )
+        if first_start <= timezone.now():
+            raise ValidationError(
+                "You cannot create a booking for a past date or time."
+            )
+
+        if len(self.get_dates()) * len(courts) > MAX_RECURRING_BOOKINGS:
+            raise ValidationError(
+                f"A recurring booking can cover at most "
+                f"{MAX_RECURRING_BOOKINGS} court slots."
+            )
+
+        return cleaned_data
+
+    def get_dates(self):
+        start_date = self.cleaned_data['start_date']
+        end_date = self.cleaned_data['end_date']
+        step = PATTERN_STEP_DAYS[self.cleaned_data['pattern']]
+
+        return [
+            start_date + timedelta(days=offset)
+            for offset in range(0, (end_date - start_date).days + 1, step)
+        ]
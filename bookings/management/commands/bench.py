@@ -0,0 +1,267 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import OutboxEmail
+from bookings.models import Booking, TIME_SLOTS
+from courts.models import Court
+from logs.models import AuditLog
+from logs.writer import get_audit_writer
+
+PASSWORD = 'bench-pass-123'
+SPORT = Court.SPORT_CHOICES[0][0]
+
+# Operation weights per client role
+MIXES = {
+    'member': {
+        'my_bookings': 40,
+        'create_booking': 25,
+        'update_booking': 10,
+        'delete_booking': 10,
+        'dashboard': 10,
+        'login': 5,
+    },
+    'staff': {
+        'audit_log': 50,
+        'my_bookings': 30,
+        'create_booking': 15,
+        'login': 5,
+    },
+}
+
+QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def percentile(values, fraction):
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the real routes (create_booking, my_bookings, update_booking, "
+        "delete_booking, dashboard, login/verify_otp, audit_log) from many "
+        "concurrent in-process clients with a seeded, replayable mix. "
+        "Reports throughput, p50/p95/p99 latency and queries per request "
+        "per route, and writes them as JSON. Rows created by the run are "
+        "removed afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=8)
+        parser.add_argument(
+            '--requests', type=int, default=50,
+            help="Requests per client after logging in."
+        )
+        parser.add_argument(
+            '--staff', type=int, default=1,
+            help="How many of the clients are staff (they read the audit log)."
+        )
+        parser.add_argument('--courts', type=int, default=4)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--output',
+            help="JSON results path; default bench-results/<timestamp>.json."
+        )
+
+    def handle(self, *args, **options):
+        self.courts = [
+            Court.objects.create(name=f'Bench Court {index}', sport_type=SPORT)
+            for index in range(options['courts'])
+        ]
+        users = [
+            User.objects.create_user(
+                f'bench-client-{index}', f'bench-client-{index}@example.com', PASSWORD,
+                is_staff=index < options['staff']
+            )
+            for index in range(options['clients'])
+        ]
+
+        self.latencies = defaultdict(list)
+        self.queries = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.lock = threading.Lock()
+
+        try:
+            with override_settings(
+                ALLOWED_HOSTS=['testserver'],
+                AXES_ENABLED=False
+            ):
+                started = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=len(users)) as pool:
+                    list(pool.map(
+                        lambda args: self.run_client(*args, options),
+                        enumerate(users)
+                    ))
+                elapsed = time.perf_counter() - started
+        finally:
+            # Buffered entries still reference the bench users: write them
+            # now so the cleanup below removes them too
+            get_audit_writer().flush()
+            AuditLog.objects.filter(user__in=users).delete()
+            OutboxEmail.objects.filter(
+                recipients__in=[user.email for user in users]
+            ).delete()
+            for user in users:
+                user.delete()
+            for court in self.courts:
+                court.delete()
+
+        results = self.summarize(elapsed, options)
+        self.report(results)
+
+        output = options['output'] or os.path.join(
+            settings.BASE_DIR, 'bench-results',
+            f"bench-{timezone.now():%Y%m%d-%H%M%S}.json"
+        )
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+        with open(output, 'w') as handle:
+            json.dump(results, handle, indent=2)
+        self.stdout.write(f"Results written to {output}")
+
+    # ==========================
+    # CLIENTS
+    # ==========================
+    def run_client(self, index, user, options):
+        rng = random.Random(options['seed'] * 1000 + index)
+        client = Client(raise_request_exception=False)
+        mix = MIXES['staff' if user.is_staff else 'member']
+        operations, weights = list(mix), list(mix.values())
+
+        self.login(client, user)
+        for _ in range(options['requests']):
+            operation = rng.choices(operations, weights)[0]
+            getattr(self, operation)(client, user, rng)
+
+    def request(self, name, method, client, url, data=None):
+        started = time.perf_counter()
+        response = getattr(client, method)(url, data or {})
+        latency = (time.perf_counter() - started) * 1000
+
+        # Counted by config.metrics.PerformanceMiddleware
+        queries = QUERIES.search(response.get('Server-Timing', ''))
+        with self.lock:
+            self.latencies[name].append(latency)
+            self.statuses[name][response.status_code] += 1
+            if queries:
+                self.queries[name].append(int(queries.group(1)))
+        return response
+
+    def pick_slot(self, rng):
+        return {
+            'court': rng.choice(self.courts).pk,
+            'booking_date': (date.today() + timedelta(days=rng.randint(1, 14))).isoformat(),
+            'booking_time': rng.choice(TIME_SLOTS)[0],
+        }
+
+    def own_booking(self, user, rng):
+        ids = list(Booking.objects.filter(user=user).values_list('id', flat=True))
+        return rng.choice(ids) if ids else None
+
+    # ==========================
+    # OPERATIONS
+    # ==========================
+    def login(self, client, user, rng=None):
+        client.logout()
+        self.request('login', 'post', client, reverse('login'), {
+            'username': user.username, 'password': PASSWORD,
+        })
+
+        email = OutboxEmail.objects.filter(recipients=user.email).latest('id')
+        code = re.search(r'\b(\d{6})\b', email.body).group(1)
+        self.request('verify_otp', 'post', client, reverse('verify_otp'), {'otp': code})
+
+    def my_bookings(self, client, user, rng):
+        self.request('my_bookings', 'get', client, reverse('my_bookings'))
+
+    def dashboard(self, client, user, rng):
+        self.request('dashboard', 'get', client, reverse('dashboard'))
+
+    def audit_log(self, client, user, rng):
+        self.request('audit_log', 'get', client, reverse('audit_log'))
+
+    def create_booking(self, client, user, rng):
+        self.request(
+            'create_booking', 'post', client,
+            f"{reverse('create_booking')}?sport={SPORT}", self.pick_slot(rng)
+        )
+
+    def update_booking(self, client, user, rng):
+        booking_id = self.own_booking(user, rng)
+        if booking_id is None:
+            return self.create_booking(client, user, rng)
+        self.request(
+            'update_booking', 'post', client,
+            reverse('update_booking', args=[booking_id]), self.pick_slot(rng)
+        )
+
+    def delete_booking(self, client, user, rng):
+        booking_id = self.own_booking(user, rng)
+        if booking_id is None:
+            return self.create_booking(client, user, rng)
+        self.request(
+            'delete_booking', 'post', client,
+            reverse('delete_booking', args=[booking_id])
+        )
+
+    # ==========================
+    # RESULTS
+    # ==========================
+    def summarize(self, elapsed, options):
+        routes = {}
+        for name, latencies in sorted(self.latencies.items()):
+            latencies.sort()
+            queries = self.queries[name]
+            routes[name] = {
+                'requests': len(latencies),
+                'errors': sum(
+                    count for status, count in self.statuses[name].items() if status >= 500
+                ),
+                'statuses': {str(status): count for status, count in self.statuses[name].items()},
+                'p50_ms': round(percentile(latencies, 0.50), 2),
+                'p95_ms': round(percentile(latencies, 0.95), 2),
+                'p99_ms': round(percentile(latencies, 0.99), 2),
+                'queries_per_request': round(sum(queries) / len(queries), 2) if queries else None,
+            }
+
+        total = sum(route['requests'] for route in routes.values())
+        return {
+            'timestamp': timezone.now().isoformat(),
+            'options': {
+                key: options[key]
+                for key in ('clients', 'requests', 'staff', 'courts', 'seed')
+            },
+            'elapsed_seconds': round(elapsed, 3),
+            'requests': total,
+            'throughput_rps': round(total / elapsed, 2),
+            'errors': sum(route['errors'] for route in routes.values()),
+            'routes': routes,
+        }
+
+    def report(self, results):
+        self.stdout.write(
+            f"{results['requests']} requests in {results['elapsed_seconds']} s: "
+            f"{results['throughput_rps']} req/s, {results['errors']} errors"
+        )
+        self.stdout.write(
+            f"{'route':<16}{'requests':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}"
+        )
+        for name, route in results['routes'].items():
+            queries = route['queries_per_request']
+            self.stdout.write(
+                f"{name:<16}{route['requests']:>9}{route['p50_ms']:>9.1f}"
+                f"{route['p95_ms']:>9.1f}{route['p99_ms']:>9.1f}"
+                f"{queries if queries is not None else '-':>9}"
+            )
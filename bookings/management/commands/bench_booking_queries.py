@@ -0,0 +1,72 @@
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from bookings.forms import BookingForm
+from bookings.models import TIME_SLOTS
+from courts.models import Court
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare queries per successful booking for the check-then-insert "
+        "and insert-first paths. Rows created by the run are removed afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bookings', type=int, default=100)
+
+    def handle(self, *args, **options):
+        count = options['bookings']
+
+        user = User.objects.create_user('bench-booking-user')
+        court = Court.objects.create(name='Bench Court', sport_type='tennis')
+
+        try:
+            precheck = self.run(user, court, count, check_conflicts=True, offset=1)
+            insert_first = self.run(user, court, count, check_conflicts=False,
+                                    offset=count + 1)
+        finally:
+            court.delete()
+            user.delete()
+
+        for label, (total, selects) in (
+            ('check-then-insert', precheck),
+            ('insert-first', insert_first),
+        ):
+            self.stdout.write(
+                f"{label:<18} {total:.2f} queries/booking "
+                f"({selects:.2f} SELECTs)"
+            )
+
+    def run(self, user, court, count, check_conflicts, offset):
+        slots = [value for value, _label in TIME_SLOTS]
+        start = date.today() + timedelta(days=offset)
+
+        with CaptureQueriesContext(connection) as queries:
+            for index in range(count):
+                form = BookingForm(
+                    {
+                        'court': court.pk,
+                        'booking_date': start + timedelta(days=index // len(slots)),
+                        'booking_time': slots[index % len(slots)],
+                    },
+                    sport=court.sport_type,
+                    check_conflicts=check_conflicts,
+                )
+                assert form.is_valid(), form.errors
+
+                if check_conflicts:
+                    booking = form.save(commit=False)
+                    booking.user = user
+                    booking.save()
+                else:
+                    assert form.save_booking(user=user)
+
+        selects = sum(
+            1 for query in queries if query['sql'].startswith('SELECT')
+        )
+        return len(queries) / count, selects / count
@@ -0,0 +1,157 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections
+
+from bookings.models import Booking, TIME_SLOTS
+from bookings.utils import write_atomic
+from courts.models import Court
+from logs.models import AuditLog
+
+BACKENDS = (
+    # Django's stock backend: rollback journal, deferred BEGIN
+    ('stock', 'django.db.backends.sqlite3'),
+    ('production', 'config.db_backends.sqlite3'),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Run concurrent booking inserts (check, insert booking + audit row "
+        "in one transaction) against readers of a My Bookings page, once on "
+        "stock SQLite and once on the production backend, each on a fresh "
+        "temporary database file. Reports reader latency, writer "
+        "throughput and 'database is locked' errors."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument(
+            '--bookings', type=int, default=200,
+            help="Bookings inserted by each writer thread."
+        )
+
+    def handle(self, *args, **options):
+        directory = tempfile.mkdtemp(prefix='bench-sqlite-')
+
+        try:
+            for label, engine in BACKENDS:
+                alias = f'bench_{label}'
+                connections.settings[alias] = connections.configure_settings({
+                    'default': {
+                        'ENGINE': engine,
+                        'NAME': os.path.join(directory, f'{label}.sqlite3'),
+                    }
+                })['default']
+
+                try:
+                    call_command('migrate', database=alias, verbosity=0)
+                    self.report(label, self.run(alias, options))
+                finally:
+                    connections[alias].close()
+                    del connections.settings[alias]
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def report(self, label, result):
+        reads = sorted(result['reads'])
+        self.stdout.write(
+            f"{label:<11} reads: {len(reads)} "
+            f"p50 {reads[len(reads) // 2]:.1f} ms, "
+            f"p95 {reads[int(len(reads) * 0.95) - 1]:.1f} ms, "
+            f"max {reads[-1]:.1f} ms | "
+            f"writes: {result['written'] / result['elapsed']:.0f}/s, "
+            f"{result['locked']} locked errors"
+        )
+
+    # ==========================
+    # WORKLOAD
+    # ==========================
+    def run(self, alias, options):
+        user = User.objects.db_manager(alias).create_user('bench-sqlite-user')
+        courts = [
+            Court.objects.using(alias).create(name=f'Bench Court {index}', sport_type='tennis')
+            for index in range(options['writers'])
+        ]
+        # Something on the page for the readers to fetch
+        Booking.objects.using(alias).bulk_create(
+            Booking(user=user, court=courts[0], booking_date=date.today() - timedelta(days=day),
+                    booking_time=TIME_SLOTS[0][0])
+            for day in range(1, 51)
+        )
+
+        result = {'reads': [], 'written': 0, 'locked': 0}
+        lock = threading.Lock()
+        writing = threading.Event()
+        writing.set()
+
+        def write(court):
+            slots = [value for value, _label in TIME_SLOTS]
+            written = locked = 0
+            try:
+                for index in range(options['bookings']):
+                    day = date.today() + timedelta(days=1 + index // len(slots))
+                    slot = slots[index % len(slots)]
+                    try:
+                        with write_atomic(using=alias):
+                            taken = Booking.objects.using(alias).filter(
+                                court=court, booking_date=day, booking_time=slot
+                            ).exists()
+                            if not taken:
+                                Booking.objects.using(alias).create(
+                                    user=user, court=court,
+                                    booking_date=day, booking_time=slot
+                                )
+                                AuditLog.objects.using(alias).create(
+                                    user=user, action='BOOKING_CREATE'
+                                )
+                        written += 1
+                    except OperationalError as exc:
+                        if 'locked' not in str(exc):
+                            raise
+                        locked += 1
+            finally:
+                connections[alias].close()
+                with lock:
+                    result['written'] += written
+                    result['locked'] += locked
+
+        def read():
+            timings = []
+            try:
+                while writing.is_set():
+                    started = time.perf_counter()
+                    list(
+                        Booking.objects.using(alias).filter(user=user)
+                        .select_related('court')
+                        .order_by('-booking_date', '-booking_time')[:20]
+                    )
+                    timings.append((time.perf_counter() - started) * 1000)
+            finally:
+                connections[alias].close()
+                with lock:
+                    result['reads'].extend(timings)
+
+        writers = [threading.Thread(target=write, args=(court,)) for court in courts]
+        readers = [threading.Thread(target=read) for _ in range(options['readers'])]
+
+        started = time.perf_counter()
+        for thread in readers + writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        result['elapsed'] = time.perf_counter() - started
+
+        writing.clear()
+        for thread in readers:
+            thread.join()
+
+        return result
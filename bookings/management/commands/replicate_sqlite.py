@@ -0,0 +1,63 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+def replicate(source, targets):
+    """Copy the SQLite database at source onto each target path."""
+    primary = sqlite3.connect(source)
+    try:
+        for target in targets:
+            replica = sqlite3.connect(target)
+            try:
+                # Page-by-page online copy; readers of the replica just
+                # see the old or the new snapshot
+                primary.backup(replica)
+            finally:
+                replica.close()
+    finally:
+        primary.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Stand-in for replication when running locally with SQLite: copy "
+        "the default database onto every DATABASE_REPLICAS file, once or "
+        "every --interval seconds with --loop."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help="Keep copying instead of exiting after one pass."
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help="Seconds between copies with --loop; the replica lag."
+        )
+
+    def handle(self, *args, **options):
+        source = settings.DATABASES['default']['NAME']
+        targets = [
+            settings.DATABASES[alias]['NAME'] for alias in settings.DATABASE_REPLICAS
+        ]
+        if not targets:
+            self.stdout.write("No DATABASE_REPLICAS configured (set DB_REPLICAS)")
+            return
+
+        try:
+            while True:
+                started = time.perf_counter()
+                replicate(source, targets)
+                self.stdout.write(
+                    f"Copied to {len(targets)} replica(s) in "
+                    f"{(time.perf_counter() - started) * 1000:.0f} ms"
+                )
+
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,292 @@
+import random
+import time
+from datetime import datetime, timedelta
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from bookings.models import Booking, SLOT_MINUTES, TIME_SLOTS
+from courts.catalog import invalidate_court_catalog
+from courts.models import Court
+from logs.models import AuditLog
+
+USER_PREFIX = 'seed-user-'
+COURT_PREFIX = 'Seed '
+
+# Occupancy from each hour on until the next entry: quiet mornings,
+# a lunch bump and an evening peak
+DEFAULT_CURVE = '8:0.3,12:0.5,14:0.35,17:0.9,21:0.6'
+
+
+def parse_curve(value):
+    try:
+        points = sorted(
+            (int(hour), float(share))
+            for hour, share in (item.split(':') for item in value.split(','))
+        )
+    except ValueError:
+        raise CommandError(f"Invalid --curve {value!r}; expected HOUR:SHARE,...")
+
+    def occupancy(minutes):
+        share = 0.0
+        for hour, value in points:
+            if minutes >= hour * 60:
+                share = value
+        return share
+
+    return occupancy
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a repeatable synthetic dataset: users, courts per sport and "
+        "months of Booking and AuditLog history following an occupancy curve. "
+        "Rows go in as chunked bulk inserts, which send no model signals. The "
+        "same --seed and --end-date give the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--courts-per-sport', type=int, default=4)
+        parser.add_argument(
+            '--months', type=int, default=6,
+            help="Months of booking history before --end-date."
+        )
+        parser.add_argument(
+            '--future-days', type=int, default=14,
+            help="Days of upcoming bookings after --end-date."
+        )
+        parser.add_argument(
+            '--end-date', type=parse_date, default=None,
+            help="Last day of history (YYYY-MM-DD); defaults to today."
+        )
+        parser.add_argument(
+            '--curve', default=DEFAULT_CURVE,
+            help="Share of slots booked from each hour on, as HOUR:SHARE,..."
+        )
+        parser.add_argument(
+            '--occupancy', type=float, default=1.0,
+            help="Multiplier on the whole curve."
+        )
+        parser.add_argument(
+            '--weekend', type=float, default=1.25,
+            help="Extra occupancy multiplier on Saturdays and Sundays."
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=20000,
+            help="Bookings per insert transaction."
+        )
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--clear', action='store_true',
+            help="Delete the rows of an earlier seed_data run first."
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.chunk_size = options['chunk_size']
+        started = time.perf_counter()
+
+        if options['clear']:
+            self.clear()
+        elif User.objects.filter(username__startswith=USER_PREFIX).exists():
+            raise CommandError("Seed data already present; rerun with --clear.")
+
+        user_ids = self.create_users(options['users'])
+        courts = self.create_courts(options['courts_per_sport'])
+        bookings, audits = self.create_history(user_ids, courts, options)
+
+        invalidate_court_catalog()
+
+        self.stdout.write(
+            f"Inserted {len(user_ids)} users, {len(courts)} courts, {bookings} "
+            f"bookings and {audits} audit rows in {time.perf_counter() - started:.1f} s"
+        )
+        self.report()
+
+    # ==========================
+    # ROWS
+    # ==========================
+    def clear(self):
+        users = User.objects.filter(username__startswith=USER_PREFIX)
+        courts = Court.objects.filter(name__startswith=COURT_PREFIX)
+
+        # Booking has delete receivers, so QuerySet.delete() would load and
+        # signal every seeded row; nothing references a Booking, so a
+        # single DELETE is safe. The few courts and users left go through
+        # the ORM and cascade as usual.
+        quote = connection.ops.quote_name
+        courts_sql, params = courts.values('pk').query.sql_with_params()
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {quote(Booking._meta.db_table)} "
+                f"WHERE {quote(Booking._meta.get_field('court').column)} IN ({courts_sql})",
+                params
+            )
+            AuditLog.objects.filter(user__in=users).delete()
+            courts.delete()
+            users.delete()
+
+    def bulk_create(self, model, rows):
+        count = 0
+        for chunk in chunked(rows, self.chunk_size):
+            with transaction.atomic():
+                model.objects.bulk_create(chunk, batch_size=self.chunk_size)
+            count += len(chunk)
+        return count
+
+    def create_users(self, count):
+        # Hashing is the slow part of create_user; every seed user shares one
+        password = make_password('seed-pass-123')
+        self.bulk_create(User, (
+            User(
+                username=f'{USER_PREFIX}{index:06d}',
+                email=f'{USER_PREFIX}{index:06d}@example.com',
+                password=password,
+            )
+            for index in range(count)
+        ))
+        return list(
+            User.objects.filter(username__startswith=USER_PREFIX)
+            .order_by('id').values_list('id', flat=True)
+        )
+
+    def create_courts(self, per_sport):
+        self.bulk_create(Court, (
+            Court(name=f'{COURT_PREFIX}{label} Court {number}', sport_type=sport)
+            for sport, label in Court.SPORT_CHOICES
+            for number in range(1, per_sport + 1)
+        ))
+        return list(
+            Court.objects.filter(name__startswith=COURT_PREFIX)
+            .order_by('id').values_list('id', flat=True)
+        )
+
+    def insert_sql(self, model, fields):
+        quote = connection.ops.quote_name
+        columns = [quote(model._meta.get_field(name).column) for name in fields]
+        return (
+            f"INSERT INTO {quote(model._meta.db_table)} ({', '.join(columns)}) "
+            f"VALUES ({', '.join(['%s'] * len(columns))})"
+        )
+
+    def create_history(self, user_ids, court_ids, options):
+        """
+        Booking and AuditLog rows go in as plain parameter tuples through
+        executemany: at millions of rows, building model instances and
+        compiling bulk_create's SQL costs several times the inserts.
+        """
+        end = options['end_date'] or timezone.localdate()
+        start = end - timedelta(days=options['months'] * 30)
+        days = [
+            start + timedelta(days=offset)
+            for offset in range((end - start).days + options['future_days'] + 1)
+        ]
+
+        curve = parse_curve(options['curve'])
+        occupancy = {
+            weekend: [
+                (minutes, min(1.0, curve(minutes) * options['occupancy']
+                              * (options['weekend'] if weekend else 1)))
+                for minutes, _label in TIME_SLOTS
+            ]
+            for weekend in (False, True)
+        }
+
+        ops = connection.ops
+        # The dataset's "now": nothing is booked after --end-date begins,
+        # which keeps reruns identical and never runs ahead of the clock
+        booked_until = timezone.make_aware(datetime.combine(end, datetime.min.time()))
+        booking_sql = self.insert_sql(
+            Booking,
+            ['user', 'court', 'booking_date', 'booking_time', 'slot_minutes', 'created_at']
+        )
+        audit_sql = self.insert_sql(AuditLog, ['user', 'action', 'ip_address', 'timestamp'])
+
+        rng = self.rng
+        audits = []
+        bookings = audit_count = 0
+
+        def generate():
+            for day in days:
+                midnight = timezone.make_aware(datetime.combine(day, datetime.min.time()))
+                booking_date = ops.adapt_datefield_value(day)
+
+                for court_id in court_ids:
+                    for minutes, share in occupancy[day.weekday() >= 5]:
+                        if rng.random() >= share:
+                            continue
+
+                        user_id = rng.choice(user_ids)
+                        # Booked up to two weeks ahead, from the user's "home" address
+                        booked_at = min(booked_until, midnight + timedelta(
+                            minutes=minutes - rng.randint(30, 14 * 24 * 60)
+                        ))
+                        ip_address = f'10.{user_id // 65536 % 256}.{user_id // 256 % 256}.{user_id % 256}'
+
+                        if rng.random() < 0.05:
+                            audits.append((
+                                user_id, 'LOGIN_FAILED', ip_address,
+                                ops.adapt_datetimefield_value(booked_at - timedelta(minutes=3))
+                            ))
+                        audits.append((
+                            user_id, 'LOGIN_SUCCESS', ip_address,
+                            ops.adapt_datetimefield_value(booked_at - timedelta(minutes=2))
+                        ))
+                        audits.append((
+                            user_id, 'BOOKING_CREATE', ip_address,
+                            ops.adapt_datetimefield_value(booked_at)
+                        ))
+
+                        yield (
+                            user_id, court_id, booking_date, minutes, SLOT_MINUTES,
+                            ops.adapt_datetimefield_value(booked_at)
+                        )
+
+        for chunk in chunked(generate(), self.chunk_size):
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany(booking_sql, chunk)
+                cursor.executemany(audit_sql, audits)
+
+            bookings += len(chunk)
+            audit_count += len(audits)
+            audits.clear()
+
+            if bookings % (self.chunk_size * 20) == 0:
+                self.stdout.write(f"  {bookings} bookings...")
+
+        return bookings, audit_count
+
+    # ==========================
+    # REPORT
+    # ==========================
+    def database_size(self):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute("PRAGMA page_count")
+                pages = cursor.fetchone()[0]
+                cursor.execute("PRAGMA page_size")
+                return pages * cursor.fetchone()[0]
+            if connection.vendor == 'postgresql':
+                cursor.execute("SELECT pg_database_size(current_database())")
+                return cursor.fetchone()[0]
+        return None
+
+    def report(self):
+        size = self.database_size()
+        if size is not None:
+            self.stdout.write(f"Database size: {size / 1024 / 1024:.1f} MiB")
+
+        for model in (User, Court, Booking, AuditLog):
+            self.stdout.write(f"  {model._meta.label:<20} {model.objects.count():>12}")
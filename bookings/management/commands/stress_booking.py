@@ -0,0 +1,268 @@
+import multiprocessing
+import random
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from bookings.forms import BUSY_MESSAGE, SLOT_TAKEN_MESSAGE
+from bookings.models import Booking, TIME_SLOTS
+from courts.models import Court
+from logs.models import AuditLog
+from logs.writer import get_audit_writer
+
+WIN, LOSE, BUSY, ERROR, OTHER = 'win', 'lose', 'busy', 'error', 'other'
+SLOT_TAKEN = SLOT_TAKEN_MESSAGE.encode()
+# Lock wait ran out; the client is told to retry
+BUSY_TEXT = BUSY_MESSAGE.encode()
+# Seconds the start line waits for every client before giving up
+START_TIMEOUT = 120
+
+
+def percentile(values, fraction):
+    return values[min(int(len(values) * fraction), len(values) - 1)] if values else 0.0
+
+
+def race(user_ids, slots, start, seed):
+    """
+    One worker: a thread per user, each trying every slot in its own
+    order once all workers are at the start line.
+    Returns [(slot index, outcome, status, latency ms), ...].
+    """
+    results = []
+    lock = threading.Lock()
+
+    # Log in one at a time, so only the race itself contends
+    clients = []
+    for user_id in user_ids:
+        client = Client(raise_request_exception=False)
+        client.force_login(User.objects.get(pk=user_id))
+        clients.append((user_id, client))
+
+    def attempt_all(user_id, client):
+        order = list(range(len(slots)))
+        random.Random(seed * 100003 + user_id).shuffle(order)
+        mine = []
+
+        try:
+            start.wait(START_TIMEOUT)
+            for index in order:
+                court_id, booking_date, booking_time = slots[index]
+                started = time.perf_counter()
+                response = client.post(
+                    f"{reverse('create_booking')}?sport={Court.SPORT_CHOICES[0][0]}",
+                    {
+                        'court': court_id,
+                        'booking_date': booking_date.isoformat(),
+                        'booking_time': booking_time,
+                    }
+                )
+                latency = (time.perf_counter() - started) * 1000
+
+                if response.status_code == 302:
+                    outcome = WIN
+                elif response.status_code == 503 and BUSY_TEXT in response.content:
+                    outcome = BUSY
+                elif response.status_code >= 500:
+                    outcome = ERROR
+                elif response.status_code == 200 and SLOT_TAKEN in response.content:
+                    outcome = LOSE
+                else:
+                    outcome = OTHER
+                mine.append((index, outcome, response.status_code, latency))
+        except Exception:
+            # Release everyone still waiting at the start line
+            start.abort()
+            raise
+        finally:
+            connection.close()
+            with lock:
+                results.extend(mine)
+
+    threads = [threading.Thread(target=attempt_all, args=pair) for pair in clients]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    get_audit_writer().flush()
+    connection.close()
+    return results
+
+
+def race_process(user_ids, slots, start, seed, queue):
+    try:
+        queue.put(race(user_ids, slots, start, seed))
+    except BaseException:
+        start.abort()
+        queue.put(None)
+        raise
+
+
+class Command(BaseCommand):
+    help = (
+        "Double-booking stress test: --processes forked workers with "
+        "--threads clients each race to book the same --slots through "
+        "create_booking. Fails unless every slot has exactly one booking, "
+        "no request returned a 500 and every BOOKING_CREATE audit row has "
+        "its booking; 503 'busy, retry' answers are counted, not failed. Runs on whatever 'default' is (SQLite, or PostgreSQL "
+        "with POSTGRES_DB set). Rows created by the run are removed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=4,
+            help="Forked worker processes; 0 runs the threads in this process."
+        )
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--slots', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        workers = max(options['processes'], 1)
+        sport = Court.SPORT_CHOICES[0][0]
+
+        court = Court.objects.create(name='Stress Court', sport_type=sport)
+        users = [
+            User.objects.create_user(f'stress-user-{index}')
+            for index in range(workers * options['threads'])
+        ]
+        day = date.today() + timedelta(days=1)
+        slots = [
+            (court.id, day + timedelta(days=index // len(TIME_SLOTS)),
+             TIME_SLOTS[index % len(TIME_SLOTS)][0])
+            for index in range(options['slots'])
+        ]
+        groups = [
+            [user.id for user in users[index::workers]] for index in range(workers)
+        ]
+
+        self.stdout.write(
+            f"{connection.vendor}: {len(users)} clients in {options['processes']} "
+            f"process(es) racing for {len(slots)} slots"
+        )
+
+        try:
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                results, elapsed = self.run(groups, slots, options)
+            failures = self.verify(court, users, slots, results)
+        finally:
+            AuditLog.objects.filter(user__in=users).delete()
+            court.delete()
+            for user in users:
+                user.delete()
+
+        self.report(results, elapsed)
+        if failures:
+            raise CommandError("; ".join(failures))
+        self.stdout.write("OK: one winner per slot, no 500s, no orphan audit rows")
+
+    def run(self, groups, slots, options):
+        if options['processes'] == 0:
+            start = threading.Barrier(len(groups[0]) + 1)
+            outcome = {}
+            runner = threading.Thread(
+                target=lambda: outcome.update(results=race(groups[0], slots, start, options['seed']))
+            )
+            runner.start()
+            start.wait(START_TIMEOUT)
+            started = time.perf_counter()
+            runner.join()
+            return outcome['results'], time.perf_counter() - started
+
+        # Children must not share the parent's database connections
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        start = context.Barrier(sum(len(group) for group in groups) + 1)
+        queue = context.Queue()
+        processes = [
+            context.Process(
+                target=race_process,
+                args=(group, slots, start, options['seed'], queue)
+            )
+            for group in groups
+        ]
+        for process in processes:
+            process.start()
+
+        try:
+            start.wait(START_TIMEOUT)
+            started = time.perf_counter()
+            batches = [queue.get() for _ in processes]
+            elapsed = time.perf_counter() - started
+        finally:
+            for process in processes:
+                process.join()
+
+        if None in batches:
+            raise CommandError("A worker process crashed; see its traceback above.")
+        return [row for batch in batches for row in batch], elapsed
+
+    # ==========================
+    # CHECKS
+    # ==========================
+    def verify(self, court, users, slots, results):
+        failures = []
+
+        booked = Counter(
+            Booking.objects.filter(court=court).values_list(
+                'court_id', 'booking_date', 'booking_time'
+            )
+        )
+        wins = Counter(index for index, outcome, _status, _ms in results if outcome == WIN)
+        for index, slot in enumerate(slots):
+            if booked[slot] != 1 or wins[index] != 1:
+                failures.append(
+                    f"slot {index}: {booked[slot]} booking(s), {wins[index]} winning response(s)"
+                )
+
+        statuses = Counter(
+            status for _index, outcome, status, _ms in results if outcome in (ERROR, OTHER)
+        )
+        if statuses:
+            failures.append(f"unexpected responses: {dict(statuses)}")
+
+        # Audit rows carry no booking id; per user they must match the bookings won
+        created = dict(
+            AuditLog.objects.filter(user__in=users, action='BOOKING_CREATE')
+            .values_list('user').annotate(rows=Count('id'))
+        )
+        owned = dict(
+            Booking.objects.filter(user__in=users)
+            .values_list('user').annotate(rows=Count('id'))
+        )
+        if created != owned:
+            orphans = sum(
+                max(rows - owned.get(user_id, 0), 0) for user_id, rows in created.items()
+            )
+            failures.append(
+                f"audit rows do not match bookings ({orphans} orphan BOOKING_CREATE row(s))"
+            )
+
+        return failures
+
+    def report(self, results, elapsed):
+        latencies = {WIN: [], LOSE: []}
+        for _index, outcome, _status, ms in results:
+            if outcome in latencies:
+                latencies[outcome].append(ms)
+
+        busy = sum(1 for _index, outcome, _status, _ms in results if outcome == BUSY)
+        self.stdout.write(
+            f"{len(results)} attempts in {elapsed:.2f} s: "
+            f"{len(latencies[WIN]) / elapsed:.1f} successful bookings/s, "
+            f"{len(results) / elapsed:.1f} attempts/s, {busy} busy (503)"
+        )
+        for outcome, label in ((WIN, 'winners'), (LOSE, 'rejected losers')):
+            values = sorted(latencies[outcome])
+            self.stdout.write(
+                f"  {label:<16} {len(values):>5}  p50 {percentile(values, 0.5):.1f} ms, "
+                f"p95 {percentile(values, 0.95):.1f} ms, max {percentile(values, 1):.1f} ms"
+            )
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_alter_booking_booking_time'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['user', 'booking_date', 'booking_time'], name='booking_user_date_time_idx'),
+        ),
+    ]
@@ -0,0 +1,84 @@
+from django.db import migrations, models
+from django.db.models import F, IntegerField, Value
+from django.db.models.functions import Cast, Concat, LPad, Mod, Substr
+
+
+# Set-based, one UPDATE each way: 'HH:MM' <-> minutes from midnight
+def time_strings_to_minutes(apps, schema_editor):
+    Booking = apps.get_model('bookings', 'Booking')
+
+    Booking.objects.using(schema_editor.connection.alias).update(
+        booking_minutes=(
+            Cast(Substr('booking_time', 1, 2), IntegerField()) * 60
+            + Cast(Substr('booking_time', 4, 2), IntegerField())
+        )
+    )
+
+
+def minutes_to_time_strings(apps, schema_editor):
+    Booking = apps.get_model('bookings', 'Booking')
+
+    def two_digits(expression):
+        # SQLite's MOD returns a float, so go through an integer first
+        number = Cast(expression, IntegerField())
+        return LPad(Cast(number, models.CharField()), 2, Value('0'))
+
+    Booking.objects.using(schema_editor.connection.alias).update(
+        booking_time=Concat(
+            two_digits(F('booking_minutes') / 60), Value(':'),
+            two_digits(Mod('booking_minutes', 60)),
+            output_field=models.CharField()
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0004_booking_user_date_time_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='booking_minutes',
+            field=models.PositiveSmallIntegerField(null=True),
+        ),
+        # Nullable so that unapplying can re-add the column before refilling it
+        migrations.AlterField(
+            model_name='booking',
+            name='booking_time',
+            field=models.CharField(choices=[('08:00', '08:00 – 09:00'), ('09:00', '09:00 – 10:00'), ('10:00', '10:00 – 11:00'), ('11:00', '11:00 – 12:00'), ('12:00', '12:00 – 13:00'), ('13:00', '13:00 – 14:00'), ('14:00', '14:00 – 15:00'), ('15:00', '15:00 – 16:00'), ('16:00', '16:00 – 17:00'), ('17:00', '17:00 – 18:00'), ('18:00', '18:00 – 19:00'), ('19:00', '19:00 – 20:00'), ('20:00', '20:00 – 21:00'), ('21:00', '21:00 – 22:00')], max_length=5, null=True),
+        ),
+        migrations.RunPython(time_strings_to_minutes, minutes_to_time_strings),
+        migrations.RemoveConstraint(
+            model_name='booking',
+            name='unique_court_booking',
+        ),
+        migrations.RemoveIndex(
+            model_name='booking',
+            name='booking_user_date_time_idx',
+        ),
+        migrations.RemoveField(
+            model_name='booking',
+            name='booking_time',
+        ),
+        migrations.RenameField(
+            model_name='booking',
+            old_name='booking_minutes',
+            new_name='booking_time',
+        ),
+        migrations.AlterField(
+            model_name='booking',
+            name='booking_time',
+            field=models.PositiveSmallIntegerField(),
+        ),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=models.UniqueConstraint(fields=('court', 'booking_date', 'booking_time'), name='unique_court_booking'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['user', 'booking_date', 'booking_time'], name='booking_user_date_time_idx'),
+        ),
+    ]
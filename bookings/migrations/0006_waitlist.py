@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:45
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('courts', '0001_initial'),
+        ('bookings', '0005_booking_time_minutes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Waitlist',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sport', models.CharField(choices=[('badminton', 'Badminton'), ('tennis', 'Tennis'), ('pickleball', 'Pickleball')], max_length=20)),
+                ('booking_date', models.DateField()),
+                ('booking_time', models.PositiveSmallIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('court', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='courts.court')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['sport', 'booking_date', 'booking_time', 'created_at'], name='waitlist_head_idx')],
+            },
+        ),
+    ]
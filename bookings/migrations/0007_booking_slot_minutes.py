@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:50
+
+import bookings.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0006_waitlist'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='slot_minutes',
+            field=models.PositiveSmallIntegerField(default=bookings.models.current_slot_minutes, editable=False),
+        ),
+    ]
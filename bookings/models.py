@@ -1,37 +1,56 @@
+from datetime import time
+
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
 from courts.models import Court
 
 
 # ==========================
-# FIXED 1-HOUR TIME SLOTS
+# TIME SLOTS
 # ==========================
+# Slots are stored as minutes from midnight (08:00 -> 480), so range
+# queries and overlap checks are plain integer comparisons.
+SLOT_MINUTES = getattr(settings, 'BOOKING_SLOT_MINUTES', 60)
+OPENING_MINUTE = getattr(settings, 'BOOKING_OPENING_HOUR', 8) * 60
+CLOSING_MINUTE = getattr(settings, 'BOOKING_CLOSING_HOUR', 22) * 60
+
+
+def format_minutes(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def slot_label(minutes):
+    return f"{format_minutes(minutes)} – {format_minutes(minutes + SLOT_MINUTES)}"
+
+
+def slot_start_time(minutes):
+    return time(minutes // 60, minutes % 60)
+
+
 TIME_SLOTS = [
-    ('08:00', '08:00 – 09:00'),
-    ('09:00', '09:00 – 10:00'),
-    ('10:00', '10:00 – 11:00'),
-    ('11:00', '11:00 – 12:00'),
-    ('12:00', '12:00 – 13:00'),
-    ('13:00', '13:00 – 14:00'),
-    ('14:00', '14:00 – 15:00'),
-    ('15:00', '15:00 – 16:00'),
-    ('16:00', '16:00 – 17:00'),
-    ('17:00', '17:00 – 18:00'),
-    ('18:00', '18:00 – 19:00'),
-    ('19:00', '19:00 – 20:00'),
-    ('20:00', '20:00 – 21:00'),
-    ('21:00', '21:00 – 22:00'),
+    (minutes, slot_label(minutes))
+    for minutes in range(
+        OPENING_MINUTE, CLOSING_MINUTE - SLOT_MINUTES + 1, SLOT_MINUTES
+    )
 ]
 
 
+def current_slot_minutes():
+    return SLOT_MINUTES
+
+
 class Booking(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     court = models.ForeignKey(Court, on_delete=models.CASCADE)
 
     booking_date = models.DateField()
-    booking_time = models.CharField(
-        max_length=5,
-        choices=TIME_SLOTS
+    # Start of the slot in minutes from midnight, see TIME_SLOTS
+    booking_time = models.PositiveSmallIntegerField()
+    # Slot length when booked; bookings.checks flags upcoming rows made
+    # on a different grid after BOOKING_SLOT_MINUTES changes
+    slot_minutes = models.PositiveSmallIntegerField(
+        default=current_slot_minutes, editable=False
     )
 
     created_at = models.DateTimeField(auto_now_add=True)
@@ -44,9 +63,68 @@ class Booking(models.Model):
                 name='unique_court_booking'
             )
         ]
+        indexes = [
+            # My Bookings: keyset pagination per user
+            models.Index(
+                fields=['user', 'booking_date', 'booking_time'],
+                name='booking_user_date_time_idx'
+            )
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what was loaded so signals can see moved bookings
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    @property
+    def time_label(self):
+        return slot_label(self.booking_time)
 
     def __str__(self):
         return (
             f"{self.user.username} - {self.court.name} "
-            f"({self.booking_date} {self.booking_time})"
+            f"({self.booking_date} {self.time_label})"
+        )
+
+
+class Waitlist(models.Model):
+    """
+    A user waiting for a slot. court=None means any court of the sport.
+    Entries are served first in, first out when a matching slot frees up.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    sport = models.CharField(max_length=20, choices=Court.SPORT_CHOICES)
+    court = models.ForeignKey(
+        Court,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True
+    )
+
+    booking_date = models.DateField()
+    booking_time = models.PositiveSmallIntegerField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        indexes = [
+            # Head-of-queue lookup for a freed slot
+            models.Index(
+                fields=['sport', 'booking_date', 'booking_time', 'created_at'],
+                name='waitlist_head_idx'
+            )
+        ]
+
+    @property
+    def time_label(self):
+        return slot_label(self.booking_time)
+
+    def __str__(self):
+        court = self.court.name if self.court else f"any {self.sport} court"
+        return (
+            f"{self.user.username} waiting for {court} "
+            f"({self.booking_date} {self.time_label})"
         )
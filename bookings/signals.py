@@ -0,0 +1,24 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Booking
+from .utils import invalidate_availability
+
+
+# ==========================
+# AVAILABILITY CACHE INVALIDATION
+# ==========================
+@receiver(post_save, sender=Booking)
+def booking_saved(sender, instance, **kwargs):
+    sport = instance.court.sport_type
+    invalidate_availability(sport, instance.booking_date)
+
+    # A moved booking also frees its previous date
+    previous_date = getattr(instance, '_loaded_values', {}).get('booking_date')
+    if previous_date and previous_date != instance.booking_date:
+        invalidate_availability(sport, previous_date)
+
+
+@receiver(post_delete, sender=Booking)
+def booking_deleted(sender, instance, **kwargs):
+    invalidate_availability(instance.court.sport_type, instance.booking_date)
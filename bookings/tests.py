@@ -1,3 +1,609 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import tempfile
+from datetime import date, datetime, timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection
+from django.test import AsyncClient, TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from courts.models import Court
+from logs.models import AuditLog
+from .checks import check_upcoming_bookings_on_grid
+from .forms import BUSY_MESSAGE
+from .models import Booking, SLOT_MINUTES, TIME_SLOTS, Waitlist
+from .management.commands.stress_booking import Command as StressBookingCommand
+from .utils import take_slot_hold, write_atomic
+
+
+def slot_index(minutes):
+    return [value for value, _label in TIME_SLOTS].index(minutes)
+
+
+class AvailabilityTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('player', password='pass12345')
+        self.court = Court.objects.create(name='Court 1', sport_type='tennis')
+        self.closed = Court.objects.create(
+            name='Court 2', sport_type='tennis', is_available=False
+        )
+        self.day = date.today() + timedelta(days=1)
+        self.client.force_login(self.user)
+
+    def get_grid(self, **params):
+        params.setdefault('sport', 'tennis')
+        params.setdefault('date', self.day.isoformat())
+        return self.client.get(reverse('availability'), params)
+
+    def test_grid_marks_booked_free_and_closed_slots(self):
+        Booking.objects.create(
+            user=self.user, court=self.court,
+            booking_date=self.day, booking_time=600
+        )
+
+        data = self.get_grid().json()
+        courts = {row['court_id']: row for row in data['dates'][0]['courts']}
+
+        self.assertEqual(courts[self.court.id]['slots'][slot_index(600)], 'booked')
+        self.assertEqual(courts[self.court.id]['slots'][slot_index(660)], 'free')
+        self.assertEqual(courts[self.closed.id]['slots'][slot_index(660)], 'closed')
+
+    def test_grid_is_cached_and_invalidated_on_booking_changes(self):
+        self.get_grid()
+
+        # Session/user lookups only; courts and bookings come from cache
+        with self.assertNumQueries(2):
+            self.get_grid()
+
+        booking = Booking.objects.create(
+            user=self.user, court=self.court,
+            booking_date=self.day, booking_time=600
+        )
+        slots = self.get_grid().json()['dates'][0]['courts'][0]['slots']
+        self.assertEqual(slots[slot_index(600)], 'booked')
+
+        booking.delete()
+        slots = self.get_grid().json()['dates'][0]['courts'][0]['slots']
+        self.assertEqual(slots[slot_index(600)], 'free')
+
+    def test_booking_page_grid_follows_the_chosen_date(self):
+        later = self.day + timedelta(days=3)
+        Booking.objects.create(
+            user=self.user, court=self.court, booking_date=later, booking_time=600
+        )
+        url = reverse('create_booking') + '?sport=tennis'
+
+        response = self.client.get(reverse('create_booking'), {
+            'sport': 'tennis', 'date': later.isoformat()
+        })
+        day = response.context['availability']['dates'][0]
+        self.assertEqual(day['date'], later.isoformat())
+        self.assertEqual(day['courts'][0]['slots'][slot_index(600)], 'booked')
+        self.assertEqual(response.context['form']['booking_date'].value(), later)
+        self.assertContains(response, reverse('availability'))
+
+        # A refused booking shows the grid for the date it was made on
+        response = self.client.post(url, {
+            'court': self.court.pk, 'booking_date': later.isoformat(), 'booking_time': 600,
+        })
+        self.assertEqual(
+            response.context['availability']['dates'][0]['date'], later.isoformat()
+        )
+
+    def test_date_range(self):
+        end = self.day + timedelta(days=2)
+        data = self.get_grid(end=end.isoformat()).json()
+        self.assertEqual(len(data['dates']), 3)
+
+        response = self.get_grid(end=(self.day + timedelta(days=30)).isoformat())
+        self.assertEqual(response.status_code, 400)
+
+
+class DashboardTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('player', password='pass12345')
+        self.court = Court.objects.create(name='Court 1', sport_type='tennis')
+        Court.objects.create(name='Court 2', sport_type='tennis')
+        self.tomorrow = date.today() + timedelta(days=1)
+        self.client.force_login(self.user)
+
+    def sports(self):
+        response = self.client.get(reverse('dashboard'))
+        return {sport['value']: sport for sport in response.context['sports']}
+
+    def test_cards_follow_sport_choices_with_free_counts(self):
+        Booking.objects.create(
+            user=self.user, court=self.court,
+            booking_date=self.tomorrow, booking_time=600
+        )
+
+        sports = self.sports()
+
+        self.assertEqual(list(sports), [value for value, _ in Court.SPORT_CHOICES])
+        self.assertEqual(sports['tennis']['free_tomorrow'], 2 * len(TIME_SLOTS) - 1)
+        self.assertEqual(sports['badminton']['free_tomorrow'], 0)
+
+    def test_sport_without_a_card_image_gets_a_plain_card(self):
+        choices = Court.SPORT_CHOICES + [('squash', 'Squash')]
+
+        with mock.patch.object(Court, 'SPORT_CHOICES', choices):
+            response = self.client.get(reverse('dashboard'))
+
+        squash = response.context['sports'][-1]
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(squash['image'])
+        self.assertNotContains(response, 'images/squash')
+
+    def test_counts_are_cached_and_refreshed_on_booking_changes(self):
+        self.sports()
+
+        # Session/user lookups only
+        with self.assertNumQueries(2):
+            self.sports()
+
+        Booking.objects.create(
+            user=self.user, court=self.court,
+            booking_date=self.tomorrow, booking_time=600
+        )
+        self.assertEqual(self.sports()['tennis']['free_tomorrow'], 2 * len(TIME_SLOTS) - 1)
+
+
+class SlotGridCheckTests(TestCase):
+
+    def test_upcoming_bookings_off_the_current_grid_are_reported(self):
+        user = User.objects.create_user('player', password='pass12345')
+        court = Court.objects.create(name='Court 1', sport_type='tennis')
+        booking = Booking.objects.create(
+            user=user, court=court,
+            booking_date=date.today() + timedelta(days=1), booking_time=TIME_SLOTS[0][0]
+        )
+        self.assertEqual(check_upcoming_bookings_on_grid(None, databases=['default']), [])
+
+        # Booked under a different BOOKING_SLOT_MINUTES
+        for changes in ({'slot_minutes': SLOT_MINUTES * 2}, {'booking_time': TIME_SLOTS[0][0] + 1}):
+            Booking.objects.filter(pk=booking.pk).update(**changes)
+            errors = check_upcoming_bookings_on_grid(None, databases=['default'])
+            self.assertEqual([error.id for error in errors], ['bookings.E001'])
+            Booking.objects.filter(pk=booking.pk).update(
+                booking_time=TIME_SLOTS[0][0], slot_minutes=SLOT_MINUTES
+            )
+
+        # Past bookings no longer matter
+        Booking.objects.filter(pk=booking.pk).update(
+            booking_date=date.today() - timedelta(days=1), slot_minutes=SLOT_MINUTES * 2
+        )
+        self.assertEqual(check_upcoming_bookings_on_grid(None, databases=['default']), [])
+
+
+class InsertFirstBookingTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('player', password='pass12345')
+        self.court = Court.objects.create(name='Court 1', sport_type='tennis')
+        self.day = date.today() + timedelta(days=1)
+        self.client.force_login(self.user)
+
+    def post_booking(self, slot=600):
+        return self.client.post(
+            reverse('create_booking') + '?sport=tennis',
+            {
+                'court': self.court.pk,
+                'booking_date': self.day.isoformat(),
+                'booking_time': slot,
+            }
+        )
+
+    def test_duplicate_insert_becomes_form_error(self):
+        self.assertRedirects(self.post_booking(), reverse('my_bookings'))
+
+        response = self.post_booking()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "This time slot is already booked.")
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_moving_onto_taken_slot_becomes_form_error(self):
+        self.post_booking(600)
+        self.post_booking(660)
+        booking = Booking.objects.get(booking_time=660)
+
+        response = self.client.post(
+            reverse('update_booking', args=[booking.pk]),
+            {
+                'court': self.court.pk,
+                'booking_date': self.day.isoformat(),
+                'booking_time': 600,
+            }
+        )
+
+        self.assertContains(response, "This time slot is already booked.")
+        booking.refresh_from_db()
+        self.assertEqual(booking.booking_time, 660)
+
+
+class RecurringBookingTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('coach', password='pass12345')
+        self.other = User.objects.create_user('player', password='pass12345')
+        self.court = Court.objects.create(name='Court 1', sport_type='tennis')
+        self.start = date.today() + timedelta(days=1)
+        self.client.force_login(self.user)
+
+    def post_recurring(self, weeks=4):
+        return self.client.post(
+            reverse('create_recurring_booking') + '?sport=tennis',
+            {
+                'courts': [self.court.pk],
+                'booking_time': 1080,
+                'pattern': 'weekly',
+                'start_date': self.start.isoformat(),
+                'end_date': (self.start + timedelta(weeks=weeks - 1)).isoformat(),
+            }
+        )
+
+    def test_creates_every_occurrence(self):
+        response = self.post_recurring()
+
+        self.assertRedirects(response, reverse('my_bookings'))
+        self.assertEqual(
+            Booking.objects.filter(user=self.user, booking_time=1080).count(), 4
+        )
+
+    def test_reports_conflicting_dates(self):
+        taken = self.start + timedelta(weeks=2)
+        Booking.objects.create(
+            user=self.other, court=self.court,
+            booking_date=taken, booking_time=1080
+        )
+
+        response = self.post_recurring()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['conflicts'], [(self.court, taken)])
+        self.assertEqual(len(response.context['created']), 3)
+
+    def test_slots_held_by_another_user_are_conflicts(self):
+        cache.clear()
+        held = self.start + timedelta(weeks=1)
+        self.assertTrue(take_slot_hold(self.other.id, self.court.id, held, 1080))
+
+        response = self.post_recurring()
+
+        self.assertEqual(response.context['conflicts'], [(self.court, held)])
+        self.assertFalse(Booking.objects.filter(booking_date=held).exists())
+        self.assertEqual(Booking.objects.filter(user=self.user).count(), 3)
+
+
+class MyBookingsTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('member', password='pass12345')
+        self.courts = [
+            Court.objects.create(name=f'Court {n}', sport_type='tennis')
+            for n in range(3)
+        ]
+        self.client.force_login(self.user)
+
+    def add_bookings(self, days, start):
+        Booking.objects.bulk_create([
+            Booking(
+                user=self.user, court=court,
+                booking_date=start + timedelta(days=offset),
+                booking_time=600
+            )
+            for offset in days for court in self.courts
+        ])
+
+    def test_query_count_does_not_grow_with_history(self):
+        self.add_bookings(range(5), date.today() + timedelta(days=1))
+        with self.assertNumQueries(4):
+            self.client.get(reverse('my_bookings'))
+
+        self.add_bookings(range(5, 60), date.today() + timedelta(days=1))
+        with self.assertNumQueries(4):
+            self.client.get(reverse('my_bookings'))
+
+    async def test_read_views_run_on_the_asgi_handler(self):
+        client = AsyncClient()
+        await sync_to_async(client.force_login)(self.user)
+        await sync_to_async(self.add_bookings)(range(3), date.today() + timedelta(days=1))
+
+        response = await client.get(reverse('my_bookings'))
+        self.assertEqual(len(response.context['bookings']), 9)
+
+        response = await client.get(reverse('availability'), {'sport': 'tennis'})
+        self.assertEqual(len(response.json()['dates'][0]['courts']), 3)
+
+        response = await AsyncClient().get(reverse('my_bookings'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_keyset_pages_cover_every_booking_once(self):
+        self.add_bookings(range(10), date.today() + timedelta(days=1))
+        self.add_bookings(range(4), date.today() - timedelta(days=10))
+
+        for tab, expected in (('upcoming', 30), ('past', 12)):
+            seen, params = [], {'tab': tab}
+
+            while True:
+                context = self.client.get(reverse('my_bookings'), params).context
+                seen.extend(booking.pk for booking in context['bookings'])
+                if not context['next_cursor']:
+                    break
+                params['after'] = context['next_cursor']
+
+            self.assertEqual(len(seen), expected)
+            self.assertEqual(len(set(seen)), expected)
+
+
+class SlotHoldTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.first = User.objects.create_user('first', password='pass12345')
+        self.second = User.objects.create_user('second', password='pass12345')
+        self.court = Court.objects.create(name='Court 1', sport_type='tennis')
+        self.slot = {
+            'court': self.court.pk,
+            'booking_date': (date.today() + timedelta(days=1)).isoformat(),
+            'booking_time': 600,
+        }
+
+    def hold(self, user):
+        self.client.force_login(user)
+        return self.client.post(reverse('hold_slot'), self.slot)
+
+    def test_only_one_user_can_hold_a_slot(self):
+        self.assertEqual(self.hold(self.first).status_code, 200)
+        self.assertEqual(self.hold(self.second).status_code, 409)
+        # Refreshing your own hold is fine
+        self.assertEqual(self.hold(self.first).status_code, 200)
+
+    def test_booking_respects_hold_and_releases_it(self):
+        self.hold(self.first)
+
+        self.client.force_login(self.second)
+        response = self.client.post(
+            reverse('create_booking') + '?sport=tennis', self.slot
+        )
+        self.assertContains(response, "Someone else is booking this time slot")
+
+        grid = self.client.get(
+            reverse('availability'),
+            {'sport': 'tennis', 'date': self.slot['booking_date']}
+        ).json()
+        self.assertEqual(grid['dates'][0]['courts'][0]['slots'][slot_index(600)], 'held')
+
+        self.client.force_login(self.first)
+        response = self.client.post(
+            reverse('create_booking') + '?sport=tennis', self.slot
+        )
+        self.assertRedirects(response, reverse('my_bookings'))
+        self.assertEqual(self.hold(self.second).status_code, 200)
+
+
+class WaitlistTests(TestCase):
+
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', password='pass12345')
+        self.first = User.objects.create_user('first', password='pass12345')
+        self.second = User.objects.create_user('second', password='pass12345')
+        self.court = Court.objects.create(name='Court 1', sport_type='tennis')
+        self.other_court = Court.objects.create(name='Court 2', sport_type='tennis')
+        self.day = date.today() + timedelta(days=1)
+        self.booking = Booking.objects.create(
+            user=self.owner, court=self.court,
+            booking_date=self.day, booking_time=600
+        )
+
+    def join(self, user, **extra):
+        self.client.force_login(user)
+        return self.client.post(reverse('join_waitlist'), {
+            'court': self.court.pk,
+            'booking_date': self.day.isoformat(),
+            'booking_time': 600,
+            **extra,
+        })
+
+    def test_delete_promotes_head_of_queue(self):
+        self.join(self.first, any_court='on')
+        self.join(self.second)
+
+        self.client.force_login(self.owner)
+        self.client.post(reverse('delete_booking', args=[self.booking.pk]))
+
+        promoted = Booking.objects.get(court=self.court, booking_date=self.day)
+        self.assertEqual(promoted.user, self.first)
+        self.assertEqual(list(Waitlist.objects.values_list('user', flat=True)),
+                         [self.second.pk])
+
+    def test_moving_a_booking_promotes_the_old_slot(self):
+        self.join(self.first)
+
+        self.client.force_login(self.owner)
+        self.client.post(reverse('update_booking', args=[self.booking.pk]), {
+            'court': self.other_court.pk,
+            'booking_date': self.day.isoformat(),
+            'booking_time': 600,
+        })
+
+        self.assertTrue(Booking.objects.filter(
+            user=self.first, court=self.court, booking_date=self.day
+        ).exists())
+        self.assertFalse(Waitlist.objects.exists())
+
+
+class SQLiteBackendTests(TestCase):
+
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_on_connect(self):
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+        # NORMAL
+        self.assertEqual(self.pragma('synchronous'), 1)
+
+    def test_write_atomic_nested_in_transaction_is_a_savepoint(self):
+        court = Court.objects.create(name='Court 1', sport_type='tennis')
+        user = User.objects.create_user('player')
+
+        with write_atomic():
+            self.assertFalse(connection.begin_immediate)
+            Booking.objects.create(
+                user=user, court=court, booking_date=date.today(), booking_time=600
+            )
+
+        self.assertFalse(connection.begin_immediate)
+        self.assertEqual(Booking.objects.count(), 1)
+
+
+class BenchCommandTests(TransactionTestCase):
+
+    def test_bench_writes_json_results_and_cleans_up(self):
+        output = os.path.join(tempfile.mkdtemp(), 'bench.json')
+        self.addCleanup(shutil.rmtree, os.path.dirname(output))
+
+        call_command(
+            'bench', clients=2, requests=5, staff=1, courts=1, output=output,
+            stdout=StringIO()
+        )
+
+        with open(output) as handle:
+            results = json.load(handle)
+        self.assertEqual(results['errors'], 0)
+        self.assertEqual(results['routes']['verify_otp']['statuses'], {'302': 2})
+        self.assertIn('p99_ms', results['routes']['my_bookings'])
+        self.assertFalse(User.objects.exists())
+        self.assertFalse(Court.objects.exists())
+
+
+class SeedDataTests(TestCase):
+
+    def seed(self, **options):
+        options = {'future_days': 0, **options}
+        call_command(
+            'seed_data', users=5, courts_per_sport=1, months=1,
+            end_date=date(2026, 1, 31), seed=3, stdout=StringIO(), **options
+        )
+        return list(
+            Booking.objects.order_by('booking_date', 'booking_time', 'court__name')
+            .values_list('booking_date', 'booking_time', 'court__name', 'user__username')
+        )
+
+    def test_same_seed_gives_same_dataset(self):
+        first = self.seed()
+
+        self.assertEqual(User.objects.count(), 5)
+        self.assertEqual(Court.objects.count(), len(Court.SPORT_CHOICES))
+        self.assertTrue(first)
+        self.assertGreaterEqual(AuditLog.objects.count(), 2 * len(first))
+
+        with self.assertRaises(CommandError):
+            self.seed()
+        self.assertEqual(self.seed(clear=True), first)
+
+    def test_upcoming_bookings_were_created_before_the_end_date(self):
+        def created():
+            return list(Booking.objects.filter(
+                booking_date__gt=date(2026, 1, 31)
+            ).order_by('booking_date', 'booking_time').values_list('created_at', flat=True))
+
+        self.seed(future_days=3)
+        first = created()
+
+        self.assertTrue(first)
+        self.assertLessEqual(
+            max(first), timezone.make_aware(datetime(2026, 1, 31))
+        )
+        # Each row carries its own booking time, not one shared insert time
+        self.assertGreater(len(set(first)), 1)
+
+        self.seed(future_days=3, clear=True)
+        self.assertEqual(created(), first)
+
+    def test_evening_peak_is_busier_than_morning(self):
+        self.seed(curve='8:0.1,17:0.9')
+
+        morning = Booking.objects.filter(booking_time__lt=12 * 60).count()
+        evening = Booking.objects.filter(booking_time__gte=17 * 60).count()
+        self.assertGreater(evening, morning)
+
+
+class StressBookingTests(TransactionTestCase):
+    # The in-memory test database fails concurrent writers outright
+    # instead of waiting on busy_timeout, so the race itself runs against
+    # a real file via the command; here one client checks the mechanics.
+
+    def test_run_checks_and_cleans_up(self):
+        stdout = StringIO()
+        call_command('stress_booking', processes=0, threads=1, slots=2, stdout=stdout)
+
+        self.assertIn("OK: one winner per slot", stdout.getvalue())
+        self.assertFalse(Booking.objects.exists())
+        self.assertFalse(AuditLog.objects.exists())
+
+    def test_verify_flags_double_winners_and_orphan_audit_rows(self):
+        court = Court.objects.create(name='Court 1', sport_type='tennis')
+        users = [User.objects.create_user(f'racer-{n}') for n in range(2)]
+        slot = (court.id, date.today() + timedelta(days=1), 600)
+        Booking.objects.create(
+            user=users[0], court=court, booking_date=slot[1], booking_time=slot[2]
+        )
+        AuditLog.objects.create(user=users[0], action='BOOKING_CREATE')
+        AuditLog.objects.create(user=users[1], action='BOOKING_CREATE')
+
+        failures = StressBookingCommand().verify(
+            court, users, [slot], [(0, 'win', 302, 1.0), (0, 'win', 302, 1.0)]
+        )
+
+        self.assertEqual(len(failures), 2)
+        self.assertIn("2 winning response(s)", failures[0])
+        self.assertIn("1 orphan", failures[1])
+
+
+class BusyWriteLockTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('player', password='pass12345')
+        self.court = Court.objects.create(name='Court 1', sport_type='tennis')
+        self.client.force_login(self.user)
+
+    def test_lock_timeout_is_a_503_not_a_500(self):
+        locked = OperationalError('database is locked')
+
+        with mock.patch('bookings.models.Booking.save', side_effect=locked):
+            response = self.client.post(reverse('create_booking') + '?sport=tennis', {
+                'court': self.court.pk,
+                'booking_date': (date.today() + timedelta(days=1)).isoformat(),
+                'booking_time': 600,
+            })
+
+        self.assertEqual(response.status_code, 503)
+        self.assertContains(response, BUSY_MESSAGE, status_code=503)
+
+    def test_lock_timeout_on_delete_keeps_the_booking(self):
+        booking = Booking.objects.create(
+            user=self.user, court=self.court,
+            booking_date=date.today() + timedelta(days=1), booking_time=600
+        )
+        locked = OperationalError('database is locked')
+
+        with mock.patch('bookings.models.Booking.delete', side_effect=locked):
+            response = self.client.post(reverse('delete_booking', args=[booking.pk]))
+
+        self.assertContains(response, BUSY_MESSAGE, status_code=503)
+        self.assertTrue(Booking.objects.filter(pk=booking.pk).exists())
@@ -3,9 +3,13 @@ from . import views
 
 urlpatterns = [
     path('create/', views.create_booking, name='create_booking'),
+    path('recurring/', views.create_recurring_booking, name='create_recurring_booking'),
     path('my-bookings/', views.my_bookings, name='my_bookings'),
     path('edit/<int:booking_id>/', views.update_booking, name='update_booking'),
     path('delete/<int:booking_id>/', views.delete_booking, name='delete_booking'),
     path('dashboard/', views.dashboard, name='dashboard'),
-    
+    path('availability/', views.availability, name='availability'),
+    path('hold/', views.hold_slot, name='hold_slot'),
+    path('waitlist/join/', views.join_waitlist, name='join_waitlist'),
+    path('waitlist/<int:entry_id>/leave/', views.leave_waitlist, name='leave_waitlist'),
 ]
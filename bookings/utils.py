@@ -0,0 +1,515 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from config.db_router import use_primary
+from courts.catalog import catalog_generation, get_available_courts, get_sport_courts
+from courts.models import Court, normalize_sport
+from logs.models import AuditLog
+from logs.writer import audit_log, get_audit_writer
+from .models import Booking, TIME_SLOTS, Waitlist, slot_start_time
+
+
+# ==========================
+# WRITE TRANSACTIONS
+# ==========================
+@contextmanager
+def write_atomic(using=None):
+    """
+    transaction.atomic() for booking writes. On the production SQLite
+    backend the outermost block opens with BEGIN IMMEDIATE, so concurrent
+    writers wait on busy_timeout rather than failing with "database is
+    locked"; elsewhere it is a plain atomic block.
+    """
+    connection = transaction.get_connection(using)
+    immediate = (
+        hasattr(connection, 'begin_immediate') and not connection.in_atomic_block
+    )
+
+    if immediate:
+        connection.begin_immediate = True
+    try:
+        with transaction.atomic(using=using):
+            if immediate:
+                connection.begin_immediate = False
+            yield
+    finally:
+        if immediate:
+            connection.begin_immediate = False
+
+
+def is_lock_timeout(exc):
+    """True for an OperationalError raised because the write lock wait ran out."""
+    message = str(exc).lower()
+    # SQLite past busy_timeout / PostgreSQL past lock_timeout
+    return 'database is locked' in message or 'lock timeout' in message
+
+
+# ==========================
+# AVAILABILITY GRID
+# ==========================
+AVAILABILITY_CACHE_TIMEOUT = 60 * 10
+MAX_AVAILABILITY_DAYS = 14
+
+
+def availability_cache_key(sport, booking_date):
+    return f"availability:{normalize_sport(sport)}:{booking_date.isoformat()}"
+
+
+def invalidate_availability(sport, booking_date):
+    # The dashboard counts cover "today" and "tomorrow", so drop both
+    cache.delete_many([
+        availability_cache_key(sport, booking_date),
+        free_slot_counts_key(booking_date),
+        free_slot_counts_key(booking_date - timedelta(days=1)),
+    ])
+
+
+def date_range(start, end):
+    days = (end - start).days
+    return [start + timedelta(days=offset) for offset in range(days + 1)]
+
+
+def get_booked_slots(sport, dates):
+    """
+    Return {date: {court_id: [slot, ...]}} for the given dates.
+
+    Dates found in the cache are served from there; the rest are loaded
+    with a single query over Booking and written back per (sport, date).
+    """
+    keys = {availability_cache_key(sport, day): day for day in dates}
+    cached = cache.get_many(keys.keys())
+
+    booked = {keys[key]: value for key, value in cached.items()}
+    missing = [day for day in dates if day not in booked]
+
+    if missing:
+        fresh = {day: {} for day in missing}
+
+        # Cached until the next booking change, so never from a lagging replica
+        with use_primary():
+            rows = list(Booking.objects.filter(
+                court__sport_type=normalize_sport(sport),
+                booking_date__in=missing
+            ).values_list('booking_date', 'court_id', 'booking_time'))
+
+        for booking_date, court_id, booking_time in rows:
+            fresh[booking_date].setdefault(court_id, []).append(booking_time)
+
+        cache.set_many(
+            {availability_cache_key(sport, day): slots
+             for day, slots in fresh.items()},
+            AVAILABILITY_CACHE_TIMEOUT
+        )
+        booked.update(fresh)
+
+    return booked
+
+
+def build_availability(sport, dates, user=None):
+    """
+    Build the court x TIME_SLOTS matrix for a sport over the given dates.
+
+    Each court row lists one state per entry of time_slots: "free",
+    "booked", "held" (someone else is checking out) or "closed" (court
+    not available). Holds are read live; only bookings are cached.
+    """
+    courts = get_sport_courts(sport)
+    booked = get_booked_slots(sport, dates)
+    holds = get_slot_holds(
+        [court.id for court in courts],
+        dates,
+        exclude_user_id=user.id if user else None
+    )
+
+    grid = []
+    for day in dates:
+        day_booked = booked.get(day, {})
+        rows = []
+
+        for court in courts:
+            taken = set(day_booked.get(court.id, ()))
+            slots = []
+
+            for value, _label in TIME_SLOTS:
+                if not court.is_available:
+                    slots.append('closed')
+                elif value in taken:
+                    slots.append('booked')
+                elif (court.id, day, value) in holds:
+                    slots.append('held')
+                else:
+                    slots.append('free')
+
+            rows.append({
+                'court_id': court.id,
+                'court': court.name,
+                'is_available': court.is_available,
+                'slots': slots,
+            })
+
+        grid.append({'date': day.isoformat(), 'courts': rows})
+
+    return {
+        'sport': normalize_sport(sport),
+        'time_slots': [
+            {'value': value, 'label': label} for value, label in TIME_SLOTS
+        ],
+        'dates': grid,
+    }
+
+
+# ==========================
+# DASHBOARD FREE-SLOT COUNTS
+# ==========================
+FREE_SLOT_COUNTS_CACHE_TIMEOUT = 60
+
+
+def free_slot_counts_key(today):
+    return f"free-slots:{today.isoformat()}"
+
+
+def get_free_slot_counts():
+    """
+    Return {sport: {'today': n, 'tomorrow': n}} of bookable slots left
+    on available courts for every sport in Court.SPORT_CHOICES.
+
+    Booked slots are counted with one GROUP BY query over Booking joined
+    to Court; court counts come from the court catalog. The result is
+    cached briefly and dropped whenever a booking on either day changes.
+    Today only counts slots that have not started yet.
+    """
+    now = timezone.localtime()
+    today, tomorrow = now.date(), now.date() + timedelta(days=1)
+    minute = now.hour * 60 + now.minute
+
+    slots_left = {
+        today: sum(1 for value, _label in TIME_SLOTS if value > minute),
+        tomorrow: len(TIME_SLOTS),
+    }
+    # Court changes (via the catalog generation) and slots starting also
+    # make cached counts stale
+    version = (catalog_generation(), slots_left[today])
+
+    key = free_slot_counts_key(today)
+    cached = cache.get(key)
+    if cached and cached['version'] == version:
+        return cached['counts']
+
+    booked = Booking.objects.filter(
+        Q(booking_date=tomorrow) |
+        Q(booking_date=today, booking_time__gt=minute),
+        court__is_available=True
+    ).values('court__sport_type', 'booking_date').annotate(taken=Count('id'))
+
+    with use_primary():
+        taken = {
+            (row['court__sport_type'], row['booking_date']): row['taken']
+            for row in booked
+        }
+
+    counts = {}
+    for sport, _label in Court.SPORT_CHOICES:
+        courts = len(get_available_courts(sport))
+        counts[sport] = {
+            label: courts * slots_left[day] - taken.get((sport, day), 0)
+            for label, day in (('today', today), ('tomorrow', tomorrow))
+        }
+
+    cache.set(
+        key,
+        {'version': version, 'counts': counts},
+        FREE_SLOT_COUNTS_CACHE_TIMEOUT
+    )
+    return counts
+
+
+# ==========================
+# SLOT HOLDS
+# ==========================
+# A hold is a cache entry with a TTL, so expired holds need no cleanup.
+# Use a shared cache backend when running more than one process.
+SLOT_HOLD_SECONDS = getattr(settings, 'BOOKING_HOLD_SECONDS', 180)
+
+
+def slot_hold_key(court_id, booking_date, booking_time):
+    return f"hold:{court_id}:{booking_date.isoformat()}:{booking_time}"
+
+
+def user_hold_key(user_id):
+    return f"hold-user:{user_id}"
+
+
+def take_slot_hold(user_id, court_id, booking_date, booking_time):
+    """
+    Try to hold a slot for user_id. Returns True if the user now holds it.
+
+    A user holds at most one slot; taking a new one releases the old one.
+    """
+    key = slot_hold_key(court_id, booking_date, booking_time)
+
+    if not cache.add(key, user_id, SLOT_HOLD_SECONDS):
+        if cache.get(key) != user_id:
+            return False
+        cache.touch(key, SLOT_HOLD_SECONDS)
+
+    previous = cache.get(user_hold_key(user_id))
+    if previous and previous != key and cache.get(previous) == user_id:
+        cache.delete(previous)
+
+    cache.set(user_hold_key(user_id), key, SLOT_HOLD_SECONDS)
+    return True
+
+
+def release_slot_hold(user_id, court_id, booking_date, booking_time):
+    key = slot_hold_key(court_id, booking_date, booking_time)
+
+    if cache.get(key) == user_id:
+        cache.delete_many([key, user_hold_key(user_id)])
+
+
+def is_held_by_other(user_id, court_id, booking_date, booking_time):
+    holder = cache.get(slot_hold_key(court_id, booking_date, booking_time))
+    return holder is not None and holder != user_id
+
+
+def get_slot_holds(court_ids, dates, exclude_user_id=None, slots=None):
+    """
+    Return the set of held (court_id, date, slot) tuples in one cache call.
+    `slots` narrows the lookup to those start times (default: all).
+    """
+    if slots is None:
+        slots = [value for value, _label in TIME_SLOTS]
+
+    keys = {
+        slot_hold_key(court_id, day, value): (court_id, day, value)
+        for court_id in court_ids
+        for day in dates
+        for value in slots
+    }
+
+    return {
+        keys[key]
+        for key, holder in cache.get_many(keys.keys()).items()
+        if holder != exclude_user_id
+    }
+
+
+# ==========================
+# RECURRING BOOKINGS
+# ==========================
+def create_recurring_bookings(user, courts, dates, booking_time, ip_address=None):
+    """
+    Book every (court, date) pair at booking_time in one transaction.
+
+    Existing bookings are found with one set-based query and the free
+    slots are inserted with bulk_create. Slots another user holds while
+    checking out are left alone, like in the single-booking form. Rows
+    that a concurrent request inserted in between are skipped by
+    unique_court_booking and reported as conflicts together with the
+    ones found up front.
+
+    Returns (created, conflicts), both sorted lists of (court, date).
+    """
+    courts_by_id = {court.id: court for court in courts}
+    targets = {(court_id, day) for court_id in courts_by_id for day in dates}
+    slot_filter = {
+        'court_id__in': list(courts_by_id),
+        'booking_date__in': dates,
+        'booking_time': booking_time,
+    }
+
+    held = {
+        (court_id, day)
+        for court_id, day, _slot in get_slot_holds(
+            list(courts_by_id), dates, exclude_user_id=user.id, slots=[booking_time]
+        )
+    }
+
+    with write_atomic():
+        taken = set(
+            Booking.objects.filter(**slot_filter)
+            .values_list('court_id', 'booking_date')
+        )
+        free = targets - taken - held
+
+        Booking.objects.bulk_create(
+            [
+                Booking(
+                    user=user,
+                    court_id=court_id,
+                    booking_date=day,
+                    booking_time=booking_time
+                )
+                for court_id, day in sorted(free)
+            ],
+            ignore_conflicts=True
+        )
+
+        # ignore_conflicts leaves no primary keys, so re-read which of the
+        # free slots ended up ours
+        created = {
+            (court_id, day)
+            for court_id, day, owner_id in Booking.objects.filter(**slot_filter)
+            .values_list('court_id', 'booking_date', 'user_id')
+            if owner_id == user.id and (court_id, day) in free
+        }
+
+        # One batch through the shared writer; queued only if this commits
+        get_audit_writer().add([
+            AuditLog(
+                user=user, action='BOOKING_CREATE', ip_address=ip_address,
+                timestamp=timezone.now()
+            )
+            for _ in created
+        ])
+
+    # bulk_create sends no post_save, so refresh the grid here
+    for sport in {court.sport_type for court in courts_by_id.values()}:
+        for day in {day for _court_id, day in created}:
+            invalidate_availability(sport, day)
+
+    def resolve(pairs):
+        return [(courts_by_id[court_id], day) for court_id, day in sorted(pairs)]
+
+    return resolve(created), resolve(targets - created)
+
+
+# ==========================
+# WAITLIST
+# ==========================
+def promote_waitlist(court, booking_date, booking_time):
+    """
+    Book a freed slot for the head of its waitlist.
+
+    Call inside the transaction that freed the slot. Entries for this
+    court and for any court of its sport are served oldest first.
+    Returns the new booking, or None if nobody could be promoted.
+    """
+    starts_at = timezone.make_aware(
+        datetime.combine(booking_date, slot_start_time(booking_time))
+    )
+    if not court.is_available or starts_at <= timezone.now():
+        return None
+
+    head = (
+        Waitlist.objects.select_for_update()
+        .filter(
+            sport=court.sport_type,
+            booking_date=booking_date,
+            booking_time=booking_time
+        )
+        .filter(Q(court=court) | Q(court__isnull=True))
+        .select_related('user')
+        .order_by('created_at', 'id')
+        .first()
+    )
+    if head is None:
+        return None
+
+    try:
+        with transaction.atomic():
+            booking = Booking.objects.create(
+                user=head.user,
+                court=court,
+                booking_date=booking_date,
+                booking_time=booking_time
+            )
+    except IntegrityError:
+        # Someone else took the slot first; leave the queue untouched
+        return None
+
+    # The user got the slot, so drop all of their entries for it
+    Waitlist.objects.filter(
+        user=head.user,
+        sport=court.sport_type,
+        booking_date=booking_date,
+        booking_time=booking_time
+    ).delete()
+
+    audit_log('BOOKING_CREATE', user=head.user)
+
+    return booking
+
+
+# ==========================
+# KEYSET PAGINATION
+# ==========================
+BOOKINGS_PAGE_SIZE = 20
+
+
+def encode_booking_cursor(booking):
+    return f"{booking.booking_date.isoformat()}_{booking.booking_time}_{booking.pk}"
+
+
+def decode_booking_cursor(cursor):
+    """Return (date, time, pk) from a cursor, or None if it is malformed."""
+    try:
+        raw_date, booking_time, pk = cursor.split('_')
+        booking_date = parse_date(raw_date)
+        booking_time = int(booking_time)
+        pk = int(pk)
+    except (AttributeError, ValueError):
+        return None
+
+    if booking_date is None:
+        return None
+
+    return booking_date, booking_time, pk
+
+
+def keyset_page_queryset(queryset, cursor=None, descending=False,
+                         page_size=BOOKINGS_PAGE_SIZE):
+    """The next page_size + 1 bookings after `cursor`, in keyset order."""
+    position = decode_booking_cursor(cursor) if cursor else None
+
+    if position:
+        booking_date, booking_time, pk = position
+        op = 'lt' if descending else 'gt'
+        queryset = queryset.filter(
+            Q(**{f'booking_date__{op}': booking_date}) |
+            Q(booking_date=booking_date, **{f'booking_time__{op}': booking_time}) |
+            Q(booking_date=booking_date, booking_time=booking_time,
+              **{f'pk__{op}': pk})
+        )
+
+    order = ['booking_date', 'booking_time', 'pk']
+    if descending:
+        order = [f'-{field}' for field in order]
+
+    return queryset.order_by(*order)[:page_size + 1]
+
+
+def split_page(rows, page_size=BOOKINGS_PAGE_SIZE):
+    page = rows[:page_size]
+    next_cursor = (
+        encode_booking_cursor(page[-1]) if len(rows) > page_size else None
+    )
+    return page, next_cursor
+
+
+def paginate_bookings(queryset, cursor=None, descending=False,
+                      page_size=BOOKINGS_PAGE_SIZE):
+    """
+    Keyset-paginate bookings on (booking_date, booking_time, id).
+
+    Returns (page, next_cursor); next_cursor is None on the last page.
+    """
+    rows = list(keyset_page_queryset(queryset, cursor, descending, page_size))
+    return split_page(rows, page_size)
+
+
+async def apaginate_bookings(queryset, cursor=None, descending=False,
+                             page_size=BOOKINGS_PAGE_SIZE):
+    """paginate_bookings() for async views."""
+    rows = [
+        booking async for booking in
+        keyset_page_queryset(queryset, cursor, descending, page_size)
+    ]
+    return split_page(rows, page_size)
@@ -1,23 +1,109 @@
 import logging
+from datetime import date, timedelta
+
+from asgiref.sync import sync_to_async
 
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-
-from .models import Booking
-from .forms import BookingForm
-from logs.models import AuditLog   # ✅ AUDIT LOG
+from django.db import OperationalError
+from django.http import JsonResponse
+from django.views.decorators.http import require_POST
+from django.utils.dateparse import parse_date
+
+from config.static_files import image_srcsets
+from courts.models import Court
+from .models import Booking, Waitlist, format_minutes
+from .forms import (
+    BookingForm,
+    RecurringBookingForm,
+    SlotHoldForm,
+    WaitlistForm,
+    BUSY_MESSAGE,
+    SLOT_TAKEN_MESSAGE,
+)
+from .utils import (
+    apaginate_bookings,
+    build_availability,
+    create_recurring_bookings,
+    date_range,
+    get_free_slot_counts,
+    is_lock_timeout,
+    promote_waitlist,
+    release_slot_hold,
+    take_slot_hold,
+    write_atomic,
+    MAX_AVAILABILITY_DAYS,
+    SLOT_HOLD_SECONDS,
+)
+from accounts.utils import async_login_required
+from logs.writer import audit_log   # ✅ AUDIT LOG
 
 # 🔐 Security file logger
 security_logger = logging.getLogger('security')
 
 
+# ==========================
+# HELPERS
+# ==========================
+def log_promotion(booking):
+    if booking:
+        security_logger.info(
+            "Booking CREATED from waitlist | user=%s | court=%s | date=%s | time=%s",
+            booking.user.username,
+            booking.court,
+            booking.booking_date,
+            booking.time_label
+        )
+
+
 # ==========================
 # DASHBOARD
 # ==========================
+# Card extras per sport; a sport missing here still gets a plain card.
+# The image must exist in static/: the manifest storage raises for
+# unknown names, so a sport only gets one once it is listed here.
+SPORT_CARDS = {
+    'badminton': {
+        'icon': '🏸', 'image': 'images/badminton.jpg',
+        'blurb': "Book indoor badminton courts easily",
+    },
+    'tennis': {
+        'icon': '🎾', 'image': 'images/tennis.jpg',
+        'blurb': "Reserve tennis courts for practice or matches",
+    },
+    'pickleball': {
+        'icon': '🏓', 'image': 'images/pickleball.jpg',
+        'blurb': "Schedule pickleball sessions with ease",
+    },
+}
+
+
 @login_required
 def dashboard(request):
-    return render(request, 'dashboard.html')
+    free_slots = get_free_slot_counts()
+
+    sports = []
+    for value, label in Court.SPORT_CHOICES:
+        card = SPORT_CARDS.get(value, {})
+        image = card.get('image')
+        sports.append({
+            'value': value,
+            'label': label,
+            'icon': card.get('icon', ''),
+            'blurb': card.get('blurb', f"Book {label.lower()} courts"),
+            'image': image,
+            'srcsets': image_srcsets(image) if image else {},
+            'free_today': free_slots[value]['today'],
+            'free_tomorrow': free_slots[value]['tomorrow'],
+        })
+
+    return render(request, 'dashboard.html', {'sports': sports})
+
+
+def busy_status(form):
+    # 503 tells clients and load balancers the refusal is temporary
+    return 503 if BUSY_MESSAGE in form.non_field_errors() else 200
 
 
 # ==========================
@@ -28,52 +114,217 @@ def create_booking(request):
     sport = request.GET.get('sport')
 
     if request.method == 'POST':
-        form = BookingForm(request.POST, sport=sport)
-
-        if form.is_valid():
-            booking = form.save(commit=False)
-            booking.user = request.user
-            booking.save()
+        form = BookingForm(
+            request.POST,
+            sport=sport,
+            user=request.user,
+            check_conflicts=False
+        )
+        booking = form.save_booking(user=request.user) if form.is_valid() else None
+
+        if booking:
+            release_slot_hold(
+                request.user.id,
+                booking.court_id,
+                booking.booking_date,
+                booking.booking_time
+            )
 
             # 🔐 FILE SECURITY LOG
             security_logger.info(
-                f"Booking CREATED | user={request.user.username} | "
-                f"court={booking.court} | "
-                f"date={booking.booking_date} | "
-                f"time={booking.booking_time}"
+                "Booking CREATED | user=%s | court=%s | date=%s | time=%s",
+                request.user.username,
+                booking.court,
+                booking.booking_date,
+                booking.time_label
             )
 
             # 🧾 AUDIT LOG (DATABASE)
-            AuditLog.objects.create(
+            audit_log(
+                'BOOKING_CREATE',
                 user=request.user,
-                action='BOOKING_CREATE',
                 ip_address=request.META.get('REMOTE_ADDR')
             )
 
             messages.success(request, "Booking has been successfully created")
             return redirect('my_bookings')
 
-    else:
-        form = BookingForm(sport=sport)
+    # The grid shows the day being booked: the posted date, ?date= or today
+    try:
+        grid_date = (
+            parse_date(request.POST.get('booking_date') or '')
+            or parse_date(request.GET.get('date') or '')
+            or date.today()
+        )
+    except ValueError:
+        grid_date = date.today()
+
+    if request.method != 'POST':
+        form = BookingForm(sport=sport, initial={'booking_date': grid_date})
+
+    availability = (
+        build_availability(sport, [grid_date], user=request.user)
+        if sport else None
+    )
 
     return render(
         request,
         'bookings/booking_form.html',
-        {'form': form, 'sport': sport}
+        {
+            'form': form,
+            'sport': sport,
+            'availability': availability,
+            'slot_taken': SLOT_TAKEN_MESSAGE in form.non_field_errors(),
+        },
+        status=busy_status(form)
     )
 
 
 # ==========================
-# VIEW OWN BOOKINGS
+# RECURRING BOOKING
+# ==========================
+@login_required
+def create_recurring_booking(request):
+    sport = request.GET.get('sport')
+    created, conflicts = None, None
+
+    if request.method == 'POST':
+        form = RecurringBookingForm(request.POST, sport=sport)
+
+        if form.is_valid():
+            booking_time = form.cleaned_data['booking_time']
+            created, conflicts = create_recurring_bookings(
+                request.user,
+                form.cleaned_data['courts'],
+                form.get_dates(),
+                booking_time,
+                ip_address=request.META.get('REMOTE_ADDR')
+            )
+
+            # 🔐 FILE SECURITY LOG
+            security_logger.info(
+                "Recurring booking CREATED | user=%s | time=%s | created=%s | "
+                "conflicts=%s",
+                request.user.username,
+                format_minutes(booking_time),
+                len(created),
+                len(conflicts)
+            )
+
+            if not conflicts:
+                messages.success(
+                    request,
+                    f"{len(created)} recurring bookings have been created"
+                )
+                return redirect('my_bookings')
+
+    else:
+        form = RecurringBookingForm(sport=sport)
+
+    return render(
+        request,
+        'bookings/recurring_booking_form.html',
+        {
+            'form': form,
+            'sport': sport,
+            'created': created,
+            'conflicts': conflicts,
+        }
+    )
+
+
+# ==========================
+# AVAILABILITY (JSON API)
+# ==========================
+@async_login_required
+async def availability(request):
+    sport = request.GET.get('sport')
+
+    try:
+        start = parse_date(request.GET.get('date') or '') or date.today()
+        end = parse_date(request.GET.get('end') or '') or start
+    except ValueError:
+        return JsonResponse({'error': 'Invalid date.'}, status=400)
+
+    if not sport:
+        return JsonResponse({'error': 'A sport is required.'}, status=400)
+
+    if end < start or end - start >= timedelta(days=MAX_AVAILABILITY_DAYS):
+        return JsonResponse(
+            {'error': f'Date range must be 1-{MAX_AVAILABILITY_DAYS} days.'},
+            status=400
+        )
+
+    grid = await sync_to_async(build_availability)(
+        sport, date_range(start, end), user=request.user
+    )
+    return JsonResponse(grid)
+
+
+# ==========================
+# SLOT HOLD (JSON API)
 # ==========================
 @login_required
-def my_bookings(request):
-    bookings = Booking.objects.filter(user=request.user)
+@require_POST
+def hold_slot(request):
+    form = SlotHoldForm(request.POST)
+
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+
+    held = take_slot_hold(
+        request.user.id,
+        form.cleaned_data['court'],
+        form.cleaned_data['booking_date'],
+        form.cleaned_data['booking_time']
+    )
+
+    if not held:
+        return JsonResponse({'held': False}, status=409)
+
+    return JsonResponse({'held': True, 'expires_in': SLOT_HOLD_SECONDS})
+
+
+# ==========================
+# VIEW OWN BOOKINGS
+# ==========================
+@async_login_required
+async def my_bookings(request):
+    tab = 'past' if request.GET.get('tab') == 'past' else 'upcoming'
+    today = date.today()
+
+    bookings = Booking.objects.filter(user=request.user).select_related('court')
+
+    if tab == 'past':
+        bookings = bookings.filter(booking_date__lt=today)
+    else:
+        bookings = bookings.filter(booking_date__gte=today)
+
+    page, next_cursor = await apaginate_bookings(
+        bookings,
+        cursor=request.GET.get('after'),
+        descending=(tab == 'past')
+    )
+
+    waitlist = []
+    if tab == 'upcoming' and not request.GET.get('after'):
+        waitlist = [
+            entry async for entry in
+            Waitlist.objects.filter(user=request.user, booking_date__gte=today)
+            .select_related('court')
+            .order_by('booking_date', 'booking_time')
+        ]
 
     return render(
         request,
         'bookings/booking_list.html',
-        {'bookings': bookings}
+        {
+            'bookings': page,
+            'waitlist': waitlist,
+            'tab': tab,
+            'next_cursor': next_cursor,
+            'is_first_page': not request.GET.get('after'),
+        }
     )
 
 
@@ -89,26 +340,47 @@ def update_booking(request, booking_id):
     )
 
     sport = booking.court.sport_type if booking.court else None
+    previous_slot = (booking.court, booking.booking_date, booking.booking_time)
 
     if request.method == 'POST':
         form = BookingForm(
             request.POST,
             instance=booking,
-            sport=sport
+            sport=sport,
+            user=request.user,
+            check_conflicts=False
         )
 
+        saved = False
         if form.is_valid():
-            form.save()
+            try:
+                with write_atomic():
+                    saved = form.save_booking()
+
+                    # The old slot is free now: offer it to the waitlist
+                    current_slot = (
+                        booking.court, booking.booking_date, booking.booking_time
+                    )
+                    if saved and current_slot != previous_slot:
+                        log_promotion(promote_waitlist(*previous_slot))
+            except OperationalError as exc:
+                if not is_lock_timeout(exc):
+                    raise
+                form.add_error(None, BUSY_MESSAGE)
+
+        if saved:
 
             # 🔐 FILE SECURITY LOG
             security_logger.info(
-                f"Booking UPDATED | user={request.user.username} | booking_id={booking.id}"
+                "Booking UPDATED | user=%s | booking_id=%s",
+                request.user.username,
+                booking.id
             )
 
             # 🧾 AUDIT LOG
-            AuditLog.objects.create(
+            audit_log(
+                'BOOKING_UPDATE',
                 user=request.user,
-                action='BOOKING_UPDATE',
                 ip_address=request.META.get('REMOTE_ADDR')
             )
 
@@ -121,7 +393,8 @@ def update_booking(request, booking_id):
     return render(
         request,
         'bookings/booking_form.html',
-        {'form': form}
+        {'form': form},
+        status=busy_status(form)
     )
 
 
@@ -138,17 +411,36 @@ def delete_booking(request, booking_id):
 
     if request.method == 'POST':
         booking_id = booking.id
-        booking.delete()
+
+        try:
+            with write_atomic():
+                booking.delete()
+                log_promotion(promote_waitlist(
+                    booking.court, booking.booking_date, booking.booking_time
+                ))
+        except OperationalError as exc:
+            if not is_lock_timeout(exc):
+                raise
+            # Nothing was deleted: offer the same confirmation again
+            messages.error(request, BUSY_MESSAGE)
+            return render(
+                request,
+                'bookings/booking_confirm_delete.html',
+                {'booking': booking},
+                status=503
+            )
 
         # 🔐 FILE SECURITY LOG
         security_logger.info(
-            f"Booking DELETED | user={request.user.username} | booking_id={booking_id}"
+            "Booking DELETED | user=%s | booking_id=%s",
+            request.user.username,
+            booking_id
         )
 
         # 🧾 AUDIT LOG
-        AuditLog.objects.create(
+        audit_log(
+            'BOOKING_DELETE',
             user=request.user,
-            action='BOOKING_DELETE',
             ip_address=request.META.get('REMOTE_ADDR')
         )
 
@@ -160,3 +452,45 @@ def delete_booking(request, booking_id):
         'bookings/booking_confirm_delete.html',
         {'booking': booking}
     )
+
+
+# ==========================
+# WAITLIST
+# ==========================
+@login_required
+@require_POST
+def join_waitlist(request):
+    form = WaitlistForm(request.POST)
+
+    if form.is_valid():
+        entry = form.save(commit=False)
+        entry.user = request.user
+        entry.save()
+
+        security_logger.info(
+            "Waitlist JOINED | user=%s | sport=%s | date=%s | time=%s",
+            request.user.username,
+            entry.sport,
+            entry.booking_date,
+            entry.time_label
+        )
+        messages.success(
+            request,
+            "You are on the waitlist. The slot will be booked for you "
+            "automatically if it becomes free."
+        )
+    else:
+        for error in form.non_field_errors():
+            messages.error(request, error)
+
+    return redirect('my_bookings')
+
+
+@login_required
+@require_POST
+def leave_waitlist(request, entry_id):
+    entry = get_object_or_404(Waitlist, id=entry_id, user=request.user)
+    entry.delete()
+
+    messages.success(request, "You have left the waitlist")
+    return redirect('my_bookings')
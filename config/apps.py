@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class ProjectConfig(AppConfig):
+    """Project-wide pieces that need the app registry: system checks."""
+    name = 'config'
+    verbose_name = 'Project configuration'
+
+    def ready(self):
+        from . import checks  # noqa: F401
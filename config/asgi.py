@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+# Persistent connections are WSGI-only (see DATABASES in settings)
+os.environ['DB_CONN_MAX_AGE'] = '0'
 
 application = get_asgi_application()
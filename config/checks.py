@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+from . import static_files
+
+
+# ==========================
+# STATIC PIPELINE
+# ==========================
+@register(Tags.staticfiles)
+def check_static_pipeline_dependencies(app_configs, **kwargs):
+    """
+    The production static storage skips card image variants without
+    Pillow and .br copies without Brotli. Runs with `collectstatic`.
+    """
+    backend = settings.STORAGES['staticfiles']['BACKEND']
+    if backend != 'config.static_files.CompressedManifestStaticFilesStorage':
+        return []
+
+    warnings = []
+    if static_files.Image is None:
+        warnings.append(Warning(
+            "Pillow is not installed: collectstatic builds no resized card "
+            "images and pages fall back to the full-size originals.",
+            hint="pip install -r requirements.txt",
+            id='config.W001',
+        ))
+    if static_files.brotli is None:
+        warnings.append(Warning(
+            "Brotli is not installed: collectstatic writes .gz copies only.",
+            hint="pip install -r requirements.txt",
+            id='config.W002',
+        ))
+    return warnings
@@ -0,0 +1,139 @@
+"""
+Read replicas.
+
+ReplicaRouter sends reads of the REPLICA_READ_APPS models to a random
+alias in DATABASE_REPLICAS and everything else to the primary. Reads stay
+on the primary:
+
+- inside a transaction on the primary,
+- inside use_primary(), for code whose result is cached,
+- for the rest of a request once it has written, and for
+  DATABASE_REPLICA_PIN_SECONDS afterwards through a session pin set by
+  ReplicaPinMiddleware, so users read their own writes.
+"""
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .sessions import aload_session
+
+PIN_SESSION_KEY = '_db_pinned_until'
+
+_pinned = ContextVar('db_pinned', default=False)
+_request_state = ContextVar('db_request_state', default=None)
+
+
+class RequestState:
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+@contextmanager
+def use_primary():
+    """Read from the primary inside the block."""
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+# ==========================
+# ROUTER
+# ==========================
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or model._meta.app_label not in settings.REPLICA_READ_APPS:
+            return None
+
+        state = _request_state.get()
+        if (
+            _pinned.get()
+            or (state and (state.pinned or state.wrote))
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+# ==========================
+# SESSION PIN
+# ==========================
+class ReplicaPinMiddleware:
+    """
+    Tracks writes per request and pins the session to the primary for
+    DATABASE_REPLICA_PIN_SECONDS after one. Must come after
+    SessionMiddleware.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            self.finish(request, token)
+        return response
+
+    async def __acall__(self, request):
+        await aload_session(request)
+
+        token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.finish(request, token)
+        return response
+
+    def start(self, request):
+        pinned = request.session.get(PIN_SESSION_KEY, 0) > time.time()
+        return _request_state.set(RequestState(pinned))
+
+    def finish(self, request, token):
+        state = _request_state.get()
+        _request_state.reset(token)
+
+        if state.wrote:
+            request.session[PIN_SESSION_KEY] = (
+                time.time() + settings.DATABASE_REPLICA_PIN_SECONDS
+            )
@@ -0,0 +1,225 @@
+"""
+Per-request performance metrics.
+
+PerformanceMiddleware times every request, the SQL it runs (through a
+connection execute wrapper) and its template rendering (through the
+TimedDjangoTemplates backend). Each response gets a Server-Timing header,
+and per-URL-name histograms are served in Prometheus text format by
+metrics_view at /metrics.
+
+Histograms live in this process; with several worker processes each one
+reports its own, and Prometheus sums them across scrape targets.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from django.template.backends.django import DjangoTemplates, Template
+
+_timings = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+
+
+# ==========================
+# HISTOGRAMS
+# ==========================
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """A Prometheus histogram with a 'view' label."""
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        # view -> [count per bucket..., +Inf count, sum]
+        self.series = {}
+
+    def observe(self, view, value):
+        series = self.series.get(view)
+        if series is None:
+            series = self.series.setdefault(view, [0] * (len(self.buckets) + 2))
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for view, series in sorted(self.series.items()):
+            label = view.replace('\\', '\\\\').replace('"', '\\"')
+            total = 0
+            for bound, count in zip((*self.buckets, '+Inf'), series):
+                total += count
+                lines.append(f'{self.name}_bucket{{view="{label}",le="{bound}"}} {total}')
+            lines.append(f'{self.name}_sum{{view="{label}"}} {series[-1]}')
+            lines.append(f'{self.name}_count{{view="{label}"}} {total}')
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds', "Time spent in the request, by URL name.",
+    SECONDS_BUCKETS
+)
+DB_SECONDS = Histogram(
+    'http_request_db_seconds', "Time spent in SQL per request.", SECONDS_BUCKETS
+)
+DB_QUERIES = Histogram(
+    'http_request_db_queries', "SQL queries per request.", QUERY_BUCKETS
+)
+TEMPLATE_SECONDS = Histogram(
+    'http_request_template_seconds', "Time spent rendering templates per request.",
+    SECONDS_BUCKETS
+)
+HISTOGRAMS = (REQUEST_SECONDS, DB_SECONDS, DB_QUERIES, TEMPLATE_SECONDS)
+
+_lock = threading.Lock()
+
+
+def record(view, seconds, timings):
+    with _lock:
+        REQUEST_SECONDS.observe(view, seconds)
+        DB_SECONDS.observe(view, timings.db_seconds)
+        DB_QUERIES.observe(view, timings.queries)
+        TEMPLATE_SECONDS.observe(view, timings.template_seconds)
+
+
+def render_metrics():
+    with _lock:
+        lines = [line for histogram in HISTOGRAMS for line in histogram.render()]
+    return '\n'.join(lines) + '\n'
+
+
+# ==========================
+# SQL AND TEMPLATE TIMING
+# ==========================
+def time_query(execute, sql, params, many, context):
+    timings = _timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db_seconds += time.perf_counter() - started
+        timings.queries += 1
+
+
+def instrument_connection(connection, **kwargs):
+    # Installed once per connection object and left in place: async views
+    # query from worker threads whose connections the middleware never sees.
+    # The middleware loads at startup, before those connections open.
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+connection_created.connect(instrument_connection)
+
+
+class TimedTemplate(Template):
+
+    def render(self, context=None, request=None):
+        timings = _timings.get()
+        if timings is None:
+            return super().render(context, request)
+
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timings.template_seconds += time.perf_counter() - started
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates whose templates add their render time to the request."""
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+
+# ==========================
+# MIDDLEWARE
+# ==========================
+class PerformanceMiddleware:
+    """Goes first in MIDDLEWARE so the timing covers the whole stack."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+        for connection in connections.all(initialized_only=True):
+            instrument_connection(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        timings = RequestTimings()
+        token = _timings.set(timings)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _timings.reset(token)
+        return self.finish(request, response, started, timings)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = _timings.set(timings)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _timings.reset(token)
+        return self.finish(request, response, started, timings)
+
+    def finish(self, request, response, started, timings):
+        seconds = time.perf_counter() - started
+        match = request.resolver_match
+        record(match.view_name if match else '<unresolved>', seconds, timings)
+
+        response['Server-Timing'] = (
+            f'app;dur={seconds * 1000:.1f}, '
+            f'db;dur={timings.db_seconds * 1000:.1f};desc="{timings.queries} queries", '
+            f'tpl;dur={timings.template_seconds * 1000:.1f}'
+        )
+        return response
+
+
+# ==========================
+# /metrics
+# ==========================
+def metrics_view(request):
+    """Prometheus scrape endpoint for staff users and METRICS_ALLOWED_IPS."""
+    if (
+        request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS
+        and not request.user.is_staff
+    ):
+        raise PermissionDenied
+
+    return HttpResponse(
+        render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
@@ -0,0 +1,94 @@
+"""
+Whole-page caching for pages that only differ by the nav.
+
+cache_anonymous_page() keeps one rendered copy of a page per name and
+serves it to requests that carry no session or flash-message cookie,
+with an ETag so browsers revalidate with a cheap 304. Logged-in users
+get the page rendered as usual.
+Keys include the court catalog generation and the sport list, so any
+Court change retires every cached page at once.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers, quote_etag
+)
+
+from courts.catalog import catalog_generation
+from courts.models import Court
+
+SPORTS_DIGEST = hashlib.md5(repr(Court.SPORT_CHOICES).encode()).hexdigest()[:8]
+
+
+def page_cache_key(name):
+    return f"page:{catalog_generation()}:{SPORTS_DIGEST}:{name}"
+
+
+def is_anonymous(request):
+    """No session and no pending flash messages: nothing user-specific to show."""
+    return (
+        settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and CookieStorage.cookie_name not in request.COOKIES
+    )
+
+
+def cache_anonymous_page(name, shared=False):
+    """
+    Serve the view's response from the cache for anonymous GET/HEAD
+    requests. With shared=True the page shows nothing about the visitor
+    and the cached copy is served to every request.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            cacheable = shared or (
+                request.method in ('GET', 'HEAD') and is_anonymous(request)
+            )
+            if not cacheable:
+                response = view(request, *args, **kwargs)
+                patch_vary_headers(response, ('Cookie',))
+                return response
+
+            key = page_cache_key(name)
+            entry = cache.get(key)
+
+            if entry is None:
+                response = view(request, *args, **kwargs)
+                # Never share a response that sets cookies or embeds a CSRF token
+                if (
+                    response.streaming or response.cookies
+                    or request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+                ):
+                    return response
+
+                entry = {
+                    'content': response.content,
+                    'status': response.status_code,
+                    'content_type': response['Content-Type'],
+                    'etag': quote_etag(hashlib.md5(response.content).hexdigest()),
+                }
+                cache.set(key, entry, settings.PAGE_CACHE_SECONDS)
+
+            response = HttpResponse(
+                entry['content'], status=entry['status'],
+                content_type=entry['content_type']
+            )
+            response['ETag'] = entry['etag']
+            patch_vary_headers(response, ('Cookie',))
+            # Revalidate every time: court changes must show up at once
+            patch_cache_control(response, public=True, no_cache=True)
+
+            if request.method in ('GET', 'HEAD'):
+                return get_conditional_response(
+                    request, etag=entry['etag'], response=response
+                )
+            return response
+
+        return wrapper
+
+    return decorator
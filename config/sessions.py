@@ -0,0 +1,6 @@
+from asgiref.sync import sync_to_async
+
+
+async def aload_session(request):
+    """Load the session once so later reads and writes stay in memory."""
+    await sync_to_async(request.session.keys)()
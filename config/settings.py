@@ -1,5 +1,7 @@
 from pathlib import Path
 import os
+import sys
+import tempfile
 
 # =========================
 # BASE DIRECTORY
@@ -14,6 +16,8 @@ SECRET_KEY = 'django-insecure-0mbnzuj!9+b^4=kt#c^#)58v!0=%!c7!*l(#s68#nqi2avwqr7
 # ✅ Development mode
 DEBUG = True
 
+TESTING = sys.argv[1:2] == ['test']
+
 ALLOWED_HOSTS = ['127.0.0.1', 'localhost']
 
 # =========================
@@ -32,6 +36,7 @@ INSTALLED_APPS = [
     'widget_tweaks',
 
     # Project apps
+    'config',
     'accounts',
     'courts',
     'bookings',
@@ -42,8 +47,10 @@ INSTALLED_APPS = [
 # MIDDLEWARE
 # =========================
 MIDDLEWARE = [
+    'config.metrics.PerformanceMiddleware',    # first: times the whole stack
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'config.db_router.ReplicaPinMiddleware',   # needs the session
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -64,7 +71,8 @@ ROOT_URLCONF = 'config.urls'
 # =========================
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates that reports render time to config.metrics
+        'BACKEND': 'config.metrics.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -86,13 +94,74 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # =========================
 # DATABASE
 # =========================
+# Production SQLite (config/db_backends/sqlite3): WAL, busy_timeout,
+# synchronous=NORMAL, mmap and cache size on connect, and BEGIN IMMEDIATE
+# for booking writes. Add a 'PRAGMAS' dict here to override the defaults.
+# Persistent connections (DB_CONN_MAX_AGE seconds, per thread) are for
+# WSGI only: under ASGI each request's sync code runs on its own thread
+# and kept connections pile up (Django #33497), so config/asgi.py forces 0.
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'config.db_backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 0)),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# PostgreSQL instead when POSTGRES_DB is set (needs psycopg installed)
+if os.environ.get('POSTGRES_DB'):
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ['POSTGRES_DB'],
+        'USER': os.environ.get('POSTGRES_USER', ''),
+        'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+        'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+        'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+        'CONN_MAX_AGE': DATABASES['default']['CONN_MAX_AGE'],
+        'CONN_HEALTH_CHECKS': True,
+    }
+
+# Read replicas as comma-separated SQLite paths, e.g.
+# DB_REPLICAS=/srv/replica1.sqlite3,/srv/replica2.sqlite3 (kept in sync by
+# `manage.py replicate_sqlite` locally). See config/db_router.py.
+for index, path in enumerate(filter(None, os.environ.get('DB_REPLICAS', '').split(',')), 1):
+    DATABASES[f'replica{index}'] = {
+        **DATABASES['default'],
+        'NAME': path,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+if TESTING:
+    # Mirrors the test database; routed to only by tests that override
+    # DATABASE_REPLICAS with it
+    DATABASES.setdefault('replica', {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}})
+DATABASE_ROUTERS = ['config.db_router.ReplicaRouter']
+REPLICA_READ_APPS = ['courts', 'bookings', 'logs']
+DATABASE_REPLICA_PIN_SECONDS = 5  # read-your-own-writes window after a write
+
+# =========================
+# CACHE
+# =========================
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'court-booking',
+    }
+}
+
+# Anonymous copies of home and the error pages (config/page_cache.py)
+PAGE_CACHE_SECONDS = 600
+
+# =========================
+# BOOKING SLOTS
+# =========================
+BOOKING_SLOT_MINUTES = int(os.environ.get('BOOKING_SLOT_MINUTES', 60))  # 30 / 60 / 90
+BOOKING_OPENING_HOUR = 8
+BOOKING_CLOSING_HOUR = 22
+BOOKING_HOLD_SECONDS = 180  # slot hold (lease) while a user is checking out
+
 # =========================
 # PASSWORD VALIDATION
 # =========================
@@ -116,6 +185,23 @@ USE_TZ = True
 # =========================
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# Outside DEBUG, collectstatic writes content-hashed names, a manifest,
+# .gz/.br copies and card image variants; config.static_files serves them.
+# The variants need Pillow and the .br copies Brotli (both in
+# requirements.txt); without them collectstatic warns and skips that step.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+            else 'config.static_files.CompressedManifestStaticFilesStorage'
+        ),
+    },
+}
 
 # =========================
 # DEFAULT PRIMARY KEY
@@ -153,10 +239,16 @@ AXES_ENABLE_ADMIN = True
 AXES_VERBOSE = True
 
 AXES_LOCKOUT_TEMPLATE = 'account_locked.html'
+AXES_LOCKOUT_CALLABLE = 'accounts.views.lockout_view'  # Cached copy of the template
 
 # =========================
 # LOGGING — SECURITY AUDIT
 # =========================
+SECURITY_LOG_FILE = os.path.join(BASE_DIR, 'logs', 'security.log')
+if TESTING:
+    # Keep test runs out of the real log
+    SECURITY_LOG_FILE = os.path.join(tempfile.gettempdir(), 'court-booking-test-security.log')
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -169,10 +261,14 @@ LOGGING = {
     },
 
     'handlers': {
+        # File I/O happens on a listener thread, not the request thread;
+        # rotated files are gzipped (security.log.1.gz, ...)
         'security_file': {
             'level': 'INFO',
-            'class': 'logging.FileHandler',
-            'filename': os.path.join(BASE_DIR, 'logs', 'security.log'),
+            'class': 'logs.handlers.QueuedRotatingFileHandler',
+            'filename': SECURITY_LOG_FILE,
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 10,
             'formatter': 'verbose',
         },
     },
@@ -186,6 +282,58 @@ LOGGING = {
     },
 }
 
+# =========================
+# AUDIT LOG WRITER
+# =========================
+# Entries are queued in-process and written with bulk_create by size or
+# time; tests write synchronously so assertions see rows immediately.
+AUDIT_LOG_BUFFERED = not TESTING
+AUDIT_LOG_BATCH_SIZE = 50
+AUDIT_LOG_FLUSH_SECONDS = 2.0
+
+# =========================
+# OTP (2FA)
+# =========================
+# The cache store needs a shared cache when running several processes;
+# 'accounts.otp.DatabaseOTPStore' keeps codes in the database instead.
+OTP_STORE = os.environ.get('OTP_STORE', 'accounts.otp.CacheOTPStore')
+OTP_TTL_SECONDS = 300
+OTP_MAX_ATTEMPTS = 5
+
+# Threads for password hashing in the async login view
+AUTH_HASHING_THREADS = int(os.environ.get('AUTH_HASHING_THREADS', os.cpu_count() or 2))
+
+# =========================
+# EMAIL OUTBOX
+# =========================
+# Views only enqueue; `manage.py send_outbox --loop` delivers. Point
+# EMAIL_HOST/EMAIL_PORT at a local stand-in (e.g. aiosmtpd) to try it.
+EMAIL_BACKEND = os.environ.get(
+    'EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend'
+)
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 25))
+OUTBOX_BATCH_SIZE = 50
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_SECONDS = 30
+OUTBOX_LEASE_SECONDS = 300
+
+# =========================
+# AUDIT LOG RETENTION
+# =========================
+# `manage.py archive_audit_logs` moves older rows to gzipped JSONL files
+AUDIT_LOG_RETENTION_DAYS = int(os.environ.get('AUDIT_LOG_RETENTION_DAYS', 90))
+AUDIT_LOG_ARCHIVE_DIR = os.path.join(BASE_DIR, 'logs', 'archive')
+AUDIT_LOG_ARCHIVE_BATCH_SIZE = 1000
+
+# =========================
+# METRICS
+# =========================
+# /metrics is open to staff users only, plus scrapers from the addresses
+# listed here, e.g. METRICS_ALLOWED_IPS=10.0.0.5. Never list loopback
+# behind a local reverse proxy: every proxied request comes from it.
+METRICS_ALLOWED_IPS = list(filter(None, os.environ.get('METRICS_ALLOWED_IPS', '').split(',')))
+
 # =========================
 # SECURITY HEADERS
 # =========================
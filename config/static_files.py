@@ -0,0 +1,202 @@
+"""
+Production static files.
+
+CompressedManifestStaticFilesStorage is ManifestStaticFilesStorage plus
+two collectstatic steps: resized copies of the card images (WebP and
+JPEG, when Pillow is installed) that are hashed like any other file, and
+gzip (and brotli, when installed) copies of every compressible file.
+
+serve_static() serves STATIC_ROOT when DEBUG is off: the precompressed
+copy the client accepts, and a year-long immutable Cache-Control on
+content-hashed names, which never change.
+"""
+import gzip
+import mimetypes
+import posixpath
+import re
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import (
+    ManifestStaticFilesStorage, staticfiles_storage
+)
+from django.core.files.base import ContentFile
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.functional import cached_property
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Card images get a variant per width, narrower than the original only
+IMAGE_VARIANT_PATTERN = re.compile(r'^images/[^/]+\.(jpe?g|png)$', re.IGNORECASE)
+IMAGE_VARIANT_WIDTHS = (400, 800)
+IMAGE_VARIANT_FORMATS = {'webp': ('WEBP', {'quality': 80}),
+                         'jpg': ('JPEG', {'quality': 82, 'progressive': True})}
+
+COMPRESSIBLE = re.compile(r'\.(css|js|mjs|map|json|svg|txt|xml|html|ico|ttf|eot)$')
+# Below this, compression headers cost more than they save
+COMPRESS_MIN_SIZE = 256
+
+# (Accept-Encoding token, file suffix), best first
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+YEAR = 60 * 60 * 24 * 365
+
+
+def variant_name(name, width, extension):
+    stem = name.rsplit('.', 1)[0]
+    return f"{stem}.{width}w.{extension}"
+
+
+# ==========================
+# STORAGE
+# ==========================
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    @cached_property
+    def hashed_names(self):
+        return frozenset(self.hashed_files.values())
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            return
+
+        paths = dict(paths)
+        paths.update(self.create_image_variants(paths))
+
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+        # Originals and hashed copies are both served; compress both
+        names = set(self.hashed_files) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if COMPRESSIBLE.search(name) and self.exists(name):
+                self.compress(name)
+
+    def create_image_variants(self, paths):
+        """Resized copies of the card images, saved here so they get hashed too."""
+        if Image is None:
+            return {}
+
+        variants = {}
+        for name, (storage, path) in paths.items():
+            if not IMAGE_VARIANT_PATTERN.match(name):
+                continue
+
+            with storage.open(path) as handle:
+                original = Image.open(handle)
+                original.load()
+            if original.mode not in ('RGB', 'L'):
+                original = original.convert('RGB')
+
+            for width in IMAGE_VARIANT_WIDTHS:
+                if width >= original.width:
+                    continue
+                resized = original.resize(
+                    (width, round(original.height * width / original.width)),
+                    Image.LANCZOS
+                )
+                for extension, (image_format, params) in IMAGE_VARIANT_FORMATS.items():
+                    target = variant_name(name, width, extension)
+                    buffer = BytesIO()
+                    resized.save(buffer, image_format, **params)
+                    self._replace(target, ContentFile(buffer.getvalue()))
+                    variants[target] = (self, target)
+
+        return variants
+
+    def compress(self, name):
+        with self.open(name) as handle:
+            content = handle.read()
+        if len(content) < COMPRESS_MIN_SIZE:
+            return
+
+        compressed = {'.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            compressed['.br'] = brotli.compress(content)
+
+        for suffix, data in compressed.items():
+            if len(data) < len(content):
+                self._replace(name + suffix, ContentFile(data))
+
+    def _replace(self, name, content):
+        if self.exists(name):
+            self.delete(name)
+        self._save(name, content)
+
+
+def image_srcsets(name):
+    """
+    srcset strings for the variants of a static image, by extension.
+    Empty unless collectstatic built them into the manifest.
+    """
+    hashed_files = getattr(staticfiles_storage, 'hashed_files', {})
+    srcsets = {}
+    for extension in IMAGE_VARIANT_FORMATS:
+        candidates = [
+            (variant_name(name, width, extension), width) for width in IMAGE_VARIANT_WIDTHS
+        ]
+        srcsets[extension] = ', '.join(
+            f"{staticfiles_storage.url(variant)} {width}w"
+            for variant, width in candidates if variant in hashed_files
+        )
+    return srcsets
+
+
+# ==========================
+# SERVING
+# ==========================
+def accepted_encodings(request):
+    return {
+        token.split(';')[0].strip()
+        for token in request.headers.get('Accept-Encoding', '').split(',')
+    }
+
+
+def serve_static(request, path):
+    """STATIC_ROOT with precompressed copies and far-future caching."""
+    path = posixpath.normpath(path).lstrip('/')
+    fullpath = Path(safe_join(settings.STATIC_ROOT, path))
+    if not fullpath.is_file():
+        raise Http404
+
+    served, encoding = fullpath, None
+    if COMPRESSIBLE.search(fullpath.name):
+        accepted = accepted_encodings(request)
+        for token, suffix in ENCODINGS:
+            candidate = fullpath.with_name(fullpath.name + suffix)
+            if token in accepted and candidate.is_file():
+                served, encoding = candidate, token
+                break
+
+    stat = served.stat()
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime):
+        response = HttpResponseNotModified()
+    else:
+        content_type, _ = mimetypes.guess_type(fullpath.name)
+        response = FileResponse(
+            served.open('rb'), filename=fullpath.name,
+            content_type=content_type or 'application/octet-stream'
+        )
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        if encoding:
+            response['Content-Encoding'] = encoding
+
+    patch_vary_headers(response, ('Accept-Encoding',))
+    if path in getattr(staticfiles_storage, 'hashed_names', ()):
+        # A hashed name changes whenever its content does
+        patch_cache_control(response, public=True, max_age=YEAR, immutable=True)
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
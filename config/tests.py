@@ -0,0 +1,237 @@
+import gzip
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from contextlib import closing
+from datetime import date, timedelta
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.test import (
+    SimpleTestCase, TestCase, TransactionTestCase, override_settings
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from bookings.management.commands.replicate_sqlite import replicate
+from bookings.models import Booking
+from courts.models import Court
+from . import static_files
+from .checks import check_static_pipeline_dependencies
+from .db_router import PIN_SESSION_KEY, ReplicaRouter, use_primary
+from .static_files import Image, image_srcsets
+
+
+class PerformanceMetricsTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('member', password='pass12345')
+        self.client.force_login(self.user)
+
+    def test_server_timing_and_histograms(self):
+        response = self.client.get(reverse('my_bookings'))
+        self.assertRegex(
+            response['Server-Timing'],
+            r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries", tpl;dur=[\d.]+$'
+        )
+
+        with self.settings(METRICS_ALLOWED_IPS=['127.0.0.1']):
+            metrics = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', metrics)
+        self.assertIn('http_request_db_queries_bucket{view="my_bookings",le="+Inf"}', metrics)
+        self.assertIn('http_request_template_seconds_count{view="my_bookings"}', metrics)
+
+    def test_metrics_limited_to_staff_and_listed_scrapers(self):
+        self.assertEqual(
+            self.client.get(reverse('metrics'), REMOTE_ADDR='203.0.113.9').status_code, 403
+        )
+        # Loopback is a local proxy as often as a scraper: not trusted by default
+        self.assertEqual(
+            self.client.get(reverse('metrics'), REMOTE_ADDR='127.0.0.1').status_code, 403
+        )
+        with self.settings(METRICS_ALLOWED_IPS=['10.0.0.5']):
+            self.assertEqual(
+                self.client.get(reverse('metrics'), REMOTE_ADDR='10.0.0.5').status_code, 200
+            )
+
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(
+            self.client.get(reverse('metrics'), REMOTE_ADDR='203.0.113.9').status_code, 200
+        )
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRouterTests(SimpleTestCase):
+
+    def test_reads_go_to_replica_unless_pinned(self):
+        router = ReplicaRouter()
+
+        self.assertEqual(router.db_for_read(Booking), 'replica')
+        # Auth and sessions always read from the primary
+        self.assertIsNone(router.db_for_read(User))
+        with use_primary():
+            self.assertEqual(router.db_for_read(Booking), 'default')
+        self.assertEqual(router.db_for_write(Booking), 'default')
+        self.assertFalse(router.allow_migrate('replica', 'bookings'))
+
+    def test_replicate_copies_primary_file(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        primary, replica = (os.path.join(directory, name) for name in ('p.db', 'r.db'))
+
+        with closing(sqlite3.connect(primary)) as db, db:
+            db.execute("CREATE TABLE t (x)")
+            db.execute("INSERT INTO t VALUES (1)")
+        replicate(primary, [replica])
+
+        with closing(sqlite3.connect(replica)) as db:
+            self.assertEqual(db.execute("SELECT x FROM t").fetchall(), [(1,)])
+
+
+# TestCase wraps every request in a transaction, which keeps all reads on
+# the primary; 'replica' mirrors the test database
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaPinTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        self.user = User.objects.create_user('player', password='pass12345')
+        self.court = Court.objects.create(name='Court 1', sport_type='tennis')
+        self.client.force_login(self.user)
+
+    def booking_reads(self, alias, at=None):
+        """my_bookings queries on `alias`, optionally with the clock at `at`."""
+        with CaptureQueriesContext(connections[alias]) as queries:
+            if at is None:
+                self.client.get(reverse('my_bookings'))
+            else:
+                with mock.patch('config.db_router.time.time', return_value=at):
+                    self.client.get(reverse('my_bookings'))
+        return [q for q in queries if 'bookings_booking' in q['sql']]
+
+    def test_write_pins_session_to_primary_until_it_expires(self):
+        self.assertTrue(self.booking_reads('replica'))
+        self.assertNotIn(PIN_SESSION_KEY, self.client.session)
+
+        self.client.post(reverse('create_booking') + '?sport=tennis', {
+            'court': self.court.pk,
+            'booking_date': (date.today() + timedelta(days=1)).isoformat(),
+            'booking_time': 600,
+        })
+        pinned_until = self.client.session[PIN_SESSION_KEY]
+        self.assertGreater(pinned_until, time.time())
+
+        # Read-your-own-writes: the new booking comes from the primary
+        self.assertTrue(self.booking_reads('default'))
+        self.assertFalse(self.booking_reads('replica'))
+
+        self.assertLessEqual(
+            pinned_until, time.time() + settings.DATABASE_REPLICA_PIN_SECONDS
+        )
+        self.assertTrue(self.booking_reads('replica', at=pinned_until + 1))
+
+
+class PageCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_anonymous_home_is_served_from_the_cache(self):
+        first = self.client.get(reverse('home'))
+        self.assertTrue(first.templates)
+        self.assertIn('Cookie', first['Vary'])
+        self.assertIn('no-cache', first['Cache-Control'])
+
+        second = self.client.get(reverse('home'))
+        self.assertFalse(second.templates)
+        self.assertEqual(second.content, first.content)
+
+        revalidated = self.client.get(reverse('home'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_error_pages_are_cached_with_their_status(self):
+        self.client.get('/no-such-page/')
+        response = self.client.get('/another-missing-page/')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.templates)
+
+    def test_logged_in_users_get_their_own_page(self):
+        self.client.get(reverse('home'))
+        self.client.force_login(User.objects.create_user('member', password='pass12345'))
+
+        response = self.client.get(reverse('home'))
+
+        self.assertTrue(response.templates)
+        self.assertContains(response, 'Hi, member')
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_court_change_retires_cached_pages(self):
+        self.client.get(reverse('home'))
+        Court.objects.create(name='Court 9', sport_type='tennis')
+
+        self.assertTrue(self.client.get(reverse('home')).templates)
+
+
+@override_settings(STORAGES={
+    **settings.STORAGES,
+    'staticfiles': {'BACKEND': 'config.static_files.CompressedManifestStaticFilesStorage'},
+})
+class StaticPipelineTests(SimpleTestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        settings_override = override_settings(STATIC_ROOT=self.root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    def test_hashed_files_are_precompressed_and_cached_for_a_year(self):
+        url = staticfiles_storage.url('admin/css/base.css')
+        self.assertRegex(url, r'/admin/css/base\.[0-9a-f]{12}\.css$')
+        self.assertFalse(os.path.exists(staticfiles_storage.path('images/tennis.jpg') + '.gz'))
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        body = b''.join(response.streaming_content)
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertIn('immutable', response['Cache-Control'])
+        with staticfiles_storage.open(staticfiles_storage.stored_name('admin/css/base.css')) as original:
+            self.assertEqual(gzip.decompress(body), original.read())
+
+    def test_unhashed_names_are_revalidated(self):
+        response = self.client.get('/static/admin/css/base.css')
+
+        self.assertNotIn('Content-Encoding', response)
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertEqual(
+            self.client.get(
+                '/static/admin/css/base.css', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+            ).status_code,
+            304
+        )
+
+    @skipUnless(Image, "Pillow is not installed")
+    def test_card_image_variants_feed_the_srcset(self):
+        srcsets = image_srcsets('images/tennis.jpg')
+
+        self.assertRegex(srcsets['webp'], r'tennis\.400w\.[0-9a-f]{12}\.webp 400w')
+        self.assertRegex(srcsets['jpg'], r'tennis\.400w\.[0-9a-f]{12}\.jpg 400w')
+
+    def test_missing_encoders_are_reported_at_collectstatic(self):
+        with mock.patch.object(static_files, 'Image', None), \
+                mock.patch.object(static_files, 'brotli', None):
+            ids = [warning.id for warning in check_static_pipeline_dependencies(None)]
+
+        self.assertEqual(ids, ['config.W001', 'config.W002'])
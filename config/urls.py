@@ -1,9 +1,13 @@
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.shortcuts import render
 from django.core.exceptions import BadRequest, PermissionDenied
 
 from accounts import views as accounts_views
+from config.metrics import metrics_view
+from config.page_cache import cache_anonymous_page
+from config.static_files import serve_static
 
 
 # ==========================
@@ -15,6 +19,14 @@ handler404 = accounts_views.page_not_found_view
 handler500 = accounts_views.server_error_view
 
 
+# ==========================
+# HOME
+# ==========================
+@cache_anonymous_page('home')
+def home(request):
+    return render(request, "home.html")
+
+
 # ==========================
 # ERROR TEST ROUTES
 # ==========================
@@ -32,19 +44,28 @@ def test_500(request):
 # URL PATTERNS
 # ==========================
 urlpatterns = [
-    path("", lambda request: render(request, "home.html"), name="home"),
+    path("", home, name="home"),
 
     path("admin/", admin.site.urls),
 
-    path("accounts/", include("django.contrib.auth.urls")),
+    # The app's login (password, then OTP) must win over django.contrib.auth's
     path("accounts/", include("accounts.urls")),
+    path("accounts/", include("django.contrib.auth.urls")),
 
     path("bookings/", include("bookings.urls")),
     path("courts/", include("courts.urls")),
     path("logs/", include("logs.urls")),
 
+    path("metrics", metrics_view, name="metrics"),
+
     # ERROR TEST
     path("test-400/", test_400),
     path("test-403/", test_403),
     path("test-500/", test_500),
-]
\ No newline at end of file
+]
+
+# runserver serves static files itself under DEBUG
+if not settings.DEBUG:
+    urlpatterns += [
+        re_path(rf"^{settings.STATIC_URL.strip('/')}/(?P<path>.+)$", serve_static, name="static"),
+    ]
\ No newline at end of file
@@ -0,0 +1,58 @@
+import copy
+import time
+
+from django.core.cache import cache
+
+from config.db_router import use_primary
+
+from .models import Court, normalize_sport
+
+# ==========================
+# COURT CATALOG
+# ==========================
+# Courts per sport, cached in two tiers: a dict in this process and the
+# shared cache. Both are tagged with a generation number kept in the
+# shared cache; bumping it on any Court change retires every copy in
+# every process at once.
+CATALOG_CACHE_TIMEOUT = 60 * 60
+GENERATION_KEY = 'court-catalog:generation'
+
+_local_catalog = {}
+
+
+def catalog_generation():
+    # Time-based, so an evicted key never revives an old generation
+    cache.add(GENERATION_KEY, time.time_ns(), None)
+    return cache.get(GENERATION_KEY)
+
+
+def invalidate_court_catalog():
+    cache.set(GENERATION_KEY, time.time_ns(), None)
+
+
+def get_sport_courts(sport):
+    """All courts of a sport ordered by name, open or closed."""
+    sport = normalize_sport(sport)
+    generation = catalog_generation()
+
+    local = _local_catalog.get(sport)
+    if local and local[0] == generation:
+        courts = local[1]
+    else:
+        key = f"court-catalog:{generation}:{sport}"
+        courts = cache.get(key)
+
+        if courts is None:
+            # Cached per generation, so never from a lagging replica
+            with use_primary():
+                courts = list(Court.objects.filter(sport_type=sport).order_by('name'))
+            cache.set(key, courts, CATALOG_CACHE_TIMEOUT)
+
+        _local_catalog[sport] = (generation, courts)
+
+    # Callers get their own instances, never the cached ones
+    return [copy.copy(court) for court in courts]
+
+
+def get_available_courts(sport):
+    return [court for court in get_sport_courts(sport) if court.is_available]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:54
+
+from django.db import migrations, models
+from django.db.models.functions import Lower, Trim
+
+
+def normalize_sport_types(apps, schema_editor):
+    Court = apps.get_model('courts', 'Court')
+    Court.objects.using(schema_editor.connection.alias).update(sport_type=Lower(Trim('sport_type')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_sport_types, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='court',
+            name='sport_type',
+            field=models.CharField(choices=[('badminton', 'Badminton'), ('tennis', 'Tennis'), ('pickleball', 'Pickleball')], db_index=True, max_length=20),
+        ),
+    ]
@@ -3,6 +3,12 @@ from django.db import models
 # Create your models here.
 from django.db import models
 
+
+def normalize_sport(sport):
+    """Sports are stored lower-case so lookups can use the plain index."""
+    return (sport or '').strip().lower()
+
+
 class Court(models.Model):
     SPORT_CHOICES = [
         ('badminton', 'Badminton'),
@@ -11,9 +17,16 @@ class Court(models.Model):
     ]
 
     name = models.CharField(max_length=100)
-    sport_type = models.CharField(max_length=20, choices=SPORT_CHOICES)
+    sport_type = models.CharField(
+        max_length=20,
+        choices=SPORT_CHOICES,
+        db_index=True
+    )
     is_available = models.BooleanField(default=True)
 
+    def save(self, *args, **kwargs):
+        self.sport_type = normalize_sport(self.sport_type)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.name} ({self.sport_type})"
-
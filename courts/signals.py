@@ -0,0 +1,17 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .catalog import invalidate_court_catalog
+from .models import Court
+
+
+# ==========================
+# COURT CATALOG INVALIDATION
+# ==========================
+@receiver(post_save, sender=Court)
+@receiver(post_delete, sender=Court)
+def court_changed(sender, instance, **kwargs):
+    invalidate_court_catalog()
+    # Again after commit, in case a reader cached the old rows meanwhile
+    transaction.on_commit(invalidate_court_catalog)
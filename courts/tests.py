@@ -1,3 +1,48 @@
+from django.core.cache import cache
 from django.test import TestCase
 
-# Create your tests here.
+from bookings.forms import BookingForm
+from .catalog import get_available_courts, get_sport_courts
+from .models import Court
+
+
+class CourtCatalogTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.court = Court.objects.create(name='Court B', sport_type='Tennis ')
+        Court.objects.create(name='Court A', sport_type='tennis', is_available=False)
+        Court.objects.create(name='Court C', sport_type='badminton')
+
+    def test_sport_type_is_normalized(self):
+        self.court.refresh_from_db()
+        self.assertEqual(self.court.sport_type, 'tennis')
+
+        self.assertEqual(
+            [court.name for court in get_sport_courts('TENNIS')],
+            ['Court A', 'Court B']
+        )
+
+    def test_catalog_is_cached_and_invalidated_by_court_changes(self):
+        get_sport_courts('tennis')
+
+        with self.assertNumQueries(0):
+            form = BookingForm(sport='tennis')
+            form.as_p()
+        self.assertEqual(list(form.fields['court'].choices),
+                         [(self.court.pk, str(self.court))])
+
+        self.court.is_available = False
+        self.court.save()
+        self.assertEqual(get_available_courts('tennis'), [])
+
+        self.court.delete()
+        self.assertEqual(len(get_sport_courts('tennis')), 1)
+
+    def test_form_only_accepts_catalog_courts(self):
+        closed = Court.objects.get(name='Court A')
+        form = BookingForm({'court': closed.pk}, sport='tennis')
+
+        form.is_valid()
+
+        self.assertIn('court', form.errors)
@@ -7,3 +7,5 @@ class AuditLogAdmin(admin.ModelAdmin):
     list_display = ('user', 'action', 'ip_address', 'timestamp')
     list_filter = ('action', 'timestamp')
     search_fields = ('user__username', 'ip_address')
+    list_select_related = ('user',)
+    ordering = ('-timestamp',)
@@ -0,0 +1,135 @@
+import gzip
+import json
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import AuditLog
+
+ARCHIVE_FIELDS = ('id', 'user_id', 'user__username', 'action', 'ip_address', 'timestamp')
+
+
+# ==========================
+# ARCHIVING
+# ==========================
+def archive_file_name(directory, now=None):
+    now = now or timezone.now()
+    return os.path.join(
+        directory, f"auditlog-{now.strftime('%Y%m%d-%H%M%S')}.jsonl.gz"
+    )
+
+
+def serialize_entry(row):
+    return json.dumps({
+        'id': row['id'],
+        'user_id': row['user_id'],
+        'username': row['user__username'],
+        'action': row['action'],
+        'ip_address': row['ip_address'],
+        'timestamp': row['timestamp'].isoformat(),
+    })
+
+
+def archive_audit_logs(days=None, directory=None, batch_size=None, now=None):
+    """
+    Move AuditLog rows older than `days` into a gzipped JSONL file.
+
+    Rows are handled oldest first in batches of `batch_size`. Each batch
+    is written and flushed to the archive before it is deleted in its
+    own short transaction, so the table is never locked for the whole
+    run and a crash can only leave a row in both places, never in
+    neither. Returns (archived_count, path), path None if nothing moved.
+    """
+    days = settings.AUDIT_LOG_RETENTION_DAYS if days is None else days
+    directory = directory or settings.AUDIT_LOG_ARCHIVE_DIR
+    batch_size = batch_size or settings.AUDIT_LOG_ARCHIVE_BATCH_SIZE
+    now = now or timezone.now()
+
+    old_rows = AuditLog.objects.filter(
+        timestamp__lt=now - timedelta(days=days)
+    ).order_by('timestamp', 'id')
+
+    if not old_rows.exists():
+        return 0, None
+
+    os.makedirs(directory, exist_ok=True)
+    path = archive_file_name(directory, now)
+    archived = 0
+
+    with gzip.open(path, 'at', encoding='utf-8') as archive:
+        while True:
+            rows = list(old_rows.values(*ARCHIVE_FIELDS)[:batch_size])
+            if not rows:
+                break
+
+            archive.write(''.join(serialize_entry(row) + '\n' for row in rows))
+            # Sync-flush so the batch is readable before its rows are deleted
+            archive.flush()
+
+            with transaction.atomic():
+                AuditLog.objects.filter(id__in=[row['id'] for row in rows]).delete()
+
+            archived += len(rows)
+
+    return archived, path
+
+
+# ==========================
+# LOADING BACK
+# ==========================
+def read_archive(path):
+    with gzip.open(path, 'rt', encoding='utf-8') as archive:
+        for line in archive:
+            if line.strip():
+                yield json.loads(line)
+
+
+def load_archive(path, batch_size=None):
+    """
+    Restore the rows of an archive file into AuditLog.
+
+    Original ids are kept and existing ids are skipped, so loading the
+    same file twice is harmless. Entries whose user no longer exists are
+    restored without one. Returns the number of rows read.
+    """
+    batch_size = batch_size or settings.AUDIT_LOG_ARCHIVE_BATCH_SIZE
+    loaded = 0
+    batch = []
+
+    def save(entries):
+        user_ids = set(
+            User.objects.filter(
+                id__in={entry['user_id'] for entry in entries if entry['user_id']}
+            ).values_list('id', flat=True)
+        )
+        AuditLog.objects.bulk_create(
+            [
+                AuditLog(
+                    id=entry['id'],
+                    user_id=entry['user_id'] if entry['user_id'] in user_ids else None,
+                    action=entry['action'],
+                    ip_address=entry['ip_address'],
+                    timestamp=parse_datetime(entry['timestamp'])
+                )
+                for entry in entries
+            ],
+            ignore_conflicts=True
+        )
+
+    for entry in read_archive(path):
+        batch.append(entry)
+        if len(batch) >= batch_size:
+            save(batch)
+            loaded += len(batch)
+            batch = []
+
+    if batch:
+        save(batch)
+        loaded += len(batch)
+
+    return loaded
@@ -0,0 +1,32 @@
+from django import forms
+from django.core.exceptions import ValidationError
+
+from .models import AuditLog
+
+
+class AuditQueryForm(forms.Form):
+    BUCKET_CHOICES = [
+        ('hour', 'Hour'),
+        ('day', 'Day'),
+    ]
+
+    action = forms.ChoiceField(
+        choices=[('', 'Any')] + AuditLog.ACTION_CHOICES,
+        required=False
+    )
+    user = forms.CharField(max_length=150, required=False)
+    ip = forms.GenericIPAddressField(required=False)
+    since = forms.DateTimeField(required=False)
+    until = forms.DateTimeField(required=False)
+    bucket = forms.ChoiceField(choices=BUCKET_CHOICES, required=False)
+    cursor = forms.CharField(required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        since = cleaned_data.get('since')
+        until = cleaned_data.get('until')
+
+        if since and until and until <= since:
+            raise ValidationError("'until' must be after 'since'.")
+
+        return cleaned_data
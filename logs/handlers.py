@@ -0,0 +1,153 @@
+import atexit
+import gzip
+import os
+import queue
+from itertools import islice
+from logging.handlers import (
+    QueueHandler,
+    QueueListener,
+    RotatingFileHandler,
+    TimedRotatingFileHandler,
+)
+
+from .logreader import INDEX_STEP, index_path, write_segment_index
+
+
+# ==========================
+# ROTATION WITH COMPRESSION
+# ==========================
+class GzipRotationMixin:
+    """
+    Compress rotated files: security.log.1 becomes security.log.1.gz.
+
+    The file is written as one gzip member per member_lines lines, which
+    gzip readers see as a single stream, and security.log.1.gz.idx lists
+    where each member starts so logreader can decompress only the
+    members a page needs. Only numbered backups get the index, since
+    those are the segments logreader pages through.
+    """
+    segment_index = False
+    member_lines = INDEX_STEP
+
+    def rotation_filename(self, default_name):
+        return f"{default_name}.gz"
+
+    def rotate(self, source, dest):
+        if not os.path.exists(source):
+            return
+
+        members = []
+        with open(source, 'rb') as f_in, open(dest, 'wb') as f_out:
+            offset = 0
+            while lines := list(islice(f_in, self.member_lines)):
+                chunk = b''.join(lines)
+                members.append([offset, f_out.tell()])
+                f_out.write(gzip.compress(chunk, mtime=0))
+                offset += len(chunk)
+            compressed_size = f_out.tell()
+
+        if self.segment_index:
+            write_segment_index(dest, {
+                'members': members,
+                'size': offset,
+                'compressed_size': compressed_size,
+            })
+        os.remove(source)
+
+
+class CompressedRotatingFileHandler(GzipRotationMixin, RotatingFileHandler):
+    segment_index = True
+
+    def doRollover(self):
+        # Shift the member indexes the same way the .N.gz files are shifted
+        if self.backupCount > 0:
+            for number in range(self.backupCount - 1, 0, -1):
+                source = index_path(self.rotation_filename(f"{self.baseFilename}.{number}"))
+                dest = index_path(self.rotation_filename(f"{self.baseFilename}.{number + 1}"))
+                if os.path.exists(source):
+                    os.replace(source, dest)
+                elif os.path.exists(dest):
+                    os.remove(dest)
+        super().doRollover()
+
+
+class CompressedTimedRotatingFileHandler(GzipRotationMixin, TimedRotatingFileHandler):
+    pass
+
+
+# ==========================
+# NON-BLOCKING FILE HANDLER
+# ==========================
+class QueuedRotatingFileHandler(QueueHandler):
+    """
+    Put records on an in-memory queue and let a QueueListener thread
+    format and write them to a compressed rotating file.
+
+    Request threads only enqueue the record; %-style arguments are
+    merged by the listener, so call sites should pass them lazily:
+    logger.info("Booking CREATED | user=%s", username).
+
+    Rotation is size-based (maxBytes) unless `when` is given, in which
+    case it is time-based like TimedRotatingFileHandler.
+
+    The listener starts with the first record of each process: threads
+    do not survive fork(), so a forked worker gets its own queue and
+    listener instead of filling one nobody drains.
+    """
+
+    def __init__(self, filename, maxBytes=0, backupCount=0, when=None,
+                 encoding='utf-8'):
+        if when:
+            target = CompressedTimedRotatingFileHandler(
+                filename, when=when, backupCount=backupCount,
+                encoding=encoding, delay=True
+            )
+        else:
+            target = CompressedRotatingFileHandler(
+                filename, maxBytes=maxBytes, backupCount=backupCount,
+                encoding=encoding, delay=True
+            )
+
+        super().__init__(queue.SimpleQueue())
+        self.target = target
+        self.listener = None
+        self._pid = None
+
+        # Drain the queue before the process exits
+        atexit.register(self.close)
+
+    def setFormatter(self, fmt):
+        # Formatting happens on the listener thread
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def emit(self, record):
+        # handle() holds self.lock here, and logging resets it after fork()
+        if self._pid != os.getpid():
+            self._start_listener()
+        super().emit(record)
+
+    def _start_listener(self):
+        if self._pid is not None:
+            # Forked: the parent's listener is gone, and the records
+            # queued before the fork are the parent's to write
+            self.queue = queue.SimpleQueue()
+
+        self._pid = os.getpid()
+        self.listener = QueueListener(self.queue, self.target, respect_handler_level=True)
+        self.listener.start()
+
+    def prepare(self, record):
+        # Hand the record over unformatted; it never leaves this process
+        return record
+
+    def close(self):
+        if (
+            self.listener is not None
+            and self.listener._thread is not None
+            and self._pid == os.getpid()
+        ):
+            self.listener.stop()
+            self.target.close()
+
+        super().close()
@@ -0,0 +1,348 @@
+import gzip
+import json
+import os
+import re
+import zlib
+from collections import deque
+
+BLOCK_SIZE = 64 * 1024
+INDEX_STEP = 1000
+MAX_ROTATED_FILES = 100
+
+
+# ==========================
+# LOG SEGMENTS
+# ==========================
+def log_segments(path):
+    """
+    Return the live log followed by its rotated copies, newest first:
+    security.log, security.log.1.gz, security.log.2.gz, ...
+    """
+    segments = [path] if os.path.exists(path) else []
+
+    for number in range(1, MAX_ROTATED_FILES + 1):
+        for candidate in (f"{path}.{number}.gz", f"{path}.{number}"):
+            if os.path.exists(candidate):
+                segments.append(candidate)
+                break
+        else:
+            break
+
+    return segments
+
+
+def encode_cursor(segment, offset=None):
+    return str(segment) if offset is None else f"{segment}:{offset}"
+
+
+def decode_cursor(cursor):
+    """
+    Return (segment, offset) from a cursor, or None if it is malformed.
+    An offset of None means "from the end of the segment".
+    """
+    try:
+        parts = [int(part) for part in cursor.split(':')]
+    except (AttributeError, ValueError):
+        return None
+
+    if len(parts) == 1:
+        parts.append(None)
+
+    if len(parts) != 2 or parts[0] < 0 or (parts[1] is not None and parts[1] < 0):
+        return None
+
+    return parts[0], parts[1]
+
+
+# ==========================
+# READING BACKWARDS
+# ==========================
+def reverse_lines(file, end):
+    """
+    Yield (start_offset, line) from byte offset `end` back to the start
+    of a seekable binary file, reading one block at a time.
+    """
+    position = end
+    remainder = b''
+
+    while position > 0:
+        size = min(BLOCK_SIZE, position)
+        position -= size
+        file.seek(position)
+        chunk = file.read(size) + remainder
+
+        lines = chunk.split(b'\n')
+        remainder = lines.pop(0)
+        line_end = position + len(chunk)
+
+        for line in reversed(lines):
+            line_end -= len(line) + 1
+            yield line_end + 1, line
+
+    if remainder:
+        yield 0, remainder
+
+
+def tail_lines(file, end, limit, matches):
+    """
+    Forward-only variant for compressed segments: stream up to `end` and
+    keep the last `limit` matching lines. Memory stays O(limit).
+    """
+    kept = deque(maxlen=limit)
+    offset = 0
+
+    for line in file:
+        if offset >= end:
+            break
+        text = line.rstrip(b'\n')
+        if text and matches(text):
+            kept.append((offset, text))
+        offset += len(line)
+
+    return list(reversed(kept))
+
+
+def tail_members(file, index, end, limit, matches):
+    """
+    tail_lines for a segment written by GzipRotationMixin: decompress
+    only the gzip members before `end`, newest first, until `limit`
+    matching lines are found.
+    """
+    members = index['members']
+    bounds = [compressed for _start, compressed in members[1:]] + [index['compressed_size']]
+    found = []
+
+    for (start, compressed), compressed_end in reversed(list(zip(members, bounds))):
+        if start >= end:
+            continue
+
+        file.seek(compressed)
+        chunk = zlib.decompressobj(wbits=31).decompress(file.read(compressed_end - compressed))
+
+        offset = start
+        member_lines = []
+        for line in chunk.split(b'\n')[:-1]:
+            if offset >= end:
+                break
+            if line and matches(line):
+                member_lines.append((offset, line))
+            offset += len(line) + 1
+
+        found.extend(reversed(member_lines))
+        if len(found) >= limit:
+            return found[:limit]
+
+    return found
+
+
+# ==========================
+# SPARSE LINE INDEX
+# ==========================
+def index_path(path):
+    return f"{path}.idx"
+
+
+def write_segment_index(path, index):
+    try:
+        with open(index_path(path), 'w') as file:
+            json.dump(index, file)
+    except OSError:
+        pass  # readers fall back to streaming the segment
+
+
+def load_segment_index(path):
+    """The member index of a rotated segment, or None if missing or stale."""
+    try:
+        with open(index_path(path)) as file:
+            index = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    if index.get('compressed_size') != os.path.getsize(path) or not index.get('members'):
+        return None
+    return index
+
+
+# Last index built per log path, keyed by (inode, size, mtime, step):
+# an unchanged log costs one stat(), and where the .idx file cannot be
+# written the index is extended from here instead of rebuilt
+_line_indexes = {}
+
+
+def load_line_index(path):
+    """
+    Return the persisted sparse index of the live log, first extending
+    it over lines appended since the last call.
+
+    offsets[k] is the byte offset of line k * INDEX_STEP; "size" is how
+    far the file has been indexed. A new inode (rotation) or a shorter
+    file starts a fresh index.
+    """
+    stat = os.stat(path)
+    key = (stat.st_ino, stat.st_size, stat.st_mtime_ns, INDEX_STEP)
+    cached_key, cached = _line_indexes.get(path, (None, None))
+    if cached_key == key:
+        return cached
+
+    try:
+        with open(index_path(path)) as file:
+            index = json.load(file)
+    except (OSError, ValueError):
+        index = None
+
+    # The .idx file is missing or behind what this process already indexed
+    if (
+        cached and cached_key[0] == stat.st_ino and cached_key[3] == INDEX_STEP
+        and (not index or index.get('inode') != stat.st_ino
+             or index.get('size', 0) < cached['size'])
+    ):
+        index = {**cached, 'offsets': list(cached['offsets'])}
+
+    if (
+        not index or index.get('inode') != stat.st_ino or
+        index.get('size', 0) > stat.st_size
+    ):
+        index = {'inode': stat.st_ino, 'size': 0, 'lines': 0, 'offsets': []}
+
+    if index['size'] < stat.st_size:
+        offset, lines = index['size'], index['lines']
+
+        with open(path, 'rb') as file:
+            file.seek(offset)
+            for line in file:
+                if not line.endswith(b'\n'):
+                    break  # still being written
+                if lines % INDEX_STEP == 0:
+                    index['offsets'].append(offset)
+                offset += len(line)
+                lines += 1
+
+        index.update(size=offset, lines=lines)
+
+        temp_path = f"{index_path(path)}.tmp"
+        try:
+            with open(temp_path, 'w') as file:
+                json.dump(index, file)
+            os.replace(temp_path, index_path(path))
+        except OSError:
+            pass  # read-only deployments keep it in _line_indexes
+
+    _line_indexes[path] = (key, index)
+    return index
+
+
+def line_offset(path, index, number):
+    """Byte offset where line `number` (0-based) of the live log starts."""
+    if number >= index['lines']:
+        return index['size']
+
+    checkpoint = number // INDEX_STEP
+    offset = index['offsets'][checkpoint]
+
+    with open(path, 'rb') as file:
+        file.seek(offset)
+        for _ in range(number - checkpoint * INDEX_STEP):
+            offset += len(file.readline())
+
+    return offset
+
+
+def page_cursor(path, page, page_size):
+    """
+    Cursor for page `page` (1-based, newest first) of the unfiltered live
+    log, found through the sparse index instead of rescanning the file.
+    Returns None when the page lies beyond the live log.
+    """
+    if not os.path.exists(path):
+        return None
+
+    index = load_line_index(path)
+    end_line = index['lines'] - (page - 1) * page_size
+
+    if end_line <= 0:
+        return None
+
+    return encode_cursor(0, line_offset(path, index, end_line))
+
+
+# ==========================
+# FILTERING
+# ==========================
+def build_matcher(level=None, user=None, keyword=None):
+    level = level.upper().encode() if level else None
+    user_pattern = (
+        re.compile(rb'(?<![\w.@+-])' + re.escape(user.encode()) + rb'(?![\w.@+-])')
+        if user else None
+    )
+    keyword = keyword.lower().encode() if keyword else None
+
+    def matches(line):
+        if level and not line.startswith(level + b' '):
+            return False
+        if user_pattern and not user_pattern.search(line):
+            return False
+        if keyword and keyword not in line.lower():
+            return False
+        return True
+
+    return matches
+
+
+# ==========================
+# PAGINATION
+# ==========================
+def read_page(path, cursor=None, page_size=50, level=None, user=None, keyword=None):
+    """
+    Return (lines, next_cursor) for the newest `page_size` matching lines
+    older than `cursor`, walking from the live log into rotated files.
+
+    A cursor is "<segment>:<byte offset>" (or just "<segment>" for a whole
+    segment), where segment 0 is the live log. Cursors are positions, so
+    a rotation between two requests shifts older pages by one file.
+    next_cursor is None when there is nothing older.
+    """
+    segments = log_segments(path)
+    matches = build_matcher(level, user, keyword)
+
+    position = decode_cursor(cursor) if cursor else None
+    segment, offset = position if position else (0, None)
+
+    lines = []
+
+    while segment < len(segments) and len(lines) < page_size:
+        name = segments[segment]
+        wanted = page_size - len(lines)
+
+        if name.endswith('.gz'):
+            end = offset if offset is not None else float('inf')
+            segment_index = load_segment_index(name)
+            if segment_index:
+                with open(name, 'rb') as file:
+                    found = tail_members(file, segment_index, end, wanted + 1, matches)
+            else:
+                with gzip.open(name, 'rb') as file:
+                    found = tail_lines(file, end, wanted + 1, matches)
+        else:
+            with open(name, 'rb') as file:
+                end = offset if offset is not None else file.seek(0, os.SEEK_END)
+                found = []
+                for start, line in reverse_lines(file, end):
+                    if line and matches(line):
+                        found.append((start, line))
+                        if len(found) > wanted:
+                            break
+
+        lines.extend(
+            line.decode('utf-8', errors='replace') for _start, line in found[:wanted]
+        )
+
+        if len(found) > wanted:
+            # More matches remain in this segment: resume after the last one
+            return lines, encode_cursor(segment, found[wanted - 1][0])
+
+        segment, offset = segment + 1, None
+
+    if segment < len(segments):
+        return lines, encode_cursor(segment)
+
+    return lines, None
@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from logs.archive import archive_audit_logs, load_archive
+
+
+class Command(BaseCommand):
+    help = (
+        "Move AuditLog rows older than the retention window into gzipped "
+        "JSONL archive files, or load an archive back with --load."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.AUDIT_LOG_RETENTION_DAYS,
+            help="Keep rows newer than this many days in the table."
+        )
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.AUDIT_LOG_ARCHIVE_BATCH_SIZE
+        )
+        parser.add_argument(
+            '--archive-dir', default=settings.AUDIT_LOG_ARCHIVE_DIR
+        )
+        parser.add_argument(
+            '--load', metavar='PATH',
+            help="Restore the rows of an archive file instead of archiving."
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        if options['load']:
+            try:
+                loaded = load_archive(options['load'], options['batch_size'])
+            except FileNotFoundError:
+                raise CommandError(f"Archive not found: {options['load']}")
+
+            self.stdout.write(f"Loaded {loaded} audit log entries from {options['load']}")
+            return
+
+        if options['days'] < 0:
+            raise CommandError("--days cannot be negative.")
+
+        archived, path = archive_audit_logs(
+            days=options['days'],
+            directory=options['archive_dir'],
+            batch_size=options['batch_size']
+        )
+
+        if not archived:
+            self.stdout.write("No audit log entries older than the retention window.")
+            return
+
+        self.stdout.write(f"Archived {archived} audit log entries to {path}")
@@ -0,0 +1,70 @@
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from bookings.models import Booking, TIME_SLOTS
+from courts.models import Court
+from logs.models import AuditLog
+from logs.writer import AuditLogWriter
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare write statements per booking with synchronous and buffered "
+        "AuditLog writes. Rows created by the run are removed afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bookings', type=int, default=500)
+        parser.add_argument('--batch-size', type=int, default=50)
+
+    def handle(self, *args, **options):
+        count = options['bookings']
+        user = User.objects.create_user('bench-audit-user')
+        court = Court.objects.create(name='Bench Court', sport_type='tennis')
+
+        try:
+            for label, writer, offset in (
+                ('synchronous', AuditLogWriter(buffered=False), 1),
+                ('buffered', AuditLogWriter(
+                    batch_size=options['batch_size'], flush_interval=None
+                ), count + 1),
+            ):
+                writes, elapsed = self.run(writer, user, court, count, offset)
+                self.stdout.write(
+                    f"{label:<12} {writes / count:.2f} write statements/booking "
+                    f"({elapsed * 1000 / count:.2f} ms/booking)"
+                )
+        finally:
+            AuditLog.objects.filter(user=user).delete()
+            court.delete()
+            user.delete()
+
+    def run(self, writer, user, court, count, offset):
+        slots = [value for value, _label in TIME_SLOTS]
+        start = date.today() + timedelta(days=offset)
+
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+
+            for index in range(count):
+                Booking.objects.create(
+                    user=user,
+                    court=court,
+                    booking_date=start + timedelta(days=index // len(slots)),
+                    booking_time=slots[index % len(slots)]
+                )
+                writer.write('BOOKING_CREATE', user=user, ip_address='127.0.0.1')
+
+            writer.flush()
+            elapsed = time.perf_counter() - started
+
+        writes = sum(
+            1 for query in queries
+            if query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))
+        )
+        return writes, elapsed
@@ -0,0 +1,77 @@
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+
+from logs.handlers import QueuedRotatingFileHandler
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure time spent on the request thread per security log call: "
+        "eager f-string + FileHandler versus lazy %-style + queued handler."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--calls', type=int, default=20000)
+
+    def handle(self, *args, **options):
+        calls = options['calls']
+        formatter = logging.Formatter('{levelname} {asctime} {message}', style='{')
+
+        with tempfile.TemporaryDirectory() as tmp:
+            file_handler = logging.FileHandler(os.path.join(tmp, 'plain.log'))
+            file_handler.setFormatter(formatter)
+
+            queued_handler = QueuedRotatingFileHandler(
+                os.path.join(tmp, 'queued.log'),
+                maxBytes=10 * 1024 * 1024,
+                backupCount=3
+            )
+            queued_handler.setFormatter(formatter)
+
+            eager = self.run(file_handler, calls, lazy=False)
+            lazy = self.run(queued_handler, calls, lazy=True)
+
+            file_handler.close()
+            queued_handler.close()
+
+        for label, timings in (
+            ('FileHandler (eager)', eager),
+            ('QueuedRotatingFileHandler (lazy)', lazy),
+        ):
+            timings.sort()
+            self.stdout.write(
+                f"{label:<34} mean={statistics.mean(timings):7.2f}us "
+                f"p50={timings[len(timings) // 2]:7.2f}us "
+                f"p99={timings[int(len(timings) * 0.99)]:7.2f}us"
+            )
+
+    def run(self, handler, calls, lazy):
+        logger = logging.getLogger(f'bench.security.{id(handler)}')
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        logger.addHandler(handler)
+
+        username, court, booking_date = 'bench-user', 'Court 1 (tennis)', '2026-01-01'
+        timings = []
+
+        for _ in range(calls):
+            started = time.perf_counter()
+            if lazy:
+                logger.info(
+                    "Booking CREATED | user=%s | court=%s | date=%s",
+                    username, court, booking_date
+                )
+            else:
+                logger.info(
+                    f"Booking CREATED | user={username} | "
+                    f"court={court} | date={booking_date}"
+                )
+            timings.append((time.perf_counter() - started) * 1_000_000)
+
+        logger.removeHandler(handler)
+        return timings
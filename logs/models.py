@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 
 class AuditLog(models.Model):
@@ -29,9 +30,22 @@ class AuditLog(models.Model):
         blank=True
     )
 
+    # Set when the event happens, not when a buffered batch is flushed
     timestamp = models.DateTimeField(
-        auto_now_add=True
+        default=timezone.now,
+        editable=False
     )
 
+    class Meta:
+        indexes = [
+            # Admin "action" filter sorted by newest first
+            models.Index(
+                fields=['action', '-timestamp'],
+                name='auditlog_action_ts_idx'
+            ),
+            # Admin date filter and the archive's age scan
+            models.Index(fields=['timestamp'], name='auditlog_timestamp_idx'),
+        ]
+
     def __str__(self):
         return f"{self.action} | {self.user} | {self.timestamp}"
@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+AUDIT_PAGE_SIZE = 50
+# Aggregates without an explicit 'since' cover this window only
+AGGREGATE_DEFAULT_DAYS = 7
+TOP_IP_ACTIONS = ('LOGIN_FAILED', 'UNAUTHORIZED')
+TOP_IP_LIMIT = 10
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+TRUNCATE = {
+    'hour': TruncHour,
+    'day': TruncDay,
+}
+
+
+# ==========================
+# FILTERS
+# ==========================
+def filter_audit_logs(queryset, action=None, user=None, ip=None,
+                      since=None, until=None):
+    if action:
+        queryset = queryset.filter(action=action)
+    if user:
+        queryset = queryset.filter(user__username=user)
+    if ip:
+        queryset = queryset.filter(ip_address=ip)
+    if since:
+        queryset = queryset.filter(timestamp__gte=since)
+    if until:
+        queryset = queryset.filter(timestamp__lt=until)
+    return queryset
+
+
+# ==========================
+# KEYSET PAGINATION
+# ==========================
+# Timestamps travel as integer microseconds so cursors stay URL-safe
+def encode_audit_cursor(entry):
+    micros = (entry.timestamp - EPOCH) // timedelta(microseconds=1)
+    return f"{micros}_{entry.pk}"
+
+
+def decode_audit_cursor(cursor):
+    """Return (timestamp, pk) from a cursor, or None if it is malformed."""
+    try:
+        micros, pk = (int(part) for part in cursor.split('_'))
+        timestamp = EPOCH + timedelta(microseconds=micros)
+    except (AttributeError, ValueError, OverflowError):
+        return None
+
+    return timestamp, pk
+
+
+def paginate_audit_logs(queryset, cursor=None, page_size=AUDIT_PAGE_SIZE):
+    """
+    Keyset-paginate audit entries on (timestamp, id), newest first.
+
+    Returns (page, next_cursor); next_cursor is None on the last page.
+    No COUNT(*) is run, so the cost of a page does not grow with the table.
+    """
+    position = decode_audit_cursor(cursor) if cursor else None
+
+    if position:
+        timestamp, pk = position
+        queryset = queryset.filter(
+            Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, pk__lt=pk)
+        )
+
+    rows = list(queryset.order_by('-timestamp', '-pk')[:page_size + 1])
+    page = rows[:page_size]
+    next_cursor = (
+        encode_audit_cursor(page[-1]) if len(rows) > page_size else None
+    )
+
+    return page, next_cursor
+
+
+# ==========================
+# AGGREGATES
+# ==========================
+def action_counts(queryset, bucket='day'):
+    """Entries per (period, action), grouped in the database."""
+    rows = (
+        queryset.annotate(period=TRUNCATE[bucket]('timestamp'))
+        .values('period', 'action')
+        .annotate(count=Count('id'))
+        .order_by('period', 'action')
+    )
+
+    return [
+        {
+            'period': row['period'].isoformat(),
+            'action': row['action'],
+            'count': row['count'],
+        }
+        for row in rows
+    ]
+
+
+def top_ips(queryset, limit=TOP_IP_LIMIT):
+    """Addresses with the most failed logins and unauthorized requests."""
+    return list(
+        queryset.filter(action__in=TOP_IP_ACTIONS, ip_address__isnull=False)
+        .values('ip_address')
+        .annotate(count=Count('id'))
+        .order_by('-count', 'ip_address')[:limit]
+    )
+
+
+def audit_aggregates(queryset, bucket='day', since=None):
+    """
+    Both aggregates for an already-filtered queryset. Without `since`
+    they are limited to the last AGGREGATE_DEFAULT_DAYS days.
+    """
+    if since is None:
+        since = timezone.now() - timedelta(days=AGGREGATE_DEFAULT_DAYS)
+        queryset = queryset.filter(timestamp__gte=since)
+
+    return {
+        'bucket': bucket,
+        'since': since.isoformat(),
+        'actions': action_counts(queryset, bucket),
+        'top_ips': top_ips(queryset),
+    }
@@ -1,3 +1,373 @@
-from django.test import TestCase
+import gzip
+import logging
+import os
+import tempfile
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import logreader
+from .handlers import CompressedRotatingFileHandler, QueuedRotatingFileHandler
+from .logreader import page_cursor, read_page
+from .models import AuditLog
+from .writer import AuditLogWriter
+
+
+class AuditLogWriterTests(TransactionTestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('staff', password='pass12345')
+
+    def test_buffered_writes_flush_by_size(self):
+        writer = AuditLogWriter(batch_size=3, flush_interval=None)
+
+        writer.write('BOOKING_CREATE', user=self.user)
+        writer.write('BOOKING_UPDATE', user=self.user)
+        self.assertEqual(AuditLog.objects.count(), 0)
+
+        # One INSERT, in its own transaction
+        with self.assertNumQueries(3):
+            writer.write('BOOKING_DELETE', user=self.user)
+
+        self.assertEqual(AuditLog.objects.count(), 3)
+        self.assertEqual(writer.pending, 0)
+
+    def test_flush_writes_remaining_entries(self):
+        writer = AuditLogWriter(batch_size=50, flush_interval=None)
+        writer.write('LOGIN_FAILED', ip_address='10.0.0.1')
+
+        writer.flush()
+
+        self.assertEqual(
+            AuditLog.objects.get().ip_address, '10.0.0.1'
+        )
+
+    def test_entries_wait_for_commit_and_rollback_drops_only_its_own(self):
+        writer = AuditLogWriter(batch_size=2, flush_interval=None)
+        writer.write('LOGIN_SUCCESS', user=self.user)
+
+        with self.assertRaises(ValueError), transaction.atomic():
+            writer.write('BOOKING_CREATE', user=self.user)
+            writer.write('BOOKING_CREATE', user=self.user)
+            self.assertEqual(writer.pending, 1)
+            raise ValueError
+
+        self.assertEqual(writer.pending, 1)
+        writer.flush()
+        self.assertEqual(AuditLog.objects.get().action, 'LOGIN_SUCCESS')
+
+    def test_full_batch_wakes_the_writer_thread(self):
+        writer = AuditLogWriter(batch_size=2, flush_interval=60)
+
+        with self.assertNumQueries(0):
+            writer.write('BOOKING_CREATE', user=self.user)
+            writer.write('BOOKING_DELETE', user=self.user)
+
+        deadline = time.monotonic() + 5
+        while writer.pending and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(writer.pending, 0)
+        self.assertEqual(AuditLog.objects.count(), 2)
+
+    def test_unbuffered_writes_immediately(self):
+        writer = AuditLogWriter(buffered=False)
+        writer.write('BOOKING_CREATE', user=self.user)
+        self.assertEqual(AuditLog.objects.count(), 1)
+
+
+class QueuedRotatingFileHandlerTests(TestCase):
+
+    def test_records_are_written_and_rotated_files_gzipped(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'security.log')
+            handler = QueuedRotatingFileHandler(path, maxBytes=200, backupCount=2)
+            handler.setFormatter(logging.Formatter('%(message)s'))
+
+            logger = logging.getLogger('security.tests.rotation')
+            logger.propagate = False
+            logger.addHandler(handler)
+
+            for number in range(20):
+                logger.warning("Booking DELETED | user=%s | booking_id=%s",
+                               'player', number)
+
+            handler.close()
+            logger.removeHandler(handler)
+
+            with open(path) as current:
+                self.assertIn("booking_id=19", current.read())
+
+            with gzip.open(path + '.1.gz', 'rt') as rotated:
+                self.assertIn("Booking DELETED | user=player", rotated.read())
+
+            self.assertFalse(os.path.exists(path + '.3.gz'))
+
+            # Each member index moved along with its segment
+            for number in (1, 2):
+                self.assertIsNotNone(logreader.load_segment_index(f"{path}.{number}.gz"))
+
+
+    @skipUnless(hasattr(os, 'fork'), "needs os.fork()")
+    def test_forked_worker_records_are_written(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'security.log')
+            handler = QueuedRotatingFileHandler(path)
+            handler.setFormatter(logging.Formatter('%(message)s'))
+
+            logger = logging.getLogger('security.tests.fork')
+            logger.propagate = False
+            logger.addHandler(handler)
+            self.addCleanup(logger.removeHandler, handler)
+
+            # The parent's listener is already running when the worker forks
+            logger.warning("parent before fork")
+
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    logger.warning("child")
+                    handler.close()
+                finally:
+                    os._exit(0)
+
+            os.waitpid(pid, 0)
+            logger.warning("parent after fork")
+            handler.close()
+
+            with open(path) as current:
+                lines = current.read().splitlines()
+
+        self.assertEqual(
+            sorted(lines), ["child", "parent after fork", "parent before fork"]
+        )
+
+
+class SecurityLogReaderTests(TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'security.log')
+
+        # Rotated file holds lines 0-9, the live log lines 10-29
+        with gzip.open(self.path + '.1.gz', 'wt') as rotated:
+            for number in range(10):
+                rotated.write(f"INFO 2026-01-01 Login SUCCESS | user=old{number}\n")
+
+        with open(self.path, 'w') as current:
+            for number in range(10, 30):
+                level = 'WARNING' if number % 2 else 'INFO'
+                current.write(f"{level} 2026-01-02 Event {number} | user=user{number}\n")
+
+    def read_all(self, page_size, **filters):
+        lines, cursor = read_page(self.path, page_size=page_size, **filters)
+        while cursor:
+            page, cursor = read_page(self.path, cursor, page_size, **filters)
+            lines.extend(page)
+        return lines
+
+    def test_pages_walk_newest_first_into_rotated_files(self):
+        lines = self.read_all(page_size=7)
+
+        self.assertEqual(len(lines), 30)
+        self.assertIn("Event 29", lines[0])
+        self.assertIn("Event 10", lines[19])
+        self.assertIn("user=old9", lines[20])
+        self.assertIn("user=old0", lines[-1])
+
+    def test_filters_run_on_the_server(self):
+        warnings = self.read_all(page_size=3, level='warning')
+        self.assertEqual(len(warnings), 10)
+        self.assertTrue(all(line.startswith('WARNING') for line in warnings))
+
+        self.assertEqual(len(self.read_all(page_size=3, user='user1')), 0)
+        self.assertEqual(len(self.read_all(page_size=3, user='user11')), 1)
+        self.assertEqual(len(self.read_all(page_size=3, keyword='success')), 10)
+
+    def test_page_cursor_uses_the_sparse_index(self):
+        original_step = logreader.INDEX_STEP
+        logreader.INDEX_STEP = 4
+        self.addCleanup(setattr, logreader, 'INDEX_STEP', original_step)
+
+        cursor = page_cursor(self.path, page=3, page_size=5)
+        lines, _cursor = read_page(self.path, cursor, page_size=5)
+
+        self.assertIn("Event 19", lines[0])
+        self.assertTrue(os.path.exists(self.path + '.idx'))
+        self.assertIsNone(page_cursor(self.path, page=5, page_size=5))
+
+    def test_unwritable_line_index_is_not_rebuilt_per_request(self):
+        with mock.patch.object(logreader.os, 'replace', side_effect=OSError):
+            first = logreader.load_line_index(self.path)
+            self.assertFalse(os.path.exists(self.path + '.idx'))
+
+            # Unchanged log: answered without reading it again
+            with mock.patch('builtins.open', side_effect=AssertionError):
+                self.assertIs(logreader.load_line_index(self.path), first)
+
+            with open(self.path, 'a') as current:
+                current.write("INFO 2026-01-03 Event 30 | user=user30\n")
+            size = first['size']
+
+            # Appended lines extend the in-memory index
+            later = logreader.load_line_index(self.path)
+
+        self.assertEqual(later['lines'], first['lines'] + 1)
+        self.assertGreater(later['size'], size)
+
+    def test_rotated_segments_page_through_their_member_index(self):
+        source = self.path + '.rotating'
+        with open(source, 'w') as rotating:
+            for number in range(25):
+                rotating.write(f"INFO 2026-01-01 Login SUCCESS | user=old{number}\n")
+
+        handler = CompressedRotatingFileHandler(self.path, backupCount=2, delay=True)
+        handler.member_lines = 4
+        handler.rotate(source, self.path + '.1.gz')
+
+        index = logreader.load_segment_index(self.path + '.1.gz')
+        self.assertEqual(len(index['members']), 7)
+
+        # Indexed pages never stream the whole segment
+        with mock.patch.object(logreader, 'tail_lines', side_effect=AssertionError):
+            indexed = self.read_all(page_size=6)
+            filtered = self.read_all(page_size=2, user='old13')
+
+        os.remove(logreader.index_path(self.path + '.1.gz'))
+        self.assertEqual(indexed, self.read_all(page_size=6))
+        self.assertEqual(len(indexed), 45)
+        self.assertIn("user=old24", indexed[20])
+        self.assertEqual(len(filtered), 1)
+
+    def test_view_is_staff_only(self):
+        staff = User.objects.create_user('admin', password='pass12345', is_staff=True)
+        member = User.objects.create_user('member', password='pass12345')
+
+        with override_settings(SECURITY_LOG_FILE=self.path):
+            self.client.force_login(member)
+            self.assertEqual(self.client.get(reverse('audit_log')).status_code, 302)
+
+            self.client.force_login(staff)
+            response = self.client.get(reverse('audit_log'), {'level': 'WARNING'})
+
+        self.assertEqual(len(response.context['logs']), 10)
+        self.assertIsNone(response.context['next_query'])
+
+
+class AuditLogArchiveTests(TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.archive_dir = tmp.name
+
+        self.user = User.objects.create_user('player', password='pass12345')
+        now = timezone.now()
+        AuditLog.objects.bulk_create(
+            [
+                AuditLog(user=self.user, action='LOGIN_SUCCESS',
+                         timestamp=now - timedelta(days=100 + n))
+                for n in range(5)
+            ] + [
+                AuditLog(action='LOGIN_FAILED', ip_address='10.0.0.1',
+                         timestamp=now - timedelta(days=1))
+            ]
+        )
+
+    def archive(self):
+        call_command(
+            'archive_audit_logs', days=90, batch_size=2,
+            archive_dir=self.archive_dir, stdout=StringIO()
+        )
+        return [os.path.join(self.archive_dir, name)
+                for name in os.listdir(self.archive_dir)]
+
+    def test_old_rows_move_to_archive_in_batches(self):
+        files = self.archive()
+
+        self.assertEqual(list(AuditLog.objects.values_list('action', flat=True)),
+                         ['LOGIN_FAILED'])
+        self.assertEqual(len(files), 1)
+
+        with gzip.open(files[0], 'rt') as archive:
+            entries = archive.read().splitlines()
+        self.assertEqual(len(entries), 5)
+        self.assertIn('"username": "player"', entries[0])
+
+    def test_archive_loads_back_once(self):
+        original = set(AuditLog.objects.values_list('id', 'timestamp'))
+        path = self.archive()[0]
+
+        call_command('archive_audit_logs', load=path, stdout=StringIO())
+        call_command('archive_audit_logs', load=path, stdout=StringIO())
+
+        self.assertEqual(set(AuditLog.objects.values_list('id', 'timestamp')), original)
+        self.assertEqual(AuditLog.objects.filter(user=self.user).count(), 5)
+
+
+class AuditQueryTests(TestCase):
+
+    def setUp(self):
+        self.staff = User.objects.create_user('admin', password='pass12345', is_staff=True)
+        self.member = User.objects.create_user('member', password='pass12345')
+        now = timezone.now().replace(minute=30)
+
+        AuditLog.objects.bulk_create(
+            [
+                AuditLog(user=self.member, action='BOOKING_CREATE',
+                         timestamp=now - timedelta(hours=n % 3))
+                for n in range(12)
+            ] + [
+                AuditLog(action='LOGIN_FAILED', ip_address='10.0.0.1', timestamp=now),
+                AuditLog(action='LOGIN_FAILED', ip_address='10.0.0.1', timestamp=now),
+                AuditLog(action='UNAUTHORIZED', ip_address='10.0.0.2', timestamp=now),
+            ]
+        )
+        self.client.force_login(self.staff)
+
+    def query(self, **params):
+        return self.client.get(reverse('audit_log_query'), params)
+
+    def test_keyset_pages_cover_every_entry_once(self):
+        seen, params = [], {'action': 'BOOKING_CREATE'}
+
+        while True:
+            data = self.query(**params).json()
+            seen.extend(entry['id'] for entry in data['results'])
+            if not data['next_cursor']:
+                break
+            params['cursor'] = data['next_cursor']
+
+        self.assertEqual(len(seen), 12)
+        self.assertEqual(len(set(seen)), 12)
+
+    def test_aggregates_are_grouped_in_the_database(self):
+        # Session, user, page and the two GROUP BY queries
+        with self.assertNumQueries(5):
+            data = self.query(bucket='hour').json()
+
+        hourly = [row['count'] for row in data['aggregates']['actions']
+                  if row['action'] == 'BOOKING_CREATE']
+        self.assertEqual(hourly, [4, 4, 4])
+        self.assertEqual(
+            data['aggregates']['top_ips'],
+            [{'ip_address': '10.0.0.1', 'count': 2},
+             {'ip_address': '10.0.0.2', 'count': 1}]
+        )
+
+    def test_filters_and_access(self):
+        data = self.query(user='member', ip='10.0.0.1').json()
+        self.assertEqual(data['results'], [])
+        self.assertEqual(len(self.query(ip='10.0.0.1').json()['results']), 2)
+        self.assertEqual(self.query(since='bad').status_code, 400)
+
+        self.client.force_login(self.member)
+        self.assertEqual(self.query().status_code, 302)
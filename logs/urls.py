@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import audit_log_view
+from .views import audit_log_view, audit_query
 
 urlpatterns = [
     path('audit-log/', audit_log_view, name='audit_log'),
+    path('audit-log/query/', audit_query, name='audit_log_query'),
 ]
\ No newline at end of file
@@ -1,18 +1,128 @@
+from django.conf import settings
+from django.http import JsonResponse
 from django.shortcuts import render
 from django.contrib.auth.decorators import user_passes_test
+from django.utils.http import urlencode
 
+from .forms import AuditQueryForm
+from .logreader import load_line_index, page_cursor, read_page
+from .models import AuditLog
+from .queries import audit_aggregates, filter_audit_logs, paginate_audit_logs
+
+LOG_PAGE_SIZE = 100
+
+
+# ==========================
+# SECURITY LOG VIEWER
+# ==========================
 @user_passes_test(lambda u: u.is_staff)
 def audit_log_view(request):
-    log_entries = []
+    path = settings.SECURITY_LOG_FILE
 
+    filters = {
+        'level': request.GET.get('level', '').strip(),
+        'user': request.GET.get('user', '').strip(),
+        'keyword': request.GET.get('q', '').strip(),
+    }
+    filtered = any(filters.values())
+    cursor = request.GET.get('cursor')
+
+    # Jump to page N of the unfiltered log through the sparse index
     try:
-        with open('logs/security.log', 'r') as file:
-            log_entries = file.readlines()
+        page = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page = 1
+
+    if page > 1 and not cursor and not filtered:
+        cursor = page_cursor(path, page, LOG_PAGE_SIZE) or '1'
+
+    try:
+        log_entries, next_cursor = read_page(
+            path,
+            cursor=cursor,
+            page_size=LOG_PAGE_SIZE,
+            level=filters['level'] or None,
+            user=filters['user'] or None,
+            keyword=filters['keyword'] or None
+        )
     except FileNotFoundError:
+        log_entries, next_cursor = [], None
+
+    if not log_entries and not cursor and not filtered:
         log_entries = ["No logs available."]
 
+    total_pages = None
+    if not filtered:
+        try:
+            total_pages = -(-load_line_index(path)['lines'] // LOG_PAGE_SIZE)
+        except FileNotFoundError:
+            pass
+
+    query = {
+        'level': filters['level'],
+        'user': filters['user'],
+        'q': filters['keyword'],
+    }
+    next_query = (
+        urlencode({**query, 'cursor': next_cursor}) if next_cursor else None
+    )
+
     return render(
         request,
         'logs/audit_log.html',
-        {'logs': log_entries}
+        {
+            'logs': log_entries,
+            'filters': query,
+            'next_query': next_query,
+            'page': page if not request.GET.get('cursor') else None,
+            'total_pages': total_pages,
+        }
     )
+
+
+# ==========================
+# AUDIT QUERY (JSON API)
+# ==========================
+@user_passes_test(lambda u: u.is_staff)
+def audit_query(request):
+    form = AuditQueryForm(request.GET)
+
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+
+    data = form.cleaned_data
+    entries = filter_audit_logs(
+        AuditLog.objects.all(),
+        action=data['action'],
+        user=data['user'],
+        ip=data['ip'],
+        since=data['since'],
+        until=data['until']
+    )
+
+    page, next_cursor = paginate_audit_logs(
+        entries.select_related('user'), data['cursor']
+    )
+
+    response = {
+        'results': [
+            {
+                'id': entry.pk,
+                'timestamp': entry.timestamp.isoformat(),
+                'action': entry.action,
+                'user': entry.user.username if entry.user else None,
+                'ip_address': entry.ip_address,
+            }
+            for entry in page
+        ],
+        'next_cursor': next_cursor,
+    }
+
+    # Aggregates describe the whole result set, so only the first page
+    # pays for the GROUP BY queries
+    if not data['cursor']:
+        response['aggregates'] = audit_aggregates(
+            entries, bucket=data['bucket'] or 'day', since=data['since']
+        )
+
+    return JsonResponse(response)
@@ -0,0 +1,155 @@
+import atexit
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+from .models import AuditLog
+
+security_logger = logging.getLogger('security')
+
+
+class AuditLogWriter:
+    """
+    Queue AuditLog entries in-process and write them with bulk_create.
+
+    Entries join the queue only when the caller's transaction commits,
+    so a rollback drops just its own entries. The background thread
+    writes a batch every flush_interval seconds, or as soon as one
+    reaches batch_size, and the rest is flushed at interpreter shutdown.
+    With buffered=False entries are saved at once, inside the caller's
+    transaction.
+    """
+
+    def __init__(self, batch_size=50, flush_interval=2.0, buffered=True):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffered = buffered
+
+        self._pending = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+
+        atexit.register(self.flush)
+
+    def write(self, action, user=None, ip_address=None):
+        self.add([
+            AuditLog(
+                user=user,
+                action=action,
+                ip_address=ip_address,
+                timestamp=timezone.now()
+            )
+        ])
+
+    def add(self, entries):
+        if not self.buffered:
+            AuditLog.objects.bulk_create(entries)
+            return
+
+        transaction.on_commit(lambda: self._enqueue(entries))
+
+    def _enqueue(self, entries):
+        with self._lock:
+            self._pending.extend(entries)
+            full = len(self._pending) >= self.batch_size
+
+        if not full:
+            self._ensure_thread()
+        elif self._ensure_thread():
+            self._wake.set()
+        elif not connection.in_atomic_block:
+            # No writer thread: flush here, but never inside someone's transaction
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+
+        if not batch:
+            return
+
+        try:
+            AuditLog.objects.bulk_create(batch)
+        except DatabaseError:
+            # Synchronous fallback: write one by one so a single bad row
+            # cannot drop the rest of the batch
+            for entry in batch:
+                try:
+                    entry.save()
+                except DatabaseError:
+                    security_logger.exception(
+                        "AuditLog write failed | action=%s | user_id=%s | ip=%s | "
+                        "time=%s",
+                        entry.action,
+                        entry.user_id,
+                        entry.ip_address,
+                        entry.timestamp
+                    )
+
+    @property
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def _ensure_thread(self):
+        """Start the writer thread if needed; False when there is none."""
+        if not self.flush_interval:
+            return False
+
+        # Threads do not survive fork(), so restart one per process
+        if self._thread and self._thread.is_alive() and self._pid == os.getpid():
+            return True
+
+        with self._lock:
+            if self._thread and self._thread.is_alive() and self._pid == os.getpid():
+                return True
+
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run,
+                name='audit-log-writer',
+                daemon=True
+            )
+            self._thread.start()
+        return True
+
+    def _run(self):
+        while True:
+            # Woken early when a batch fills up
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+
+            if self.pending:
+                self.flush()
+                # This thread's connection is not managed by a request
+                connection.close()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_audit_writer():
+    global _writer
+
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = AuditLogWriter(
+                    batch_size=getattr(settings, 'AUDIT_LOG_BATCH_SIZE', 50),
+                    flush_interval=getattr(settings, 'AUDIT_LOG_FLUSH_SECONDS', 2.0),
+                    buffered=getattr(settings, 'AUDIT_LOG_BUFFERED', True)
+                )
+
+    return _writer
+
+
+def audit_log(action, user=None, ip_address=None):
+    """Record an AuditLog entry through the shared buffered writer."""
+    get_audit_writer().write(action, user=user, ip_address=ip_address)